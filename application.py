@@ -1,44 +1,277 @@
+import math
+import time
+STARTUP_BEGIN = time.perf_counter()
+
 from flask import Flask, Response, render_template, request, redirect, url_for, jsonify
 import os
-import joblib
-import pandas as pd
-import numpy as np
-from alibi_detect.cd import KSDrift
+import threading
+import warnings
 from config.paths_config import *
-from prometheus_client import Counter, Gauge, generate_latest, CONTENT_TYPE_LATEST
-from utils.logger import get_logger
+from utils.common_functions import read_yaml
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, generate_latest, CONTENT_TYPE_LATEST
+from utils.logger import configure_loggers, get_logger
+from src.drift_monitor import DriftMonitor
+from src.micro_batcher import MicroBatcher
+from src.prediction_cache import PredictionCache
+from src.request_profiler import RequestProfiler
+from src.model_reloader import ModelReloader
+
+# Fixed name: run as `python application.py` this module is __main__, and logging_config refers to it as application
+logger = get_logger('application')
+
+# The single-row path scores plain arrays, not DataFrames
+warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+# Serving settings
+config = read_yaml(CONFIG_PATH)
+serving_config = config.get('serving_config', {})
+drift_config = config.get('drift_config', {})
+batching_config = config.get('batching_config', {})
+cache_config = config.get('cache_config', {})
+profiler_config = config.get('profiler_config', {})
+reload_config = config.get('reload_config', {})
+configure_loggers(config.get('logging_config', {}))
+MAX_BATCH_RECORDS = serving_config.get('max_batch_records', 10000)
+# A request waits this long for its micro-batch, then is scored on its own
+MICRO_BATCH_TIMEOUT = (batching_config.get('latency_budget_ms', 50) + batching_config.get('timeout_margin_ms', 1000)) / 1000
+
+# Metrics (under gunicorn each worker writes to PROMETHEUS_MULTIPROC_DIR; see /metrics)
+# Every worker runs its own drift windows, so the gauge reports the max over live workers
+ks_drift_metric = Gauge('ks_drift_detected_columns', 'Número de colunas com data drift detectado (KS Test)',
+                        multiprocess_mode='livemax')
+prediction_total_count = Counter('prediction_total_count', 'Total number of predictions made')
+drift_events_total = Counter('drift_events_total', 'Total number of drift events detected')
+micro_batch_fallbacks_total = Counter('micro_batch_fallbacks_total',
+                                      'Single-row predictions scored inline after the micro-batcher timed out')
+cache_event_counters = {
+    'hit': Counter('prediction_cache_hits_total', 'Single-row predictions served from the cache'),
+    'miss': Counter('prediction_cache_misses_total', 'Single-row predictions not found in the cache'),
+    'eviction': Counter('prediction_cache_evictions_total', 'Cache entries evicted (LRU or TTL)')
+}
+
+# Hot-path instrumentation: where the time of a scoring request goes
+request_stage_seconds = Histogram(
+    'request_stage_seconds', 'Time spent in each stage of a scoring request', ['endpoint', 'stage'],
+    buckets=(.00005, .0001, .00025, .0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5)
+)
+prediction_batch_rows = Histogram(
+    'prediction_batch_rows', 'Rows per model call (batch API requests and micro-batches)', ['source'],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 1000, 5000, 10000, 50000)
+)
+request_payload_bytes = Histogram(
+    'request_payload_bytes', 'Request body size of the scoring endpoints', ['endpoint'],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+)
+SCORING_ENDPOINTS = {'dashboard', 'predict', 'predict_batch'}
+
+
+def stage(endpoint, name):
+    # Context manager that observes the block's duration in request_stage_seconds
+    return request_stage_seconds.labels(endpoint, name).time()
+
+
+def report_micro_batch(n_rows, latency_ms):
+    prediction_batch_rows.labels('micro_batch').observe(n_rows)
+
+
+def report_drift(num_drifted_features, window_rows):
+    # Update Prometheus metrics (called from the drift monitor thread)
+    ks_drift_metric.set(num_drifted_features)
+    if num_drifted_features > 0:
+        drift_events_total.inc()
+        logger.warning(f'Drift detectado em {num_drifted_features} colunas (janela de {window_rows} linhas).')
+    else:
+        logger.info(f'Nenhum drift detectado (janela de {window_rows} linhas).')
+
+
+def report_cache_event(event, count):
+    cache_event_counters[event].inc(count)
+
+
+# Repeated lookups of the same customer skip the model (per worker, keyed on the model version)
+prediction_cache = None
+if cache_config.get('enabled', True):
+    prediction_cache = PredictionCache(
+        max_entries=cache_config.get('max_entries', 50000),
+        ttl_seconds=cache_config.get('ttl_seconds', 300),
+        on_event=report_cache_event
+    )
+
+# Opt-in: folded stacks of the slowest requests for flame graphs
+request_profiler = None
+if profiler_config.get('enabled', False):
+    request_profiler = RequestProfiler(
+        output_dir=profiler_config.get('output_dir', PROFILE_DIR),
+        keep_slowest=profiler_config.get('keep_slowest', 20),
+        interval_ms=profiler_config.get('interval_ms', 5)
+    )
+
+
+# Model, encoders and drift reference are loaded in the background so the
+# process can answer liveness checks right away; /ready reports when they are warm.
+# Requests read `bundle` once and use that version throughout (see swap_bundle).
+bundle = None
+model_reloader = None
+startup_timings = {}
+startup_error = None
+_loader_lock = threading.Lock()
+_loader_pid = None
+
+
+def build_serving_bundle():
+    """
+    Loads the artifacts on disk into a warmed-up bundle with its own drift monitor and micro-batcher.
+    """
+    from src.serving_bundle import ServingBundle
+    from src.reference_sketch import SketchKSDrift
+
+    new_bundle = ServingBundle.load(
+        sketch_grid_size=drift_config.get('sketch_grid_size', 2001),
+        mmap_model=serving_config.get('mmap_model', True)
+    )
+
+    # Univariate drift detector against the compact reference sketch
+    ks_drift_detector = SketchKSDrift(new_bundle.reference_sketch, p_val=drift_config.get('p_val', 0.05))
+    new_bundle.warm_up()
+
+    # Windowed drift detection in a background thread
+    new_bundle.drift_monitor = DriftMonitor(
+        ks_drift_detector,
+        n_features=len(new_bundle.feature_columns),
+        window_size=drift_config.get('window_size', 500),
+        interval_seconds=drift_config.get('interval_seconds', 60),
+        buffer_size=drift_config.get('buffer_size', 5000),
+        min_window_size=drift_config.get('min_window_size', 50),
+        on_result=report_drift
+    )
+
+    # Concurrent single-row requests share one vectorized predict
+    if batching_config.get('enabled', True):
+        new_bundle.micro_batcher = MicroBatcher(
+            new_bundle.predict_proba,
+            max_batch_size=batching_config.get('max_batch_size', 64),
+            max_wait_ms=batching_config.get('max_wait_ms', 5),
+            latency_budget_ms=batching_config.get('latency_budget_ms', 50),
+            on_batch=report_micro_batch
+        )
+    return new_bundle
+
+
+def swap_bundle(new_bundle):
+    """
+    Makes `new_bundle` live with a single reference assignment and returns the previous one.
+    """
+    global bundle
+    old_bundle, bundle = bundle, new_bundle
+    return old_bundle
+
+
+def load_serving_state():
+    global model_reloader, startup_error
+    startup_error = None
+    try:
+        new_bundle = build_serving_bundle()
+        swap_bundle(new_bundle)
+
+        # Watch the artifacts and hot-swap retrained models
+        if reload_config.get('enabled', True) and model_reloader is None:
+            from src.serving_bundle import ServingBundle
+            model_reloader = ModelReloader(
+                fingerprint_fn=ServingBundle.fingerprint,
+                load_fn=build_serving_bundle,
+                swap_fn=swap_bundle,
+                current_version=new_bundle.version,
+                poll_seconds=reload_config.get('poll_seconds', 10),
+                retire_seconds=reload_config.get('retire_seconds', 30)
+            )
+        startup_timings.update(new_bundle.timings)
+        startup_timings['ready_after'] = time.perf_counter() - STARTUP_BEGIN
+        logger.info(f"Model ready: {startup_timings}")
+    except Exception as e:
+        startup_error = str(e)
+        logger.error(f"Error while loading serving artifacts: {e}")
+
+
+def start_loading(background=True):
+    """
+    Starts loading the serving artifacts once per process (no-op when loaded).
+    """
+    global _loader_pid
+    with _loader_lock:
+        if bundle is not None or _loader_pid == os.getpid():
+            return
+        _loader_pid = os.getpid()
+    if background:
+        threading.Thread(target=load_serving_state, name='model-loader', daemon=True).start()
+    else:
+        load_serving_state()
+
+
+def wait_until_ready(timeout=None):
+    start_loading()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while bundle is None and startup_error is None:
+        if deadline is not None and time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    return bundle is not None
+
+
+# Raw input fields expected by the model (derived fields are computed on the server)
+NUMERIC_FIELDS = ['tenure', 'MonthlyCharges', 'TotalCharges']
+BINARY_FIELDS = ['SeniorCitizen']
+CATEGORICAL_FIELDS = [
+    'Partner', 'Dependents', 'PhoneService', 'MultipleLines',
+    'InternetService', 'OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
+    'TechSupport', 'StreamingTV', 'StreamingMovies', 'Contract',
+    'PaperlessBilling', 'PaymentMethod'
+]
+
+app = Flask(__name__)
+startup_timings['import'] = time.perf_counter() - STARTUP_BEGIN
+start_loading()
 
-logger = get_logger(__name__)
 
+@app.before_request
+def ensure_loading():
+    # Covers processes forked before loading finished (threads do not survive fork)
+    if bundle is None:
+        start_loading()
+    elif model_reloader is not None:
+        # Started by serving processes only (not a preloading gunicorn master)
+        model_reloader.ensure_running()
 
-# Model and encoder paths
-PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
-ENCODER_PATH = os.path.join(PROJECT_ROOT, 'artifacts', 'encoders', 'label_encoders.pkl')
-MODEL_PATH = os.path.join(PROJECT_ROOT, 'artifacts', 'model', 'best_random_forest.pkl')
 
-# Load model and encoders
-model = joblib.load(MODEL_PATH)
-encoders = joblib.load(ENCODER_PATH)
+@app.before_request
+def start_request_instrumentation():
+    if request.endpoint in SCORING_ENDPOINTS:
+        if request.content_length:
+            request_payload_bytes.labels(request.endpoint).observe(request.content_length)
+        if request_profiler is not None:
+            request_profiler.start()
 
-FEATURES_PATH = os.path.join(PROJECT_ROOT, 'artifacts', 'model', 'feature_columns.pkl')
 
-# Load columns used in training
-with open(FEATURES_PATH, 'rb') as f:
-    trained_feature_columns = joblib.load(f)
+@app.teardown_request
+def finish_request_instrumentation(exc):
+    if request_profiler is not None and request.endpoint in SCORING_ENDPOINTS:
+        request_profiler.finish(request.endpoint)
 
-# Loads reference data (training) for drift comparison
-reference_data = pd.read_csv(PROCESSED_TRAIN_DATA_PATH)
-reference_data = reference_data[trained_feature_columns].astype(float)
 
-# Univariate drift detector
-ks_drift_detector = KSDrift(reference_data.values, p_val=0.05)
+@app.route('/healthz')
+def healthz():
+    return jsonify(status='alive')
 
-# Metrics
-ks_drift_metric = Gauge('ks_drift_detected_columns', 'Número de colunas com data drift detectado (KS Test)')
-prediction_total_count = Counter('prediction_total_count', 'Total number of predictions made')
-drift_events_total = Counter('drift_events_total', 'Total number of drift events detected')
 
-app = Flask(__name__)
+@app.route('/ready')
+def ready():
+    body = {
+        'ready': bundle is not None,
+        'model_version': bundle.version if bundle is not None else None,
+        'startup_seconds': {phase: round(seconds, 4) for phase, seconds in startup_timings.items()},
+        'error': startup_error
+    }
+    return jsonify(body), 200 if bundle is not None else 503
+
 
 # Home page (with login button)
 @app.route('/')
@@ -66,155 +299,222 @@ def dashboard():
     calculated_fields = {}
     drift_detected = False
 
+    if request.method == 'POST' and bundle is None:
+        prediction = "⏳ Model is still loading, please try again in a few seconds"
+        return render_template('dashboard.html', prediction=prediction, calculated=calculated_fields, drift_detected=drift_detected), 503
+
     if request.method == 'POST':
+        current = bundle
         input_data = {}
-       # Separate numeric and categorical fields
-        numeric_fields = ['tenure', 'MonthlyCharges', 'TotalCharges', 'AvgMonthlySpend']
-        categorical_fields = [
-            'SeniorCitizen', 'Partner', 'Dependents', 'PhoneService', 'MultipleLines',
-            'InternetService', 'OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
-            'TechSupport', 'StreamingTV', 'StreamingMovies', 'Contract',
-            'PaperlessBilling', 'PaymentMethod'
-        ]
-
-      # Process numeric fields
-        for feature in numeric_fields:
-            value = request.form.get(feature)
-            if value:
-                input_data[feature] = float(value) if '.' in value else int(value)
-            else:
-                input_data[feature] = 0.0  # Default value
-
-       # Process categorical fields (keep as string)
-        for feature in categorical_fields:
-            input_data[feature] = request.form.get(feature)
-
-       # Direct mappings (now using strings of the form)
-        map_internet_service = {
-            'DSL': 'DSL',
-            'Fiber Optic': 'Fiber optic',
-            'No': 'No internet service'
-        }
-        
-        map_yes_no = {
-            'No': 'No',
-            'Yes': 'Yes',
-            'No internet service': 'No internet service',
-            'Sem serviço de telefone': 'No internet service',
-            'Sem serviço de internet': 'No internet service'
-        }
-
-       # Data converted to calculation logic
-        logic_data = {
-            'OnlineSecurity': map_yes_no.get(input_data['OnlineSecurity'], 'No'),
-            'OnlineBackup': map_yes_no.get(input_data['OnlineBackup'], 'No'),
-            'DeviceProtection': map_yes_no.get(input_data['DeviceProtection'], 'No'),
-            'TechSupport': map_yes_no.get(input_data['TechSupport'], 'No'),
-            'StreamingTV': map_yes_no.get(input_data['StreamingTV'], 'No'),
-            'StreamingMovies': map_yes_no.get(input_data['StreamingMovies'], 'No'),
-            'PhoneService': map_yes_no.get(input_data['PhoneService'], 'No'),
-            'MultipleLines': map_yes_no.get(input_data['MultipleLines'], 'No'),
-            'InternetService': map_internet_service.get(input_data['InternetService'], 'No'),
-            'Contract': input_data['Contract'],
-            'PaymentMethod': input_data['PaymentMethod'],
-            'tenure': input_data['tenure']
-        }
-
-        # Calculation of derived fields
-        no_online_services = sum([
-            logic_data['OnlineSecurity'] == 'No',
-            logic_data['OnlineBackup'] == 'No',
-            logic_data['DeviceProtection'] == 'No',
-            logic_data['TechSupport'] == 'No'
-        ])
-
-        no_streaming = sum([
-            logic_data['StreamingTV'] == 'No',
-            logic_data['StreamingMovies'] == 'No'
-        ])
-
-        total_services = 0
-        for col in ['PhoneService', 'MultipleLines', 'InternetService', 'OnlineSecurity', 'OnlineBackup',
-                    'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies']:
-            value = logic_data[col]
-            if value in ['Yes', 'Fiber optic', 'DSL']:
-                total_services += 1
-
-        risk_score = sum([
-            logic_data['Contract'] == 'Month-to-month',
-            logic_data['OnlineSecurity'] == 'No',
-            logic_data['TechSupport'] == 'No',
-            logic_data['PaymentMethod'] == 'Electronic check',
-            logic_data['tenure'] < 6
-        ])
-
-       # Save calculated fields
-        calculated_fields = {
-            'NoOnlineServices': no_online_services,
-            'NoStreaming': no_streaming,
-            'TotalServices': total_services,
-            'RiskScore': risk_score
-        }
-
-        # Add calculated fields
-        input_data.update(calculated_fields)
-
-       # Convert to DataFrame
-        df = pd.DataFrame([input_data])
-
-       # Coding
-        for col, encoder in encoders.items():
-            if col in df.columns and col != 'Churn':
-               # Convert unknown values ​​to the most frequent
-                unknown_values = ~df[col].isin(encoder.classes_)
-                if unknown_values.any():
-                    most_frequent = encoder.classes_[0]
-                    df.loc[unknown_values, col] = most_frequent
-                df[col] = encoder.transform(df[col])
-
-        # Prediction
-        # Ensures that the DataFrame has all the columns from the training
-        missing_cols = set(trained_feature_columns) - set(df.columns)
-        for col in missing_cols:
-            df[col] = 0 # Default value for missing columns
-        # Remove columns that were not used in training
-        extra_cols = set(df.columns) - set(trained_feature_columns)
-        df.drop(columns=extra_cols, inplace=True)
-
-        # Reorder columns in the same order as training
-        df = df[trained_feature_columns]
-
-       # Convert everything to float (preparation for KSDrift)
-        df = df.astype(float)
-        
-       # Check data drift
-        drift_result = ks_drift_detector.predict(df.values)
-        is_drift = drift_result['data']['is_drift']
-        arr = np.atleast_1d(is_drift)        # if it is int it becomes array([0]) or array([1])
-        num_drifted_features = int(arr.sum())
-
-       # Update Prometheus metrics
-        ks_drift_metric.set(num_drifted_features)
-
-        drift_detected = num_drifted_features > 0
-        
-        if drift_detected:
-            drift_events_total.inc()
-            logger.warning(f'Drift detectado em {num_drifted_features} colunas.')
-            print("Drift Detected.....")
-            logger.info("Drift Detected.....")
-        else:
-            logger.info('Nenhum drift detectado.')
+
+        with stage('dashboard', 'parse'):
+          # Process numeric fields
+            for feature in NUMERIC_FIELDS:
+                value = request.form.get(feature)
+                if value:
+                    input_data[feature] = float(value) if '.' in value else int(value)
+                else:
+                    input_data[feature] = 0.0  # Default value
+
+            for feature in BINARY_FIELDS:
+                input_data[feature] = int(request.form.get(feature) or 0)
+
+           # Process categorical fields (keep as string)
+            for feature in CATEGORICAL_FIELDS:
+                input_data[feature] = request.form.get(feature)
+
+       # Encode straight into the training column order (derived fields, encoding
+       # and column alignment happen in this single pass)
+        with stage('dashboard', 'encode'):
+            vector = current.row_encoder.encode(input_data)
+            calculated_fields = current.row_encoder.derived_values(vector)
+
+       # Queue the vector for windowed drift detection (result of the latest window is shown)
+        with stage('dashboard', 'drift'):
+            current.drift_monitor.submit(vector)
+            drift_detected = current.drift_monitor.drift_detected
 
         #Prediction:
-        result = model.predict(df)[0]
+        _, result = predict_row(current, vector, 'dashboard')
         prediction_total_count.inc()  # Increment the prediction counter
         prediction = "🚨 At High Risk of Churning" if result == 1 else "✅ At Low Risk of Churn"
 
-    return render_template('dashboard.html', prediction=prediction, calculated=calculated_fields, drift_detected=drift_detected)
+    with stage('dashboard', 'render'):
+        return render_template('dashboard.html', prediction=prediction, calculated=calculated_fields, drift_detected=drift_detected)
+
+def predict_row(current, vector, endpoint):
+    """
+    Churn probability and label for one encoded row: from the prediction
+    cache if present, else through the micro-batcher when enabled (inline if
+    the batch does not finish within MICRO_BATCH_TIMEOUT).
+    """
+    if prediction_cache is not None:
+        with stage(endpoint, 'cache'):
+            cached = prediction_cache.get(vector, current.version)
+        if cached is not None:
+            return cached
+
+    # Includes the micro-batch wait
+    with stage(endpoint, 'predict'):
+        result = None
+        if current.micro_batcher is not None:
+            try:
+                result = current.micro_batcher.predict(vector, timeout=MICRO_BATCH_TIMEOUT)
+            except TimeoutError:
+                # The batcher thread is stuck or gone: never leave the request thread waiting
+                micro_batch_fallbacks_total.inc()
+                logger.warning(f"Micro-batch not scored within {MICRO_BATCH_TIMEOUT:.2f}s, scoring the row inline")
+        if result is None:
+            churn_proba, labels = current.predict_proba(vector.reshape(1, -1))
+            result = churn_proba[0], labels[0]
+
+    if prediction_cache is not None:
+        prediction_cache.put(vector, current.version, result)
+    return result
+
+
+def validate_batch_records(records, row_encoder=None):
+    """
+    Validates raw JSON records and returns the clean rows plus per-row errors.
+    Numbers must be finite, flags 0 or 1 and, given `row_encoder`, categories
+    known to the encoders. Rows with errors are left out of the scoring batch.
+    """
+    valid_rows, valid_index, errors = [], [], {}
+
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            errors[i] = ['record must be a JSON object']
+            continue
+
+        row, row_errors = {}, []
+        for feature in NUMERIC_FIELDS:
+            value = record.get(feature)
+            if value is None or value == '':
+                row_errors.append(f'{feature}: missing value')
+                continue
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                row_errors.append(f'{feature}: not a number ({value!r})')
+                continue
+            if math.isfinite(number):
+                row[feature] = number
+            else:
+                row_errors.append(f'{feature}: not a finite number ({value!r})')
+
+        for feature in BINARY_FIELDS:
+            value = record.get(feature)
+            if value is None or value == '':
+                row_errors.append(f'{feature}: missing value')
+            elif str(value) in ('0', '1', '0.0', '1.0'):
+                row[feature] = int(float(value))
+            else:
+                row_errors.append(f'{feature}: expected 0 or 1 ({value!r})')
+
+        for feature in CATEGORICAL_FIELDS:
+            value = record.get(feature)
+            if value is None or value == '':
+                row_errors.append(f'{feature}: missing value')
+            elif row_encoder is not None and not row_encoder.is_known(feature, str(value)):
+                row_errors.append(f'{feature}: unknown category ({value!r})')
+            else:
+                row[feature] = str(value)
+
+        if row_errors:
+            errors[i] = row_errors
+        else:
+            valid_rows.append(row)
+            valid_index.append(i)
+
+    return valid_rows, valid_index, errors
+
+
+@app.route('/predict', methods=['POST'])
+def predict():
+    if bundle is None:
+        return jsonify(error='Model is still loading'), 503
+    current = bundle
+
+    with stage('predict', 'parse'):
+        record = request.get_json(silent=True)
+        valid_rows, _, errors = validate_batch_records([record], current.row_encoder)
+    if errors:
+        return jsonify(errors=errors[0]), 400
+
+    with stage('predict', 'encode'):
+        vector = current.row_encoder.encode(valid_rows[0])
+    with stage('predict', 'drift'):
+        current.drift_monitor.submit(vector)
+
+    probability, label = predict_row(current, vector, 'predict')
+    prediction_total_count.inc()
+    return jsonify(probability=float(probability), label=int(label),
+                   drift_detected=current.drift_monitor.drift_detected)
+
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    if bundle is None:
+        return jsonify(error='Model is still loading'), 503
+    current = bundle
+
+    with stage('predict_batch', 'parse'):
+        payload = request.get_json(silent=True)
+    records = payload.get('records') if isinstance(payload, dict) else payload
+
+    if not isinstance(records, list):
+        return jsonify(error='Expected a JSON list of records or {"records": [...]}'), 400
+    if len(records) > MAX_BATCH_RECORDS:
+        return jsonify(error=f'Batch too large: {len(records)} records (max {MAX_BATCH_RECORDS})'), 413
+    prediction_batch_rows.labels('batch_api').observe(len(records))
+
+    with stage('predict_batch', 'validate'):
+        valid_rows, valid_index, errors = validate_batch_records(records, current.row_encoder)
+
+    results = [{'index': i, 'errors': errors.get(i)} for i in range(len(records))]
+    drift_detected = False
+
+    if valid_rows:
+        import pandas as pd
+        from src.feature_engineering import normalize_categories, add_derived_features
+
+        with stage('predict_batch', 'derive'):
+            df = pd.DataFrame(valid_rows, columns=NUMERIC_FIELDS + BINARY_FIELDS + CATEGORICAL_FIELDS)
+            df = normalize_categories(df, CATEGORICAL_FIELDS)
+            df = add_derived_features(df)
+        # Label encoding and alignment to the training column order
+        with stage('predict_batch', 'encode'):
+            X = current.row_encoder.encode_frame(df)
+
+        with stage('predict_batch', 'drift'):
+            current.drift_monitor.submit(X)
+            drift_detected = current.drift_monitor.drift_detected
+
+        with stage('predict_batch', 'predict'):
+            churn_proba, labels = current.predict_proba(X)
+        prediction_total_count.inc(len(X))
+
+        for i, p, label in zip(valid_index, churn_proba.tolist(), labels.tolist()):
+            results[i] = {'index': i, 'probability': p, 'label': int(label)}
+
+    logger.info(f'Batch prediction: {len(valid_rows)} scored, {len(errors)} rejected.',
+                extra={'scored': len(valid_rows), 'rejected': len(errors)})
+    with stage('predict_batch', 'serialize'):
+        return jsonify(
+            predictions=results,
+            scored=len(valid_rows),
+            rejected=len(errors),
+            drift_detected=drift_detected
+        )
 
 @app.route('/metrics')
 def metrics():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        # Aggregate the metric files written by all gunicorn workers
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
     return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
 
 if __name__ == '__main__':
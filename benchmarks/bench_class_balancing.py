@@ -0,0 +1,75 @@
+"""
+Time and peak memory of the class balancing strategies on processed frames.
+
+Each (rows, strategy) pair runs in a fresh process that builds a synthetic
+processed frame (compact dtypes, as DataProcessor saves it) and runs the
+balancing step of DataProcessor.balance_data on it. The peak heap is the
+largest amount of memory allocated during the call (tracemalloc, which
+sees numpy buffers), output included. For approx_smote, the recall of its
+neighbors against exact k-NN is measured on a sample of the minority class.
+
+Usage:
+    python -m benchmarks.bench_class_balancing --rows 100000 1000000
+    python -m benchmarks.bench_class_balancing --rows 1000000 --strategies approx_smote undersample
+"""
+import argparse
+import multiprocessing as mp
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.class_balancing import BALANCING_STRATEGIES, approximate_neighbors, balance
+
+
+def neighbor_recall(X, k=5, sample=2000, seed=42):
+    from sklearn.neighbors import NearestNeighbors
+    approx = approximate_neighbors(X, k, random_state=seed)
+    rows = np.random.default_rng(seed).choice(len(X), min(sample, len(X)), replace=False)
+    exact = NearestNeighbors(n_neighbors=k + 1).fit(X).kneighbors(X[rows], return_distance=False)[:, 1:]
+    return np.mean([len(set(a) & set(e)) / k for a, e in zip(approx[rows], exact)])
+
+
+def run(n_rows, strategy, results):
+    from benchmarks.synthetic_data import make_processed_frame
+    from utils.common_functions import downcast
+
+    df = downcast(make_processed_frame(n_rows)[0])
+    X, y = df.drop(columns='Churn'), df['Churn']
+    tracemalloc.start()
+    start = time.perf_counter()
+    X_resampled, _ = balance(X, y, {'strategy': strategy}, random_state=42)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+
+    recall = None
+    if strategy == 'approx_smote':
+        recall = neighbor_recall(X[y.to_numpy() == 1].to_numpy(dtype=np.float32))
+    results.put((len(X_resampled), seconds, peak, recall))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--strategies', nargs='+', choices=BALANCING_STRATEGIES, default=list(BALANCING_STRATEGIES))
+    args = parser.parse_args()
+
+    context = mp.get_context('spawn')
+    print(f"{'rows':>10} {'strategy':<13} {'rows out':>10} {'seconds':>8} {'peak heap MiB':>14} {'nn recall':>10}")
+    for n_rows in args.rows:
+        for strategy in args.strategies:
+            results = context.Queue()
+            process = context.Process(target=run, args=(n_rows, strategy, results))
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                print(f"{n_rows:>10,} {strategy:<13} failed (exit code {process.exitcode}, e.g. out of memory)")
+                continue
+            rows_out, seconds, peak, recall = results.get()
+            recall = f"{recall:.2f}" if recall is not None else '-'
+            print(f"{n_rows:>10,} {strategy:<13} {rows_out:>10,} {seconds:>8.1f} {peak:>14.0f} {recall:>10}")
+
+
+if __name__ == '__main__':
+    main()
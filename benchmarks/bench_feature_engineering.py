@@ -0,0 +1,80 @@
+"""
+Throughput of the derived-feature computation.
+
+Compares the previous row-wise implementation (DataFrame.apply for
+TotalServices) with src.feature_engineering.add_derived_features.
+
+Usage:
+    python -m benchmarks.bench_feature_engineering --sizes 10000 1000000 10000000
+"""
+import argparse
+import time
+
+from benchmarks.synthetic_data import make_raw_frame
+from src.feature_engineering import add_derived_features
+
+
+def legacy_derived_features(dataframe):
+    """Derived features as DataProcessor.process_data computed them before."""
+    dataframe['AvgMonthlySpend'] = dataframe['TotalCharges'] / (dataframe['tenure'] + 1)
+    dataframe['NoOnlineServices'] = (
+        (dataframe['OnlineSecurity'] == 'No').astype(int) +
+        (dataframe['OnlineBackup'] == 'No').astype(int) +
+        (dataframe['DeviceProtection'] == 'No').astype(int) +
+        (dataframe['TechSupport'] == 'No').astype(int)
+    )
+    dataframe['NoStreaming'] = (
+        (dataframe['StreamingTV'] == 'No').astype(int) +
+        (dataframe['StreamingMovies'] == 'No').astype(int)
+    )
+
+    def count_services(row):
+        count = 0
+        for col in ['PhoneService', 'MultipleLines', 'InternetService', 'OnlineSecurity',
+                    'OnlineBackup', 'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies']:
+            if 'No internet service' in str(row[col]) or 'No phone service' in str(row[col]):
+                continue
+            if row[col] in ['Yes', 'Fiber optic', 'DSL']:
+                count += 1
+        return count
+
+    dataframe['TotalServices'] = dataframe.apply(count_services, axis=1)
+    dataframe['RiskScore'] = (
+        (dataframe['Contract'] == 'Month-to-month').astype(int) +
+        (dataframe['OnlineSecurity'] == 'No').astype(int) +
+        (dataframe['TechSupport'] == 'No').astype(int) +
+        (dataframe['PaymentMethod'] == 'Electronic check').astype(int) +
+        (dataframe['tenure'] < 6).astype(int)
+    )
+    return dataframe
+
+
+def timed(func, dataframe):
+    start = time.perf_counter()
+    func(dataframe)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--legacy-max-rows', type=int, default=1_000_000,
+                        help='skip the row-wise baseline above this size (it takes minutes)')
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'legacy s':>10} {'legacy rows/s':>14} {'vector s':>10} {'vector rows/s':>14} {'speedup':>8}")
+    for n_rows in args.sizes:
+        raw = make_raw_frame(n_rows)
+        raw['TotalCharges'] = raw['MonthlyCharges'] * raw['tenure']
+
+        vector_s = timed(add_derived_features, raw.copy())
+        if n_rows <= args.legacy_max_rows:
+            legacy_s = timed(legacy_derived_features, raw.copy())
+            print(f"{n_rows:>12,} {legacy_s:>10.3f} {n_rows / legacy_s:>14,.0f} "
+                  f"{vector_s:>10.3f} {n_rows / vector_s:>14,.0f} {legacy_s / vector_s:>7.1f}x")
+        else:
+            print(f"{n_rows:>12,} {'-':>10} {'-':>14} {vector_s:>10.3f} {n_rows / vector_s:>14,.0f} {'-':>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Latency of RandomForestClassifier.predict vs. the flattened FlatForest engine.
+
+Trains a forest on synthetic processed data (or loads --model) and checks
+that both engines return identical predictions before timing them.
+
+Usage:
+    python -m benchmarks.bench_forest_engine --trees 600 --batch-sizes 1 10 100 1000 10000 100000
+    python -m benchmarks.bench_forest_engine --model artifacts/model/best_random_forest.pkl
+"""
+import argparse
+import time
+import warnings
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from benchmarks.synthetic_data import make_processed_frame
+from src.forest_engine import FlatForest
+
+warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+
+def best_time(func, X, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(X)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', help='pickled RandomForestClassifier (default: train one)')
+    parser.add_argument('--trees', type=int, default=200)
+    parser.add_argument('--max-depth', type=int, default=None)
+    parser.add_argument('--train-rows', type=int, default=20_000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 1000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    if args.model:
+        forest = joblib.load(args.model)
+        feature_columns = list(forest.feature_names_in_)
+    else:
+        train, _, feature_columns = make_processed_frame(args.train_rows)
+        forest = RandomForestClassifier(n_estimators=args.trees, max_depth=args.max_depth, random_state=42)
+        forest.fit(train[feature_columns], train['Churn'])
+
+    start = time.perf_counter()
+    flat = FlatForest.from_sklearn(forest)
+    print(f"export: {time.perf_counter() - start:.2f}s, {flat.n_trees} trees, {flat.n_nodes:,} nodes, "
+          f"max depth {flat.max_depth}")
+
+    X_all = make_processed_frame(max(args.batch_sizes), seed=7)[0][feature_columns].to_numpy(dtype=np.float64)
+    assert np.array_equal(forest.predict_proba(X_all[:10_000]), flat.predict_proba(X_all[:10_000]))
+
+    print(f"{'batch':>8} {'sklearn ms':>12} {'flat ms':>10} {'speedup':>8}")
+    for batch_size in args.batch_sizes:
+        X = X_all[:batch_size]
+        repeats = 20 if batch_size <= 1000 else 3
+        sk = best_time(forest.predict, X, repeats)
+        fl = best_time(flat.predict, X, repeats)
+        print(f"{batch_size:>8,} {sk * 1e3:>12.3f} {fl * 1e3:>10.3f} {sk / fl:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
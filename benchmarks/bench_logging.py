@@ -0,0 +1,101 @@
+"""
+Per-call cost of logging on the request thread: the former synchronous
+FileHandler (text format, written and flushed by the caller) vs. the queue
+handler of utils/logger.py (JSON encoded and written by a background
+thread), alone and with a rate-limited logger dropping most records.
+
+Every mode logs --calls messages like the serving app does per request,
+from --threads threads at once, into a file in a temporary directory:
+back to back by default, or paced at --rate calls per second in total
+(request traffic). The time reported is spent inside the logging call on
+the calling threads (mean and p99); the queue modes then wait for the
+writer to drain, and the lines in the file show what was written (the
+rest was rate limited or dropped on a full queue).
+
+Usage:
+    python -m benchmarks.bench_logging --calls 100000 --threads 1 8
+    python -m benchmarks.bench_logging --calls 100000 --threads 8 --rate 20000
+"""
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from utils.logger import JsonFormatter, RateLimitFilter, start_queue_logging
+
+MODES = ['sync-file', 'queue-json', 'queue-json-rate-limited']
+
+
+def make_logger(mode, path):
+    logger = logging.getLogger(f"bench.{mode}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    file_handler = logging.FileHandler(path)
+    if mode == 'sync-file':
+        # As logging.basicConfig(filename=...) set it up before
+        file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logger.addHandler(file_handler)
+        return logger, None
+    file_handler.setFormatter(JsonFormatter())
+    handler, listener = start_queue_logging(file_handler)
+    logger.addHandler(handler)
+    if mode == 'queue-json-rate-limited':
+        logger.addFilter(RateLimitFilter(100))
+    return logger, listener
+
+
+def log_requests(logger, calls, interval, durations):
+    next_call = time.perf_counter()
+    for i in range(calls):
+        if interval:
+            next_call += interval
+            time.sleep(max(0.0, next_call - time.perf_counter()))
+        start = time.perf_counter()
+        logger.info(f'Nenhum drift detectado (janela de {i} linhas).')
+        durations.append(time.perf_counter() - start)
+
+
+def run_mode(mode, calls, n_threads, rate, directory):
+    path = os.path.join(directory, f"{mode}-{n_threads}.log")
+    logger, listener = make_logger(mode, path)
+    per_thread = calls // n_threads
+    interval = n_threads / rate if rate else 0.0
+    durations = [[] for _ in range(n_threads)]
+    threads = [threading.Thread(target=log_requests, args=(logger, per_thread, interval, durations[i]))
+               for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if listener is not None:
+        listener.stop()
+    for handler in list(logger.handlers) + (list(listener.handlers) if listener else []):
+        handler.close()
+    logger.handlers.clear()
+    with open(path) as f:
+        lines = sum(1 for _ in f)
+    micros = np.concatenate(durations) * 1e6
+    return micros.mean(), np.percentile(micros, 99), lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=100_000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--rate', type=float, default=0, help='total calls per second (0: back to back)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'mode':<26} {'threads':>7} {'mean us':>8} {'p99 us':>8} {'lines written':>14}")
+        for n_threads in args.threads:
+            for mode in MODES:
+                mean, p99, lines = run_mode(mode, args.calls, n_threads, args.rate, directory)
+                print(f"{mode:<26} {n_threads:>7} {mean:>8.2f} {p99:>8.2f} {lines:>14,}")
+
+
+if __name__ == '__main__':
+    main()
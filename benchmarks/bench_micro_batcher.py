@@ -0,0 +1,89 @@
+"""
+Throughput and latency of single-row scoring, one predict call per request vs.
+the adaptive MicroBatcher, with N concurrent client threads in one process
+(as with gunicorn gthread workers).
+
+Usage:
+    python -m benchmarks.bench_micro_batcher --trees 200 --clients 1 4 16 64 --seconds 5
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from benchmarks.synthetic_data import make_processed_frame
+from src.forest_engine import FlatForest
+from src.micro_batcher import MicroBatcher
+
+
+def make_predict_fn(model):
+    # Same contract as ServingBundle.predict_proba
+    def predict_fn(X):
+        proba = model.predict_proba(X)
+        return proba[:, 1], model.classes_.take(np.argmax(proba, axis=1))
+    return predict_fn
+
+
+def run_clients(score, rows, n_clients, seconds):
+    latencies = [[] for _ in range(n_clients)]
+    stop_at = time.perf_counter() + seconds
+
+    def client(k):
+        i = k
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            score(rows[i % len(rows)])
+            latencies[k].append(time.perf_counter() - start)
+            i += n_clients
+
+    threads = [threading.Thread(target=client, args=(k,)) for k in range(n_clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = np.concatenate([np.array(lat) for lat in latencies]) * 1e3
+    return len(all_latencies) / elapsed, np.percentile(all_latencies, 50), np.percentile(all_latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--trees', type=int, default=200)
+    parser.add_argument('--max-depth', type=int, default=None)
+    parser.add_argument('--train-rows', type=int, default=5_000)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    parser.add_argument('--latency-budget-ms', type=float, default=50.0)
+    args = parser.parse_args()
+
+    train, _, feature_columns = make_processed_frame(args.train_rows)
+    forest = RandomForestClassifier(n_estimators=args.trees, max_depth=args.max_depth, random_state=42)
+    forest.fit(train[feature_columns].to_numpy(), train['Churn'])
+    predict_fn = make_predict_fn(FlatForest.from_sklearn(forest))
+    rows = make_processed_frame(1000, seed=7)[0][feature_columns].to_numpy(dtype=np.float64)
+
+    def direct(vector):
+        churn_proba, labels = predict_fn(vector.reshape(1, -1))
+        return churn_proba[0], labels[0]
+
+    print(f"{'clients':>8} {'mode':>8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'avg batch':>10} {'wait ms':>8}")
+    for n_clients in args.clients:
+        qps, p50, p99 = run_clients(direct, rows, n_clients, args.seconds)
+        print(f"{n_clients:>8} {'direct':>8} {qps:>9.0f} {p50:>8.2f} {p99:>8.2f} {1:>10.1f} {'-':>8}")
+
+        batcher = MicroBatcher(predict_fn, max_batch_size=args.max_batch_size,
+                               max_wait_ms=args.max_wait_ms, latency_budget_ms=args.latency_budget_ms)
+        qps, p50, p99 = run_clients(batcher.predict, rows, n_clients, args.seconds)
+        print(f"{n_clients:>8} {'batched':>8} {qps:>9.0f} {p50:>8.2f} {p99:>8.2f} "
+              f"{batcher.rows / max(batcher.batches, 1):>10.1f} {batcher.wait_ms:>8.2f}")
+        batcher.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Per-worker memory of the serving model: pickled sklearn forest vs. the flat
+forest, loaded into the heap or memory-mapped, at full or reduced precision.
+
+For each format, forks N workers (like gunicorn without preload_app). Each
+worker loads the model, scores --score-rows rows so the mapped pages are
+actually touched, and reports its RSS and PSS from /proc/self/smaps_rollup
+while all N workers are alive. PSS splits shared pages between the processes
+mapping them, so it is the real per-worker cost. Linux only.
+
+Usage:
+    python -m benchmarks.bench_model_memory --trees 600 --workers 1 4 16
+    python -m benchmarks.bench_model_memory --model artifacts/model/best_random_forest.pkl
+"""
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import tempfile
+import threading
+import warnings
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from benchmarks.synthetic_data import make_processed_frame
+from src.forest_engine import FlatForest
+
+warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+FORMATS = ['joblib', 'flat', 'flat-mmap', 'flat-mmap-compact']
+
+
+def memory_mib():
+    with open('/proc/self/smaps_rollup') as f:
+        fields = {line.split(':')[0]: line.split()[1] for line in f if line.split()[-1] == 'kB'}
+    return int(fields['Rss']) / 1024, int(fields['Pss']) / 1024
+
+
+def load(fmt, paths):
+    if fmt == 'joblib':
+        return joblib.load(paths['joblib'])
+    if fmt == 'flat':
+        return FlatForest.load(paths['flat'])
+    if fmt == 'flat-mmap':
+        return FlatForest.load(paths['flat'], mmap_mode='r')
+    return FlatForest.load(paths['compact'], mmap_mode='r')
+
+
+def worker(fmt, paths, X, barrier, results):
+    before = memory_mib()
+    model = load(fmt, paths)
+    model.predict_proba(X)
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        return
+    rss, pss = memory_mib()
+    results.put((before[0], rss, pss))
+    barrier.wait()
+
+
+def measure(fmt, paths, X, n_workers):
+    ctx = mp.get_context('fork')
+    # The timeout keeps a worker killed by the OOM killer from hanging the rest
+    barrier = ctx.Barrier(n_workers, timeout=600)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(fmt, paths, X, barrier, results)) for _ in range(n_workers)]
+    for proc in procs:
+        proc.start()
+    try:
+        rows = [results.get(timeout=900) for _ in procs]
+    except queue.Empty:
+        rows = None
+    for proc in procs:
+        proc.join()
+    if rows is None or any(proc.exitcode for proc in procs):
+        return None
+    return np.mean(rows, axis=0)
+
+
+def export_artifacts(args, paths):
+    if args.model:
+        forest = joblib.load(args.model)
+        feature_columns = list(forest.feature_names_in_)
+    else:
+        train, _, feature_columns = make_processed_frame(args.train_rows)
+        forest = RandomForestClassifier(n_estimators=args.trees, max_depth=args.max_depth,
+                                        random_state=42, n_jobs=-1)
+        forest.fit(train[feature_columns], train['Churn'])
+
+    joblib.dump(forest, paths['joblib'])
+    flat = FlatForest.from_sklearn(forest)
+    flat.save(paths['flat'])
+    flat.save(paths['compact'], threshold_dtype='float32', value_dtype='uint16')
+    with open(os.path.join(os.path.dirname(paths['flat']), 'feature_columns.txt'), 'w') as f:
+        f.write(' '.join(feature_columns))
+
+    print(f"{flat.n_trees} trees, {flat.n_nodes:,} nodes; on disk: "
+          f"pickle {os.path.getsize(paths['joblib']) / 2**20:.1f} MiB, "
+          f"flat {flat.nbytes / 2**20:.1f} MiB, "
+          f"compact {FlatForest.load(paths['compact']).nbytes / 2**20:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', help='pickled RandomForestClassifier (default: train one)')
+    parser.add_argument('--trees', type=int, default=600)
+    parser.add_argument('--max-depth', type=int, default=None)
+    parser.add_argument('--train-rows', type=int, default=5_000)
+    parser.add_argument('--score-rows', type=int, default=5_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=FORMATS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {
+            'joblib': os.path.join(tmp, 'forest.pkl'),
+            'flat': os.path.join(tmp, 'flat_forest'),
+            'compact': os.path.join(tmp, 'flat_forest_compact'),
+        }
+        # Train/export in a child so the forked workers start from a lean parent
+        ctx = mp.get_context('fork')
+        export = ctx.Process(target=export_artifacts, args=(args, paths))
+        export.start()
+        export.join()
+        with open(os.path.join(tmp, 'feature_columns.txt')) as f:
+            feature_columns = f.read().split()
+        X = make_processed_frame(args.score_rows, seed=7)[0][feature_columns].to_numpy(dtype=np.float64)
+
+        print(f"{'format':>18} {'workers':>8} {'base RSS':>9} {'RSS/worker':>11} {'PSS/worker':>11} {'PSS total':>10}",
+              flush=True)
+        for fmt in args.formats:
+            for n_workers in args.workers:
+                result = measure(fmt, paths, X, n_workers)
+                if result is None:
+                    print(f"{fmt:>18} {n_workers:>8}   a worker died (out of memory?)", flush=True)
+                    continue
+                base, rss, pss = result
+                print(f"{fmt:>18} {n_workers:>8} {base:>8.1f}M {rss:>10.1f}M {pss:>10.1f}M "
+                      f"{pss * n_workers:>9.1f}M", flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+I/O cost of the training pipeline's hand-offs: CSV vs. Parquet vs. Feather.
+
+Replays the file writes and reads between stages with synthetic data:
+ingestion save -> split (load raw, save train/test) -> processing (load
+train/test, save processed) -> training load. Processing itself is not
+timed. Each format runs in a fresh process. Peak heap is the largest growth
+of anonymous memory (RssAnon) over the frames already in memory while the
+hops run. Memory-mapped pages of Feather files are page cache and do not count.
+
+Usage:
+    python -m benchmarks.bench_pipeline_io --rows 1000000
+    python -m benchmarks.bench_pipeline_io --rows 7043 --formats csv feather
+"""
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import threading
+import time
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from benchmarks.synthetic_data import make_processed_frame, make_raw_frame
+from utils.common_functions import categorize, load_data, save_frame
+
+FORMATS = ['csv', 'parquet', 'feather']
+HOPS = ['ingest', 'split', 'process', 'train']
+
+
+def anon_mib():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('RssAnon:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class PeakSampler:
+    def __init__(self):
+        self.base = anon_mib()
+        self.peak = self.base
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(0.001):
+            self.peak = max(self.peak, anon_mib())
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        return max(self.peak, anon_mib()) - self.base
+
+
+def run_format(fmt, directory, results):
+    path = lambda name: os.path.join(directory, f"{name}.{fmt}")
+    # Inputs as the stages hold them in memory (untimed)
+    raw = pd.read_csv(os.path.join(directory, 'raw_input.csv'))
+    processed = pd.read_csv(os.path.join(directory, 'processed_input.csv'))
+    processed_train, processed_test = train_test_split(processed, test_size=0.2, random_state=42)
+
+    timings = {}
+    sampler = PeakSampler()
+
+    start = time.perf_counter()
+    save_frame(raw if fmt == 'csv' else categorize(raw.copy()), path('raw'))
+    timings['ingest'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    data = load_data(path('raw'))
+    train, test = train_test_split(data, test_size=0.2, random_state=42, stratify=data['Churn'])
+    save_frame(train, path('train'))
+    save_frame(test, path('test'))
+    timings['split'] = time.perf_counter() - start
+    del data, train, test
+
+    start = time.perf_counter()
+    train, test = load_data(path('train')), load_data(path('test'))
+    save_frame(processed_train, path('processed_train'))
+    save_frame(processed_test, path('processed_test'))
+    timings['process'] = time.perf_counter() - start
+    del train, test
+
+    start = time.perf_counter()
+    train, test = load_data(path('processed_train'), zero_copy=True), load_data(path('processed_test'), zero_copy=True)
+    X_train = train.drop(columns='Churn')
+    timings['train'] = time.perf_counter() - start
+    del train, test, X_train
+
+    peak = sampler.stop()
+    size = sum(os.path.getsize(path(name)) for name in
+               ['raw', 'train', 'test', 'processed_train', 'processed_test'])
+    results.put((fmt, timings, peak, size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=FORMATS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        make_raw_frame(args.rows).to_csv(os.path.join(directory, 'raw_input.csv'), index=False)
+        make_processed_frame(args.rows)[0].to_csv(os.path.join(directory, 'processed_input.csv'), index=False)
+
+        print(f"{args.rows:,} rows")
+        print(f"{'format':<8} " + ' '.join(f"{hop + ' s':>10}" for hop in HOPS) +
+              f" {'total s':>9} {'peak heap MiB':>14} {'disk MiB':>9}")
+        context = mp.get_context('spawn')
+        for fmt in args.formats:
+            results = context.Queue()
+            process = context.Process(target=run_format, args=(fmt, directory, results))
+            process.start()
+            fmt, timings, peak, size = results.get()
+            process.join()
+            print(f"{fmt:<8} " + ' '.join(f"{timings[hop]:>10.2f}" for hop in HOPS) +
+                  f" {sum(timings.values()):>9.2f} {peak:>14.0f} {size / 2**20:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
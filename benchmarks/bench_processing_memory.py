@@ -0,0 +1,140 @@
+"""
+Peak memory of processing plus training with wide (int64/float64) vs.
+compact (uint8/float32) processed frames.
+
+Replays DataProcessor on synthetic raw splits stored like the pipeline's
+(categorized Feather): process_data, SMOTE (balance_data), save, then the
+zero-copy load of ModelTrainer.load_data and a forest fit. Each mode runs
+in a fresh process, so the peak RSS (ru_maxrss) covers only that mode; the
+baseline after imports is reported next to it. Linux only.
+
+The balancing step follows balancing_config unless --balancing is given
+(exact SMOTE does not finish in reasonable time on 5M rows).
+
+Usage:
+    python -m benchmarks.bench_processing_memory --rows 1000000
+    python -m benchmarks.bench_processing_memory --rows 5000000 --balancing approx_smote
+    python -m benchmarks.bench_processing_memory --rows 100000 --modes compact --trees 50
+"""
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import tempfile
+import time
+import warnings
+
+from sklearn.model_selection import train_test_split
+
+from src.class_balancing import BALANCING_STRATEGIES
+
+MODES = ['wide', 'compact']
+
+
+def rss_mib():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def write_raw_splits(n_rows, directory, slice_rows=1_000_000):
+    import pyarrow as pa
+    from pyarrow import feather
+    from benchmarks.synthetic_data import make_raw_frame
+    from utils.common_functions import categorize
+
+    # Generated and split slice by slice (same categories in every slice),
+    # so 10M rows of raw text fit in memory
+    splits, categories = {'train': [], 'test': []}, None
+    for start in range(0, n_rows, slice_rows):
+        data = make_raw_frame(min(slice_rows, n_rows - start), seed=42 + start)
+        data['customerID'] = [f'{i:08d}-SYNT' for i in range(start, start + len(data))]
+        data = categorize(data)
+        if categories is None:
+            categories = {col: data[col].cat.categories for col in data.select_dtypes('category')}
+        for col, values in categories.items():
+            data[col] = data[col].cat.set_categories(values)
+        train, test = train_test_split(data, test_size=0.2, random_state=42, stratify=data['Churn'])
+        splits['train'].append(pa.Table.from_pandas(train, preserve_index=False))
+        splits['test'].append(pa.Table.from_pandas(test, preserve_index=False))
+        del data, train, test
+    for name, tables in splits.items():
+        feather.write_feather(pa.concat_tables(tables), os.path.join(directory, f'{name}.feather'),
+                              compression='uncompressed')
+
+
+def run_mode(mode, directory, trees, max_depth, balancing, results):
+    from sklearn.ensemble import RandomForestClassifier
+    from config.paths_config import CONFIG_PATH
+    from src.data_processing import DataProcessor
+    from utils.common_functions import load_data
+    warnings.filterwarnings('ignore', category=FutureWarning)
+
+    path = lambda name: os.path.join(directory, f"{name}.feather")
+    baseline = rss_mib()
+    processor = DataProcessor(path('train'), path('test'), directory, CONFIG_PATH)
+    processor.compact_dtypes = mode == 'compact'
+    if balancing:
+        processor.balancing_config = {**processor.balancing_config, 'strategy': balancing}
+
+    start = time.perf_counter()
+    train_df, encoders = processor.process_data(load_data(path('train')), dataset_name="train")
+    test_df, _ = processor.process_data(load_data(path('test')), dataset_name="test", encoders=encoders)
+    train_df = processor.balance_data(train_df, dataset_name="train")
+    test_df = processor.balance_data(test_df, dataset_name="test")
+    frame_mib = train_df.memory_usage().sum() / 2**20
+    processor.save_data(train_df, path(f'processed_train_{mode}'))
+    processor.save_data(test_df, path(f'processed_test_{mode}'))
+    del train_df, test_df
+    process_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # As ModelTrainer.load_data
+    train_df = load_data(path(f'processed_train_{mode}'), zero_copy=True)
+    X_train, y_train = train_df.drop(columns='Churn'), train_df['Churn']
+    RandomForestClassifier(n_estimators=trees, max_depth=max_depth, random_state=42, n_jobs=1).fit(X_train, y_train)
+    train_seconds = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put((mode, process_seconds, train_seconds, baseline, peak, frame_mib))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--trees', type=int, default=10)
+    parser.add_argument('--max-depth', type=int, default=12)
+    parser.add_argument('--balancing', choices=BALANCING_STRATEGIES, help='default: balancing_config.strategy')
+    args = parser.parse_args()
+
+    context = mp.get_context('spawn')
+    with tempfile.TemporaryDirectory() as directory:
+        writer = context.Process(target=write_raw_splits, args=(args.rows, directory))
+        writer.start()
+        writer.join()
+        if writer.exitcode != 0:
+            raise SystemExit(f"writing the raw splits failed (exit code {writer.exitcode})")
+
+        print(f"{args.rows:,} rows, {args.trees} trees (max_depth {args.max_depth}), "
+              f"balancing: {args.balancing or 'balancing_config'}")
+        print(f"{'mode':<8} {'process s':>10} {'train s':>8} {'baseline MiB':>13} {'peak RSS MiB':>13} "
+              f"{'train frame MiB':>16}")
+        for mode in args.modes:
+            results = context.Queue()
+            process = context.Process(target=run_mode,
+                                      args=(mode, directory, args.trees, args.max_depth, args.balancing, results))
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                print(f"{mode:<8} failed (exit code {process.exitcode}, e.g. killed when out of memory)")
+                continue
+            mode, process_seconds, train_seconds, baseline, peak, frame_mib = results.get()
+            print(f"{mode:<8} {process_seconds:>10.1f} {train_seconds:>8.1f} {baseline:>13.0f} {peak:>13.0f} "
+                  f"{frame_mib:>16.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Single-row encode latency: DataFrame path vs. compiled RowEncoder.
+
+The DataFrame path is what /dashboard did per request (build a one-row
+DataFrame, derive features, label-encode, align and cast columns).
+
+Usage:
+    python -m benchmarks.bench_row_encoder --iterations 2000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import make_processed_frame, make_records
+from src.feature_engineering import normalize_categories, add_derived_features, encode_features
+from src.row_encoder import RowEncoder
+
+
+def dataframe_path(record, encoders, feature_columns):
+    df = pd.DataFrame([record])
+    df = normalize_categories(df, df.columns)
+    df = add_derived_features(df)
+    return encode_features(df, encoders, feature_columns).to_numpy()[0]
+
+
+def latencies(func, records, iterations):
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        record = records[i % len(records)]
+        start = time.perf_counter()
+        func(record)
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    _, encoders, feature_columns = make_processed_frame(5000)
+    records = make_records(500, seed=7)
+    row_encoder = RowEncoder(encoders, feature_columns)
+    buffer = np.empty(row_encoder.n_features)
+
+    for record in records[:50]:
+        np.testing.assert_allclose(row_encoder.encode(record), dataframe_path(record, encoders, feature_columns))
+
+    paths = {
+        'DataFrame path': lambda r: dataframe_path(r, encoders, feature_columns),
+        'RowEncoder': row_encoder.encode,
+        'RowEncoder (out=)': lambda r: row_encoder.encode(r, out=buffer),
+    }
+    print(f"{'path':<20} {'p50 us':>10} {'p99 us':>10} {'mean us':>10}")
+    for name, func in paths.items():
+        t = latencies(func, records, args.iterations)
+        print(f"{name:<20} {np.percentile(t, 50):>10.1f} {np.percentile(t, 99):>10.1f} {t.mean():>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Cold-start breakdown of the serving app.
+
+Starts fresh interpreters that import application.py and wait until the
+model is warm, then reports the median of each phase:
+    interpreter  - process spawn until the child script runs
+    import       - importing application.py (Flask app importable, /healthz answers)
+    load_model / load_encoders / load_reference - artifact loading
+    warm_up      - first single-row + small-batch prediction
+    ready_after  - import start until /ready turns 200
+Requires the serving artifacts under artifacts/.
+
+Usage:
+    python -m benchmarks.bench_startup --runs 5 [--importtime]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CHILD = """
+import json, time
+t0 = time.perf_counter()
+import application
+t_import = time.perf_counter() - t0
+application.wait_until_ready()
+print(json.dumps({'child_started': t0, 'import_application': t_import, **application.startup_timings}))
+"""
+
+
+def run_once(importtime=False):
+    cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', CHILD]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=os.getcwd())
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['total_wall'] = wall
+    result['interpreter'] = wall - result['ready_after']
+    return result, proc.stderr
+
+
+def top_imports(stderr, limit=10):
+    # "import time: self [us] | cumulative | imported package", top-level packages only
+    rows = []
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = [part.strip() for part in line[len('import time:'):].split('|')]
+            if cumulative.isdigit() and not name.startswith(' ') and '.' not in name:
+                rows.append((int(cumulative), name))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--importtime', action='store_true', help='also list the slowest top-level imports')
+    args = parser.parse_args()
+
+    results = [run_once()[0] for _ in range(args.runs)]
+    phases = ['interpreter', 'import', 'load_model', 'load_encoders', 'load_reference',
+              'warm_up', 'ready_after', 'total_wall']
+    print(f"{'phase':<16} {'median s':>10} {'min s':>10}")
+    for phase in phases:
+        values = [r[phase] for r in results if phase in r]
+        if values:
+            print(f"{phase:<16} {statistics.median(values):>10.3f} {min(values):>10.3f}")
+
+    if args.importtime:
+        _, stderr = run_once(importtime=True)
+        print("\nslowest imports (cumulative ms):")
+        for cumulative, name in top_imports(stderr):
+            print(f"  {name:<28} {cumulative / 1000:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
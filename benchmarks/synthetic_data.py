@@ -0,0 +1,88 @@
+"""
+Synthetic Telco-like customer data for benchmarks.
+
+Generates raw rows with the same columns and category levels as
+Telco-Customer-Churn.csv so the pipeline components can be exercised
+at arbitrary sizes without the real dataset.
+"""
+import numpy as np
+import pandas as pd
+
+YES_NO = ['Yes', 'No']
+INTERNET_DEPENDENT = ['Yes', 'No', 'No internet service']
+
+CATEGORIES = {
+    'gender': ['Male', 'Female'],
+    'Partner': YES_NO,
+    'Dependents': YES_NO,
+    'PhoneService': YES_NO,
+    'MultipleLines': ['Yes', 'No', 'No phone service'],
+    'InternetService': ['DSL', 'Fiber optic', 'No'],
+    'OnlineSecurity': INTERNET_DEPENDENT,
+    'OnlineBackup': INTERNET_DEPENDENT,
+    'DeviceProtection': INTERNET_DEPENDENT,
+    'TechSupport': INTERNET_DEPENDENT,
+    'StreamingTV': INTERNET_DEPENDENT,
+    'StreamingMovies': INTERNET_DEPENDENT,
+    'Contract': ['Month-to-month', 'One year', 'Two year'],
+    'PaperlessBilling': YES_NO,
+    'PaymentMethod': ['Electronic check', 'Mailed check',
+                      'Bank transfer (automatic)', 'Credit card (automatic)'],
+}
+
+
+def make_raw_frame(n_rows, seed=42):
+    """
+    Returns a raw (unprocessed) DataFrame with n_rows synthetic customers.
+    """
+    rng = np.random.default_rng(seed)
+
+    df = pd.DataFrame({'customerID': [f'{i:07d}-SYNT' for i in range(n_rows)]})
+    for col, levels in CATEGORIES.items():
+        df[col] = pd.Categorical.from_codes(rng.integers(0, len(levels), n_rows), levels).astype(object)
+
+    df['SeniorCitizen'] = rng.integers(0, 2, n_rows)
+    df['tenure'] = rng.integers(0, 73, n_rows)
+    df['MonthlyCharges'] = rng.uniform(18.0, 120.0, n_rows).round(2)
+    total = (df['MonthlyCharges'] * df['tenure']).round(2).astype(str)
+    total[df['tenure'] == 0] = ' '
+    df['TotalCharges'] = total
+
+    risk = (
+        (df['Contract'] == 'Month-to-month').astype(float) +
+        (df['PaymentMethod'] == 'Electronic check').astype(float) +
+        (df['tenure'] < 12).astype(float)
+    )
+    df['Churn'] = np.where(rng.random(n_rows) < 0.1 + 0.15 * risk, 'Yes', 'No')
+    return df
+
+
+def make_records(n_rows, seed=42):
+    """
+    Returns n_rows raw customers as JSON-style dicts (serving payload format).
+    """
+    df = make_raw_frame(n_rows, seed=seed).drop(columns=['customerID', 'gender', 'Churn'])
+    df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce').fillna(0.0)
+    return df.to_dict(orient='records')
+
+
+def make_processed_frame(n_rows, seed=42):
+    """
+    Processes a synthetic raw frame the way DataProcessor.process_data does
+    (without SMOTE) and returns (processed_df, label_encoders, feature_columns).
+    """
+    from sklearn.preprocessing import LabelEncoder
+    from src.feature_engineering import add_derived_features
+
+    df = make_raw_frame(n_rows, seed=seed).drop(columns=['customerID', 'gender'])
+    df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce')
+    df['TotalCharges'] = df['TotalCharges'].fillna(df['TotalCharges'].median())
+    df = add_derived_features(df)
+
+    encoders = {}
+    for col in df.select_dtypes(include='object').columns:
+        encoders[col] = LabelEncoder()
+        df[col] = encoders[col].fit_transform(df[col])
+
+    feature_columns = [col for col in df.columns if col != 'Churn']
+    return df, encoders, feature_columns
@@ -16,20 +16,51 @@ CONFIG_PATH = os.path.join(PROJECT_ROOT, 'config', 'config.yml')
 # Directories and data files
 RAW_DATA_DIR = os.path.join(PROJECT_ROOT, 'artifacts', 'data')
 RAW_DATA = os.path.join(RAW_DATA_DIR, 'Telco-Customer-Churn.csv')
+# Typed copy of RAW_DATA written by the ingestion; the stages below exchange Feather files
+RAW_DATA_FRAME = os.path.join(RAW_DATA_DIR, 'Telco-Customer-Churn.feather')
 
-RAW_DATA_TRAIN = os.path.join(RAW_DATA_DIR,'train.csv') 
-RAW_DATA_TEST = os.path.join(RAW_DATA_DIR,'test.csv')
+RAW_DATA_TRAIN = os.path.join(RAW_DATA_DIR,'train.feather') 
+RAW_DATA_TEST = os.path.join(RAW_DATA_DIR,'test.feather')
 
 PROCESS_DATA_DIR = os.path.join(PROJECT_ROOT, 'artifacts','processed' )
-PROCESSED_TRAIN_DATA_PATH = os.path.join(PROCESS_DATA_DIR,'processed_train.csv')
-PROCESSED_TEST_DATA_PATH = os.path.join(PROCESS_DATA_DIR,'processed_test.csv')
+# Label-encoded splits before SMOTE (output of the process stage, input of the balance stage)
+ENCODED_TRAIN_DATA_PATH = os.path.join(PROCESS_DATA_DIR,'encoded_train.feather')
+ENCODED_TEST_DATA_PATH = os.path.join(PROCESS_DATA_DIR,'encoded_test.feather')
+PROCESSED_TRAIN_DATA_PATH = os.path.join(PROCESS_DATA_DIR,'processed_train.feather')
+PROCESSED_TEST_DATA_PATH = os.path.join(PROCESS_DATA_DIR,'processed_test.feather')
+# Encoded feature rows by customerID, reused by the incremental process stage (version in feature_store.json)
+FEATURE_STORE_PATH = os.path.join(PROCESS_DATA_DIR,'feature_store.feather')
 
 ENCODER_DIR = os.path.join(PROJECT_ROOT, 'artifacts', 'encoders')
 ENCODER_PATH = os.path.join(ENCODER_DIR, 'label_encoders.pkl')
+ENCODER_TABLES_PATH = os.path.join(ENCODER_DIR, 'encoder_tables.npz')
+
+# Fingerprints of the last run of each training pipeline stage
+STAGE_CACHE_PATH = os.path.join(PROJECT_ROOT, 'artifacts', 'stage_cache.json')
 
 # ------------------------------------------------------
 # Model directory
 # ------------------------------------------------------
 MODEL_DIR = os.path.join(PROJECT_ROOT, 'artifacts', 'model')
 MODEL_PATH = os.path.join(MODEL_DIR, 'best_random_forest.pkl')
-FEATURES_PATH = os.path.join(MODEL_DIR, 'feature_columns.pkl')
\ No newline at end of file
+FLAT_MODEL_DIR = os.path.join(MODEL_DIR, 'flat_forest')
+FEATURES_PATH = os.path.join(MODEL_DIR, 'feature_columns.pkl')
+REFERENCE_SKETCH_PATH = os.path.join(MODEL_DIR, 'reference_sketch.npz')
+# Written last by ModelTrainer: the version of every serving artifact of a complete bundle
+BUNDLE_MANIFEST_PATH = os.path.join(MODEL_DIR, 'bundle_manifest.json')
+# Medians of the raw numeric inputs in the training split before balancing (missing values in bulk scoring)
+FILL_VALUES_PATH = os.path.join(MODEL_DIR, 'fill_values.json')
+
+# Work queue of the distributed hyperparameter search (on the volume shared by the training pods)
+SEARCH_QUEUE_PATH = os.path.join(PROJECT_ROOT, 'artifacts', 'search', 'search_queue.db')
+
+# ------------------------------------------------------
+# Serving diagnostics
+# ------------------------------------------------------
+PROFILE_DIR = os.path.join(PROJECT_ROOT, 'logs', 'profiles')
+
+# ------------------------------------------------------
+# Offline scoring
+# ------------------------------------------------------
+BATCH_SCORES_DIR = os.path.join(PROJECT_ROOT, 'artifacts', 'scores')
+BATCH_SCORES_PATH = os.path.join(BATCH_SCORES_DIR, 'churn_scores.parquet')
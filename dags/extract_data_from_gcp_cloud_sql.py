@@ -3,17 +3,26 @@ from airflow.providers.google.cloud.transfers.gcs_to_local import GCSToLocalFile
 from airflow.providers.google.cloud.operators.gcs import GCSListObjectsOperator
 from airflow.operators.python import PythonOperator
 from airflow.hooks.base_hook import BaseHook
+from airflow.stats import Stats
 from datetime import datetime
-import pandas as pd
+import logging
 import sqlalchemy
+from sql_loader import SqlLoader
 
 ### Transform Step.....
 def load_to_sql(file_path):
     conn = BaseHook.get_connection('mlops-telco-churn')  # pega a nova conexao
     engine = sqlalchemy.create_engine(f"postgresql+psycopg2://{conn.login}:{conn.password}@{conn.host}:{conn.port}/{conn.schema}")
-    df = pd.read_csv(file_path)
-    df.to_sql(name="Telco_Customer_Churn", con=engine, if_exists="replace", index=False)
-    engine.dispose()
+    try:
+        # COPY into a staging table, then upsert the new/changed customers in one transaction
+        metrics = SqlLoader(engine, "Telco_Customer_Churn", key="customerID").load(file_path)
+    finally:
+        engine.dispose()
+    logging.info(f"Loaded {file_path}: {metrics}")
+    for name, value in metrics.items():
+        if value is not None:
+            Stats.gauge(f"telco_churn_load.{name}", value)
+    return metrics  # pushed to XCom
 
 # Define the DAG
 with DAG(
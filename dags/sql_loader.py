@@ -0,0 +1,149 @@
+"""
+Incremental bulk loading of a CSV export into a SQL table keyed on one column.
+
+The file is read in chunks into a staging table, with COPY on PostgreSQL
+and batched executemany elsewhere (SQLite in the tests). One transaction
+then upserts the new or changed rows into the live table (compared by a
+per-row hash stored in `_row_hash`) and deletes the keys missing from the
+export. The first load, or a load whose columns differ from the live
+table, renames the staging table into place instead. Readers see either
+the previous or the new contents, never a partial load.
+
+A key repeated in the export keeps its last row (file order); the others
+are dropped from staging before the merge and counted.
+"""
+import csv
+import io
+import time
+
+import pandas as pd
+import sqlalchemy
+
+HASH_COLUMN = "_row_hash"
+# Position of each row in the export, used to keep the last row of a repeated key
+ORDER_COLUMN = "_row_number"
+
+
+def copy_insert(table, conn, keys, data_iter):
+    """
+    pandas.to_sql method that writes a chunk with PostgreSQL COPY.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(data_iter)
+    buffer.seek(0)
+    quote = conn.dialect.identifier_preparer.quote
+    columns = ", ".join(quote(key) for key in keys)
+    name = f"{quote(table.schema)}.{quote(table.name)}" if table.schema else quote(table.name)
+    with conn.connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {name} ({columns}) FROM STDIN WITH CSV", buffer)
+
+
+def read_chunks(file_path, chunksize):
+    """
+    Yields the CSV in chunks with a `_row_hash` column. The hash is taken over
+    the raw text; the columns numeric in the first chunk are then converted
+    (unparseable values become NULL) so every chunk fits the staging schema.
+    """
+    numeric = pd.read_csv(file_path, nrows=chunksize).select_dtypes("number").columns
+    for chunk in pd.read_csv(file_path, chunksize=chunksize, dtype=str):
+        chunk[HASH_COLUMN] = pd.util.hash_pandas_object(chunk, index=False).to_numpy().view("int64")
+        for col in numeric:
+            chunk[col] = pd.to_numeric(chunk[col], errors="coerce")
+        yield chunk
+
+
+class SqlLoader:
+    """
+    Loads CSV exports into `table` through `<table>__staging`. `load`
+    returns the rows read, duplicate rows dropped, rows inserted or
+    updated, and deleted, with the elapsed seconds and rows per second.
+    """
+
+    def __init__(self, engine, table, key="customerID", chunksize=50_000):
+        self.engine = engine
+        self.table = table
+        self.staging = f"{table}__staging"
+        self.key = key
+        self.chunksize = chunksize
+        self.quote = engine.dialect.identifier_preparer.quote
+        self.method = copy_insert if engine.dialect.name == "postgresql" else None
+
+    def stage(self, file_path):
+        rows = 0
+        with self.engine.begin() as conn:
+            conn.execute(sqlalchemy.text(f"DROP TABLE IF EXISTS {self.quote(self.staging)}"))
+        for chunk in read_chunks(file_path, self.chunksize):
+            chunk[ORDER_COLUMN] = range(rows, rows + len(chunk))
+            # One transaction per chunk keeps the load's memory bounded
+            with self.engine.begin() as conn:
+                chunk.to_sql(self.staging, conn, if_exists="append", index=False, method=self.method)
+            rows += len(chunk)
+        return rows
+
+    def _live_columns(self, conn):
+        inspector = sqlalchemy.inspect(conn)
+        if not inspector.has_table(self.table):
+            return None
+        return {column["name"] for column in inspector.get_columns(self.table)}
+
+    def _deduplicate(self, conn):
+        # Keeps the last row of each key, then drops the row numbers
+        staging, key, order = self.quote(self.staging), self.quote(self.key), self.quote(ORDER_COLUMN)
+        dropped = conn.execute(sqlalchemy.text(
+            f"DELETE FROM {staging} WHERE EXISTS "
+            f"(SELECT 1 FROM {staging} AS later WHERE later.{key} = {staging}.{key} "
+            f"AND later.{order} > {staging}.{order})"
+        )).rowcount
+        conn.execute(sqlalchemy.text(f"ALTER TABLE {staging} DROP COLUMN {order}"))
+        return dropped
+
+    def _swap(self, conn):
+        live, staging, key = self.quote(self.table), self.quote(self.staging), self.quote(self.key)
+        conn.execute(sqlalchemy.text(f"DROP INDEX {self.quote(f'{self.staging}_{self.key}_idx')}"))
+        conn.execute(sqlalchemy.text(f"DROP TABLE IF EXISTS {live}"))
+        conn.execute(sqlalchemy.text(f"ALTER TABLE {staging} RENAME TO {live}"))
+        conn.execute(sqlalchemy.text(
+            f"CREATE UNIQUE INDEX {self.quote(f'{self.table}_{self.key}_key')} ON {live} ({key})"
+        ))
+
+    def _merge(self, conn, columns):
+        live, staging, key = self.quote(self.table), self.quote(self.staging), self.quote(self.key)
+        names = ", ".join(self.quote(column) for column in columns)
+        updates = ", ".join(f"{self.quote(column)} = excluded.{self.quote(column)}"
+                            for column in columns if column != self.key)
+        upserted = conn.execute(sqlalchemy.text(
+            f"INSERT INTO {live} ({names}) SELECT {names} FROM {staging} WHERE true "
+            f"ON CONFLICT ({key}) DO UPDATE SET {updates} "
+            f"WHERE {live}.{self.quote(HASH_COLUMN)} <> excluded.{self.quote(HASH_COLUMN)}"
+        )).rowcount
+        deleted = conn.execute(sqlalchemy.text(
+            f"DELETE FROM {live} WHERE NOT EXISTS "
+            f"(SELECT 1 FROM {staging} WHERE {staging}.{key} = {live}.{key})"
+        )).rowcount
+        conn.execute(sqlalchemy.text(f"DROP TABLE {staging}"))
+        return upserted, deleted
+
+    def load(self, file_path):
+        start = time.perf_counter()
+        rows = self.stage(file_path)
+        with self.engine.begin() as conn:
+            conn.execute(sqlalchemy.text(
+                f"CREATE INDEX {self.quote(f'{self.staging}_{self.key}_idx')} "
+                f"ON {self.quote(self.staging)} ({self.quote(self.key)})"
+            ))
+            duplicates = self._deduplicate(conn)
+            columns = [column["name"] for column in sqlalchemy.inspect(conn).get_columns(self.staging)]
+            if self._live_columns(conn) != set(columns):
+                self._swap(conn)
+                upserted, deleted = rows - duplicates, None
+            else:
+                upserted, deleted = self._merge(conn, columns)
+        seconds = time.perf_counter() - start
+        return {
+            "rows_read": rows,
+            "rows_duplicate": duplicates,
+            "rows_upserted": upserted,
+            "rows_deleted": deleted,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(rows / seconds, 1) if seconds else None,
+        }
@@ -0,0 +1,57 @@
+#gunicorn.conf.py
+# Production server: gunicorn -c gunicorn.conf.py wsgi:app
+import os
+import shutil
+
+
+def available_cpus():
+    """
+    CPUs this container may use: the cgroup v2 quota if set, else the CPU affinity mask.
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, -(-int(quota) // int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# One worker per CPU (scoring is CPU bound); threads feed the micro-batcher
+workers = int(os.environ.get('GUNICORN_WORKERS') or available_cpus())
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+worker_class = 'gthread'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+
+# wsgi.py loads and warms the model in the master, so workers share it copy-on-write
+preload_app = True
+
+# Workers write their metrics to files in this directory and /metrics aggregates them.
+# It must be set before prometheus_client is imported and must start out empty.
+multiproc_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus_multiproc')
+shutil.rmtree(multiproc_dir, ignore_errors=True)
+os.makedirs(multiproc_dir, exist_ok=True)
+
+accesslog = '-'
+
+
+def post_fork(server, worker):
+    # Workers forked before the master finished loading start their own load right away
+    from application import start_loading
+    start_loading()
+
+
+def child_exit(server, worker):
+    # Drop live gauges of the dead worker (counters keep their totals)
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    # Write the records still queued for the log writer thread
+    from utils.logger import shutdown_logging
+    shutdown_logging()
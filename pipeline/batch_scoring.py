@@ -0,0 +1,200 @@
+#batch_scoring.py
+"""
+Offline bulk scoring: streams a CSV or Parquet file of raw customers through
+the serving artifacts and writes churn scores to Parquet.
+
+Usage:
+    python pipeline/batch_scoring.py --input customers.parquet --output scores.parquet --workers 8
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import warnings
+import multiprocessing as mp
+from multiprocessing.util import Finalize
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.paths_config import *
+from utils.common_functions import read_yaml
+from utils.logger import get_logger, shutdown_logging
+from utils.custom_exception import CustomException
+from src.feature_engineering import NUMERIC_INPUT_COLUMNS, normalize_categories, add_derived_features
+from src.serving_bundle import ServingBundle
+
+logger = get_logger(__name__)
+
+# Chunks are scored as plain arrays, not DataFrames
+warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+# Loaded once per process; pool workers inherit it on fork or load it in _init_worker
+_bundle = None
+_fill_values = None
+
+
+def load_fill_values(path=FILL_VALUES_PATH):
+    """
+    Values for missing raw numeric inputs: their medians in the training split
+    before balancing, as saved by DataProcessor.balance.
+    """
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    from utils.common_functions import load_data
+    logger.warning(f"{path} not found, computing the training medians from {ENCODED_TRAIN_DATA_PATH}")
+    train_df = load_data(ENCODED_TRAIN_DATA_PATH, zero_copy=True)
+    return {col: float(train_df[col].median()) for col in NUMERIC_INPUT_COLUMNS if col in train_df.columns}
+
+
+def load_bundle():
+    global _bundle, _fill_values
+    # Every chunk goes through the sklearn forest (fastest on large batches), so a
+    # short final chunk gets exactly the same scores as the others
+    _bundle = ServingBundle.load(large_batch_rows=0)
+    _fill_values = load_fill_values()
+    return _bundle
+
+
+def _init_worker():
+    if _bundle is None:
+        load_bundle()
+    # Pool workers leave through os._exit, which skips atexit: flush the log queue on the way out
+    Finalize(None, shutdown_logging, exitpriority=0)
+
+
+def read_chunks(path, chunk_size):
+    """
+    Yields raw DataFrames of at most chunk_size rows from a CSV or Parquet file.
+    """
+    if path.endswith('.parquet'):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        # TotalCharges holds blanks in the raw export; it is coerced like in DataProcessor
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype={'customerID': str, 'TotalCharges': str})
+
+
+def prepare_features(chunk, fill_values):
+    """
+    Same numeric coercion and derived features as DataProcessor.process_data,
+    with training medians instead of per-chunk medians so results do not depend on chunking.
+    """
+    for col, fill in fill_values.items():
+        chunk[col] = pd.to_numeric(chunk[col], errors='coerce').fillna(fill)
+    # Categorical columns (e.g. from Parquet) become plain labels, so aliases can merge into existing values
+    text_columns = list(chunk.select_dtypes(include=['object', 'category']).columns)
+    chunk[text_columns] = chunk[text_columns].astype(object)
+    chunk = normalize_categories(chunk, text_columns)
+    return add_derived_features(chunk)
+
+
+def score_chunk(chunk, id_column):
+    """
+    Scores one raw chunk; returns (ids, churn_proba, labels).
+    """
+    ids = chunk[id_column].astype(str).to_numpy() if id_column in chunk.columns else None
+    X = _bundle.row_encoder.encode_frame(prepare_features(chunk, _fill_values))
+    churn_proba, labels = _bundle.predict_proba(X)
+    return ids, churn_proba, labels.astype(np.int8)
+
+
+class BatchScorer:
+    """
+    Scores chunks in a process pool with at most `max_in_flight` chunks queued,
+    so memory stays constant whatever the input size. Output keeps the input order.
+    """
+
+    def __init__(self, input_path, output_path, chunk_size=100000, workers=None, id_column='customerID'):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.id_column = id_column
+        self.max_in_flight = 2 * self.workers
+
+    def _schema(self):
+        fields = [pa.field(self.id_column, pa.string())] if self.id_column else []
+        fields += [pa.field('churn_probability', pa.float64()), pa.field('churn_label', pa.int8())]
+        return pa.schema(fields, metadata={'model_version': str(_bundle.version)})
+
+    def _write(self, writer, result):
+        ids, churn_proba, labels = result
+        columns = {'churn_probability': churn_proba, 'churn_label': labels}
+        if self.id_column:
+            columns = {self.id_column: ids if ids is not None else np.full(len(labels), None), **columns}
+        writer.write_table(pa.table(columns, schema=writer.schema))
+        return len(labels)
+
+    def run(self):
+        try:
+            start = time.perf_counter()
+            # Load in the parent (including the sklearn forest used for large chunks)
+            # so forked workers share it copy-on-write
+            load_bundle()
+            _bundle.model_for(self.chunk_size)
+            logger.info(f"Scoring {self.input_path} with model {_bundle.version}: "
+                        f"{self.workers} workers, chunks of {self.chunk_size} rows")
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.output_path)), exist_ok=True)
+            rows = 0
+            with pq.ParquetWriter(self.output_path, self._schema()) as writer:
+                if self.workers == 1:
+                    for chunk in read_chunks(self.input_path, self.chunk_size):
+                        rows += self._write(writer, score_chunk(chunk, self.id_column))
+                        self._report(rows, start)
+                else:
+                    ctx = mp.get_context('fork') if 'fork' in mp.get_all_start_methods() else mp.get_context()
+                    with ctx.Pool(self.workers, initializer=_init_worker) as pool:
+                        pending = deque()
+                        for chunk in read_chunks(self.input_path, self.chunk_size):
+                            pending.append(pool.apply_async(score_chunk, (chunk, self.id_column)))
+                            del chunk
+                            if len(pending) >= self.max_in_flight:
+                                rows += self._write(writer, pending.popleft().get())
+                                self._report(rows, start)
+                        while pending:
+                            rows += self._write(writer, pending.popleft().get())
+                            self._report(rows, start)
+                        # Let the workers exit normally (and flush their logs) instead of terminating them
+                        pool.close()
+                        pool.join()
+
+            elapsed = time.perf_counter() - start
+            logger.info(f"Scored {rows} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s) -> {self.output_path}")
+            return rows
+
+        except Exception as e:
+            logger.error(f"Error during batch scoring: {e}")
+            raise CustomException("Error during batch scoring", e)
+
+    def _report(self, rows, start):
+        if rows and (rows // self.chunk_size) % 10 == 0:
+            elapsed = time.perf_counter() - start
+            logger.info(f"{rows} rows scored ({rows / elapsed:,.0f} rows/s)")
+
+
+def main():
+    config = read_yaml(CONFIG_PATH).get('batch_scoring_config', {})
+
+    parser = argparse.ArgumentParser(description="Bulk churn scoring from CSV/Parquet to Parquet")
+    parser.add_argument('--input', default=RAW_DATA, help='raw customers (.csv or .parquet)')
+    parser.add_argument('--output', default=BATCH_SCORES_PATH, help='output .parquet file')
+    parser.add_argument('--chunk-size', type=int, default=config.get('chunk_size', 100000))
+    parser.add_argument('--workers', type=int, default=config.get('workers') or os.cpu_count())
+    parser.add_argument('--id-column', default=config.get('id_column', 'customerID'))
+    args = parser.parse_args()
+
+    BatchScorer(args.input, args.output, chunk_size=args.chunk_size,
+                workers=args.workers, id_column=args.id_column).run()
+
+
+if __name__ == "__main__":
+    main()
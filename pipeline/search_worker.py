@@ -0,0 +1,34 @@
+#search_worker.py
+# Worker pod of the distributed hyperparameter search (search_config.strategy: distributed).
+# The coordinator runs pipeline/training_pipeline.py; see k8s/model-training-job.yaml.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.paths_config import *
+from src.model_training import ModelTrainer
+from utils.common_functions import read_yaml
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def main():
+    strategy = read_yaml(CONFIG_PATH).get("search_config", {}).get("strategy", "grid")
+    if strategy != "distributed":
+        # The coordinator searches on its own; nothing to do for this pod
+        logger.warning(f"search_config.strategy is '{strategy}', not 'distributed': search worker exits")
+        return
+
+    trainer = ModelTrainer(
+        train_path=PROCESSED_TRAIN_DATA_PATH,
+        test_path=PROCESSED_TEST_DATA_PATH,
+        config_path=CONFIG_PATH
+    )
+    finished = trainer.run_search_worker()
+    logger.info(f"Search worker done ({finished} tasks)")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,16 @@ from src.data_processing import DataProcessor
 from src.model_training import ModelTrainer
 from utils.logger import get_logger
 from utils.custom_exception import CustomException
+from utils.stage_cache import StageCache
 
 logger = get_logger(__name__)
 
+
+def source_files(*modules):
+    # Dotted module names ("src.data_processing") -> source files, part of each stage's fingerprint
+    return [os.path.join(PROJECT_ROOT, *module.split('.')) + '.py' for module in modules]
+
+
 def setup_mlflow(config):
     tracking_uri = config.get("mlflow_config", {}) \
                        .get("tracking_uri", "http://mlflow-service:5000")
@@ -32,6 +39,9 @@ def main():
         mlflow.set_experiment(experiment_name)
         logger.info(f"Set MLflow experiment: {experiment_name}")
 
+        # Stages whose inputs, code and config are unchanged reuse their (DVC-tracked) outputs
+        cache = StageCache(STAGE_CACHE_PATH, enabled=config.get("stage_cache_config", {}).get("enabled", True))
+
         # Creates a main run that encompasses the entire pipeline
         with mlflow.start_run(run_name="full_training_pipeline"):
             #2) Ingestion
@@ -41,10 +51,17 @@ def main():
                     "project_id": config['project_id'],
                     "bucket_name": config['gcs_config']['bucket_name'],
                     "file_name": config['gcs_config']['file_name'],
+                    "download_chunk_mb": config['gcs_config'].get('download_chunk_mb', 64),
+                    "download_workers": config['gcs_config'].get('download_workers', 8),
                 },
                 output_dir=RAW_DATA_DIR
             )
-            ingestion.run()
+            cache.run(
+                "ingestion", ingestion.run,
+                config={"gcs": config['gcs_config'], "source": ingestion.source_fingerprint()},
+                code=source_files("src.data_ingestion", "src.gcs_download", "utils.common_functions"),
+                outputs=[os.path.join(RAW_DATA_DIR, config['gcs_config']['file_name']), RAW_DATA_FRAME]
+            )
 
             #3) Processing
             logger.info("=== STEP 2: Data Processing ===")
@@ -54,8 +71,30 @@ def main():
                 processed_dir=PROCESS_DATA_DIR,
                 config_path=CONFIG_PATH
             )
-            processor.split_data()
-            processor.run()
+            cache.run(
+                "split", processor.split_data,
+                inputs=[RAW_DATA_FRAME], config=config['split_data_config'],
+                code=source_files("src.data_processing", "utils.common_functions"),
+                outputs=[RAW_DATA_TRAIN, RAW_DATA_TEST]
+            )
+            cache.run(
+                "process", processor.process,
+                inputs=[RAW_DATA_TRAIN, RAW_DATA_TEST],
+                config={"split": config['split_data_config'], "processing": config.get('processing_config')},
+                code=source_files("src.data_processing", "src.feature_engineering", "src.feature_store",
+                                  "utils.common_functions"),
+                outputs=[ENCODED_TRAIN_DATA_PATH, ENCODED_TEST_DATA_PATH, ENCODER_PATH]
+            )
+            cache.run(
+                "balance", processor.balance,
+                inputs=[ENCODED_TRAIN_DATA_PATH, ENCODED_TEST_DATA_PATH, ENCODER_PATH],
+                config={"split": config['split_data_config'], "drift": config.get('drift_config'),
+                        "balancing": config.get('balancing_config')},
+                code=source_files("src.data_processing", "src.class_balancing", "src.row_encoder",
+                                  "src.reference_sketch", "src.feature_engineering", "utils.common_functions"),
+                outputs=[PROCESSED_TRAIN_DATA_PATH, PROCESSED_TEST_DATA_PATH, FEATURES_PATH,
+                         ENCODER_TABLES_PATH, REFERENCE_SKETCH_PATH, FILL_VALUES_PATH]
+            )
 
             #4) Training
             logger.info("=== STEP 3: Model Training ===")
@@ -64,9 +103,20 @@ def main():
                 test_path=PROCESSED_TEST_DATA_PATH,
                 config_path=CONFIG_PATH
             )
-            X_train, y_train, X_test, y_test = trainer.load_data()
             # Inside train_model there is already a nested run and metrics and model logs
-            trainer.train_model(X_train, y_train, X_test, y_test)
+            cache.run(
+                "train", lambda: trainer.train_model(*trainer.load_data()),
+                inputs=[PROCESSED_TRAIN_DATA_PATH, PROCESSED_TEST_DATA_PATH],
+                config={key: config.get(key) for key in
+                        ("model_config", "grid_search_config", "search_config", "flat_model_config")},
+                code=source_files("src.model_training", "src.search_strategies", "src.distributed_search",
+                                  "src.forest_engine", "src.serving_bundle", "utils.common_functions"),
+                outputs=[MODEL_PATH, FLAT_MODEL_DIR, BUNDLE_MANIFEST_PATH]
+            )
+
+            mlflow.log_params({f"stage_cache_{stage}": decision for stage, decision in cache.decisions.items()})
+            mlflow.log_metric("stage_cache_hits", list(cache.decisions.values()).count("hit"))
+            mlflow.log_metric("stage_cache_misses", list(cache.decisions.values()).count("miss"))
 
         logger.info("=== PIPELINE COMPLETED SUCCESSFULLY ===")
 
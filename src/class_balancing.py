@@ -0,0 +1,166 @@
+#class_balancing.py
+import numpy as np
+import pandas as pd
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BALANCING_STRATEGIES = ('smote', 'approx_smote', 'undersample', 'weights')
+
+
+def random_projection_order(X, leaf_size, rng):
+    """
+    Row order of a random projection tree: the rows are split at the median
+    of a random direction, then each half again along a new direction, down
+    to about leaf_size rows. Rows close in this order are close in space.
+    """
+    n = len(X)
+    order = np.arange(n)
+    for level in range(max(0, int(np.ceil(np.log2(n / leaf_size))))):
+        projection = (X @ rng.standard_normal(X.shape[1]).astype(X.dtype))[order]
+        # Contiguous halves of the previous level's nodes, each sorted along the new direction
+        node = (np.arange(n) * 2**level) // n
+        order = order[np.lexsort((projection, node))]
+    return order
+
+
+def _nearest_candidates(X, rows, candidates, k):
+    """
+    The k candidates closest to each of rows (itself and repeated candidates excluded).
+    """
+    candidates = np.sort(candidates, axis=1)
+    distances = ((X[candidates] - X[rows, None, :]) ** 2).sum(axis=2)
+    excluded = candidates == rows[:, None]
+    excluded[:, 1:] |= candidates[:, 1:] == candidates[:, :-1]
+    distances[excluded] = np.inf
+    nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(candidates, nearest, axis=1)
+
+
+def approximate_neighbors(X, k, n_trees=4, window=None, chunk_size=4096, random_state=None):
+    """
+    Indices of approximately the k nearest neighbors (Euclidean) of every row of X.
+
+    The candidates of a row are the `window` rows on each side of it in the
+    order of each of n_trees random projection trees. One refinement round
+    then also tries the neighbors of its neighbors. Exact distances are
+    computed to the candidates only, in chunks of rows, so memory is linear
+    in len(X) and time is O(n log n).
+    """
+    rng = np.random.default_rng(random_state)
+    n = len(X)
+    k = min(k, n - 1)
+    window = window or 4 * k
+    offsets = np.concatenate([np.arange(-window, 0), np.arange(1, window + 1)])
+
+    orders, ranks = [], []
+    for _ in range(n_trees):
+        order = random_projection_order(X, 2 * window, rng)
+        rank = np.empty(n, dtype=np.int64)
+        rank[order] = np.arange(n)
+        orders.append(order)
+        ranks.append(rank)
+
+    neighbors = np.empty((n, k), dtype=np.int64)
+    for start in range(0, n, chunk_size):
+        rows = np.arange(start, min(start + chunk_size, n))
+        candidates = np.hstack([order[np.clip(rank[rows, None] + offsets, 0, n - 1)]
+                                for order, rank in zip(orders, ranks)])
+        neighbors[rows] = _nearest_candidates(X, rows, candidates, k)
+
+    refined = np.empty_like(neighbors)
+    for start in range(0, n, chunk_size):
+        rows = np.arange(start, min(start + chunk_size, n))
+        candidates = np.hstack([neighbors[rows], neighbors[neighbors[rows]].reshape(len(rows), -1)])
+        refined[rows] = _nearest_candidates(X, rows, candidates, k)
+    return refined
+
+
+def approx_smote(X, y, k_neighbors=5, n_trees=4, chunk_size=100000, random_state=None):
+    """
+    SMOTE with approximate neighbors: oversamples every class to the size of
+    the largest one. Each synthetic row lies on the segment between a random
+    row of the class and one of its k approximate nearest neighbors. Rows are
+    generated in chunks straight into the output columns, which keep the
+    dtypes of X (as imblearn does, interpolated codes are truncated).
+    Returns (X_resampled, y_resampled), the original rows first.
+    """
+    rng = np.random.default_rng(random_state)
+    classes, counts = np.unique(y, return_counts=True)
+    n_total = len(y) + int((counts.max() - counts).sum())
+
+    columns = {col: np.empty(n_total, dtype=X[col].dtype) for col in X.columns}
+    for col in X.columns:
+        columns[col][:len(X)] = X[col].to_numpy()
+    y_values = np.empty(n_total, dtype=y.dtype)
+    y_values[:len(y)] = y.to_numpy()
+
+    offset = len(X)
+    for label, count in zip(classes, counts):
+        n_new = counts.max() - count
+        if n_new == 0:
+            continue
+        X_class = X[y.to_numpy() == label].to_numpy(dtype=np.float32)
+        if len(X_class) < 2:
+            raise ValueError(f"Class {label!r} has {len(X_class)} row; SMOTE needs at least 2")
+        neighbors = approximate_neighbors(X_class, k_neighbors, n_trees=n_trees,
+                                          random_state=rng.integers(2**32))
+        logger.info(f"Generating {n_new} synthetic rows for class {label!r} from {count}")
+        for start in range(0, n_new, chunk_size):
+            size = min(chunk_size, n_new - start)
+            base = rng.integers(0, len(X_class), size)
+            neighbor = neighbors[base, rng.integers(0, neighbors.shape[1], size)]
+            gap = rng.random(size, dtype=np.float32)[:, None]
+            synthetic = X_class[base] + gap * (X_class[neighbor] - X_class[base])
+            for j, col in enumerate(X.columns):
+                columns[col][offset:offset + size] = synthetic[:, j]
+            y_values[offset:offset + size] = label
+            offset += size
+
+    return pd.DataFrame(columns, copy=False), pd.Series(y_values, name=y.name)
+
+
+def random_undersample(X, y, random_state=None):
+    """
+    Keeps every row of the smallest class and as many random rows of each
+    other class, in their original order.
+    """
+    rng = np.random.default_rng(random_state)
+    classes, counts = np.unique(y, return_counts=True)
+    labels = y.to_numpy()
+    keep = np.concatenate([
+        rng.choice(np.flatnonzero(labels == label), counts.min(), replace=False) for label in classes
+    ])
+    keep.sort()
+    return X.iloc[keep].reset_index(drop=True), y.iloc[keep].reset_index(drop=True)
+
+
+def balance(X, y, balancing_config=None, random_state=None):
+    """
+    Class balancing selected by `balancing_config['strategy']`:
+
+    - smote: imblearn SMOTE with exact k-NN over all rows
+    - approx_smote: the same interpolation with random projection tree neighbors
+      and chunked generation (see approx_smote)
+    - undersample: random undersampling of the larger classes
+    - weights: no resampling; the model's class_weight does the balancing
+
+    Returns (X, y); `weights` returns them unchanged.
+    """
+    balancing_config = dict(balancing_config or {})
+    strategy = balancing_config.get('strategy', 'smote')
+    if strategy not in BALANCING_STRATEGIES:
+        raise ValueError(f"Unknown balancing strategy '{strategy}', expected one of {BALANCING_STRATEGIES}")
+    if strategy == 'smote':
+        from imblearn.over_sampling import SMOTE
+        return SMOTE(k_neighbors=balancing_config.get('k_neighbors', 5),
+                     random_state=random_state).fit_resample(X, y)
+    if strategy == 'approx_smote':
+        return approx_smote(
+            X, y, k_neighbors=balancing_config.get('k_neighbors', 5),
+            n_trees=balancing_config.get('n_trees', 4),
+            chunk_size=balancing_config.get('chunk_size', 100000), random_state=random_state
+        )
+    if strategy == 'undersample':
+        return random_undersample(X, y, random_state=random_state)
+    return X, y
@@ -1,9 +1,8 @@
 #data_ingestion.py
-import pandas as pd
-from google.cloud import storage
 from utils.logger import get_logger
 from utils.custom_exception import CustomException
-from utils.common_functions import read_yaml
+from utils.common_functions import read_yaml, csv_to_frame
+from src.gcs_download import RangedDownload, is_unchanged
 import os
 import sys
 from config.paths_config import *
@@ -12,48 +11,83 @@ logger = get_logger(__name__)
 
 class DataIngestion:
 
-    def __init__(self, gcs_params, output_dir):
+    def __init__(self, gcs_params, output_dir, storage_client=None):
         """
        gcs_params must contain:
           - "project_id": "<your_gcp_project_id>"
           - "bucket_name": "<your_bucket_name>"
           - "file_name": "<your_file_name_in_gcs>"
+       and may set "download_chunk_mb" and "download_workers".
+       storage_client defaults to a google.cloud.storage.Client for project_id.
         """
         self.gcs_params = gcs_params
         self.output_dir = output_dir
+        self._storage_client = storage_client
 
         os.makedirs(self.output_dir, exist_ok=True)        
 
+    @property
+    def storage_client(self):
+        if self._storage_client is None:
+            from google.cloud import storage
+            self._storage_client = storage.Client(project=self.gcs_params['project_id'])
+        return self._storage_client
+
+    def get_blob(self):
+        """
+        The GCS object with its metadata (size, generation, checksums).
+        """
+        blob = self.storage_client.bucket(self.gcs_params['bucket_name']).get_blob(self.gcs_params['file_name'])
+        if blob is None:
+            raise FileNotFoundError(f"gs://{self.gcs_params['bucket_name']}/{self.gcs_params['file_name']} not found")
+        return blob
+
+    def source_fingerprint(self):
+        """
+        MD5 and size of the object in GCS, read from its metadata (no download).
+        """
+        try:
+            blob = self.get_blob()
+            return f"{blob.md5_hash}:{blob.size}"
+        except Exception as e:
+            logger.error(f"Error while reading GCS metadata {e}")
+            raise CustomException(str(e), sys)
+
     def extract_data(self):
         """
-        Download CSV directly from GCS.
+        Downloads the CSV from GCS in parallel byte ranges straight to disk and
+        returns its path. An interrupted download resumes where it stopped;
+        a local copy with the object's checksum is not downloaded again.
         """
         try:
             logger.info("Starting GCS Download.")
-            storage_client = storage.Client(project=self.gcs_params['project_id'])
-
-            bucket = storage_client.bucket(self.gcs_params['bucket_name'])
-            blob = bucket.blob(self.gcs_params['file_name'])
-
+            blob = self.get_blob()
             local_file = os.path.join(self.output_dir, self.gcs_params['file_name'])
 
-            blob.download_to_filename(local_file)
+            if is_unchanged(blob, local_file):
+                logger.info(f"{local_file} matches the GCS object; skipping download.")
+                return local_file
+
+            RangedDownload(
+                blob, local_file,
+                chunk_size=int(self.gcs_params.get('download_chunk_mb', 64) * 2**20),
+                workers=self.gcs_params.get('download_workers', 8)
+            ).run()
 
             logger.info("Downloaded CSV from GCS.")
-            df = pd.read_csv(local_file)
-            return df
+            return local_file
 
         except Exception as e:
             logger.error(f"Error while downloading from GCS {e}")
             raise CustomException(str(e), sys)
 
-    def save_data(self, df):
+    def save_data(self, csv_path):
         """
-        Saves the CSV to a local directory.
+        Saves a typed (Feather) copy of the downloaded CSV for the next stages.
         """
         try:
-            local_file = os.path.join(self.output_dir, "Telco-Customer-Churn.csv")
-            df.to_csv(local_file, index=None)
+            local_file = os.path.join(self.output_dir, os.path.basename(RAW_DATA_FRAME))
+            csv_to_frame(csv_path, local_file)
 
             logger.info("Data Saving Done.")
         except Exception as e:
@@ -67,8 +101,8 @@ class DataIngestion:
         """
         try:
             logger.info("Data Ingestion Pipeline Started....")
-            df = self.extract_data()
-            self.save_data(df)
+            csv_path = self.extract_data()
+            self.save_data(csv_path)
             logger.info("End of Data Ingestion Pipeline....")
         except Exception as e:
             logger.error(f"Error while data Ingestion pipeline.... {e}")
@@ -82,6 +116,8 @@ if __name__ == "__main__":
         "project_id": config['project_id'],
         "bucket_name": config['gcs_config']['bucket_name'],
         "file_name": config['gcs_config']['file_name'],
+        "download_chunk_mb": config['gcs_config'].get('download_chunk_mb', 64),
+        "download_workers": config['gcs_config'].get('download_workers', 8),
     }
     data_ingestion = DataIngestion(gcs_params=gcs_params, output_dir=RAW_DATA_DIR)
     data_ingestion.run()
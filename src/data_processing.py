@@ -1,12 +1,20 @@
 import os
+import hashlib
+import json
+import numpy as np
 import pandas as pd 
 from utils.logger import get_logger
 from utils.custom_exception import CustomException
 from config.paths_config import *
-from utils.common_functions import read_yaml, load_data
+from utils.common_functions import read_yaml, load_data, save_frame, categorize, downcast
+from utils.stage_cache import file_digest
+from src.feature_engineering import NUMERIC_INPUT_COLUMNS, add_derived_features
+from src.feature_store import FeatureStore, row_hashes
+from src.class_balancing import balance
+from src.reference_sketch import ReferenceSketch
+from src.row_encoder import RowEncoder
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
-from imblearn.over_sampling import SMOTE
 import joblib
 
 
@@ -23,6 +31,14 @@ class DataProcessor:
         self.train_test_ratio = self.config_split_data_config["train_ratio"]
         self.random_state = self.config_split_data_config['random_state']
         self.target = self.config_split_data_config['target']
+        processing_config = self.config.get('processing_config', {})
+        self.compact_dtypes = processing_config.get('compact_dtypes', True)
+        self.incremental = processing_config.get('incremental', False)
+        self.verify_incremental = processing_config.get('verify_incremental', False)
+        self.balancing_config = self.config.get('balancing_config', {'strategy': 'smote'})
+        if self.balancing_config.get('strategy') == 'weights' \
+                and not self.config.get('model_config', {}).get('class_weight'):
+            logger.warning("Balancing strategy 'weights' needs model_config.class_weight; the classes stay imbalanced")
     
     
         if not os.path.exists(self.processed_dir):
@@ -31,10 +47,14 @@ class DataProcessor:
         if not os.path.exists(ENCODER_DIR):
             os.makedirs(ENCODER_DIR)    
 
+        if not os.path.exists(MODEL_DIR):
+            os.makedirs(MODEL_DIR)
+
     def split_data(self):
         try:
             logger.info("Starting the splitting process.....")
-            data = pd.read_csv(RAW_DATA)
+            # Typed frame from the ingestion; the CSV when only the DVC-tracked download is there
+            data = load_data(RAW_DATA_FRAME) if os.path.exists(RAW_DATA_FRAME) else categorize(load_data(RAW_DATA))
 
             y = data[self.target] 
 
@@ -43,8 +63,8 @@ class DataProcessor:
                                                     random_state=self.random_state,
                                                     stratify=y)
 
-            train_data.to_csv(RAW_DATA_TRAIN, index=None)
-            test_data.to_csv(RAW_DATA_TEST, index=None)
+            save_frame(train_data, RAW_DATA_TRAIN)
+            save_frame(test_data, RAW_DATA_TEST)
 
             logger.info(f"Train data saved to {RAW_DATA_TRAIN}")
             logger.info(f"Test data saved to {RAW_DATA_TEST}")
@@ -54,68 +74,80 @@ class DataProcessor:
             raise CustomException("Failed to split data into training and test sets ", e)    
 
 
-    def process_data(self, dataframe, dataset_name="unknown", encoders=None, save_encoder=False):
+    def feature_version(self, columns, label_encoders):
+        """
+        Identifies how stored feature rows were computed: the processing code,
+        the raw columns and the encoder classes.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for module in ('data_processing', 'feature_engineering'):
+            digest.update(file_digest(os.path.join(PROJECT_ROOT, 'src', f'{module}.py')).encode())
+        classes = {col: le.classes_.tolist() for col, le in sorted(label_encoders.items())}
+        digest.update(json.dumps([list(columns), classes], default=str).encode())
+        return digest.hexdigest()
+
+    def encode_rows(self, dataframe, total_charges, label_encoders):
+        """
+        Derived features and label codes of cleaned raw rows (without customerID).
+        """
+        dataframe['TotalCharges'] = total_charges
+        dataframe = add_derived_features(dataframe)
+        for col, le in label_encoders.items():
+            if col in dataframe.columns:
+                dataframe[col] = le.transform(dataframe[col])
+        return dataframe
+
+    def process_data(self, dataframe, dataset_name="unknown", encoders=None, save_encoder=False, store=None):
+        """
+        Cleans, derives and label-encodes a raw split. With a FeatureStore, only
+        new or changed customers are recomputed; the other rows come from the store.
+        """
         try:
             logger.info(f"Starting Data Processing Step for [{dataset_name}] dataset...")
 
-            dataframe.drop(columns=['customerID', 'gender'], inplace=True)
-            dataframe.drop_duplicates(inplace=True)
+            dataframe.drop(columns=['gender'], inplace=True)
+            dataframe.drop_duplicates(subset=dataframe.columns.drop('customerID'), inplace=True)
 
-            dataframe['TotalCharges'] = pd.to_numeric(dataframe['TotalCharges'], errors='coerce')
+            total_charges = pd.to_numeric(dataframe['TotalCharges'], errors='coerce')
+            # Rows with a missing TotalCharges depend on the split's median, so they are never stored
+            missing_charges = total_charges.isna().to_numpy()
+            total_charges = total_charges.fillna(total_charges.median())
 
-            dataframe['TotalCharges'].fillna(dataframe['TotalCharges'].median(), inplace=True)
+            logger.info("Fitting Label Encoders")
 
-            logger.info(f"Start Feature Engineering for [{dataset_name}] dataset...")
+            label_encoders = encoders or {}
+            categorical = dataframe.select_dtypes(include=['object', 'category']).columns
+            for col in categorical.drop(['customerID', 'TotalCharges'], errors='ignore'):
+                if col not in label_encoders:
+                    label_encoders[col] = LabelEncoder().fit(dataframe[col])
+
+            ids = dataframe['customerID'].to_numpy()
+            if store is None:
+                dirty = np.ones(len(dataframe), dtype=bool)
+            else:
+                hashes = row_hashes(dataframe)
+                store.use_version(self.feature_version(dataframe.columns, label_encoders))
+                dirty = ~store.contains(ids, hashes) | missing_charges
+                logger.info(f"[{dataset_name}] {dirty.sum()} new or changed rows, {(~dirty).sum()} reused")
 
-            dataframe['AvgMonthlySpend'] = dataframe['TotalCharges'] / (dataframe['tenure'] + 1)
-
-            dataframe['NoOnlineServices'] = (
-                (dataframe['OnlineSecurity'] == 'No').astype(int) +
-                (dataframe['OnlineBackup'] == 'No').astype(int) +
-                (dataframe['DeviceProtection'] == 'No').astype(int) +
-                (dataframe['TechSupport'] == 'No').astype(int)
-            )
-
-            dataframe['NoStreaming'] = (
-                (dataframe['StreamingTV'] == 'No').astype(int) +
-                (dataframe['StreamingMovies'] == 'No').astype(int)
-            )
-
-            def count_services(row):
-                count = 0
-                service_cols = ['PhoneService', 'MultipleLines', 'InternetService','OnlineSecurity',
-                                'OnlineBackup', 'DeviceProtection','TechSupport', 'StreamingTV',
-                                'StreamingMovies']
-                for col in service_cols:
-                    if 'No internet service' in str(row[col]) or 'No phone service' in str(row[col]):
-                        continue
-                    if row[col] in ['Yes', 'Fiber optic', 'DSL']:
-                        count += 1
-                return count
-
-            dataframe['TotalServices'] = dataframe.apply(count_services, axis=1)
-
-            dataframe['RiskScore'] = (
-                (dataframe['Contract'] == 'Month-to-month').astype(int) +
-                (dataframe['OnlineSecurity'] == 'No').astype(int) +
-                (dataframe['TechSupport'] == 'No').astype(int) +
-                (dataframe['PaymentMethod'] == 'Electronic check').astype(int) +
-                (dataframe['tenure'] < 6).astype(int)
-            )
-
-            logger.info("Applying Label Encoding")
+            logger.info(f"Start Feature Engineering for [{dataset_name}] dataset...")
 
-            label_encoders = encoders or {}
-            for col in dataframe.select_dtypes(include='object').columns:
-                if col in label_encoders:
-                    le = label_encoders[col]
-                    dataframe[col] = le.transform(dataframe[col])
-                    if col != self.target:
-                        label_encoders[col] = le
-                else:
-                    le = LabelEncoder()
-                    dataframe[col] = le.fit_transform(dataframe[col])
-                    label_encoders[col] = le
+            parts = []
+            if (~dirty).any():
+                parts.append(store.get(ids[~dirty]).set_axis(dataframe.index[~dirty]))
+            if dirty.any() or not parts:
+                rows = dataframe if dirty.all() else dataframe.loc[dirty]
+                features = self.encode_rows(rows.drop(columns='customerID'), total_charges[dirty], label_encoders)
+                if store is not None:
+                    stored = ~missing_charges[dirty]
+                    store.update(ids[dirty][stored], hashes[dirty][stored], features[stored])
+                parts.append(features)
+            # Same row order as a full recompute
+            dataframe = pd.concat(parts).reindex(dataframe.index) if len(parts) > 1 else parts[0]
+
+            if self.compact_dtypes:
+                # uint8 codes and counts, float32 charges; SMOTE and the saved frames keep these dtypes
+                dataframe = downcast(dataframe)
 
             if save_encoder:
                 joblib.dump(label_encoders, ENCODER_PATH)
@@ -126,6 +158,19 @@ class DataProcessor:
         except Exception as e:
             logger.error(f"Error during data processing: {e}")
             raise CustomException(e)
+
+    def check_consistency(self, raw_df, processed_df, dataset_name="unknown", encoders=None):
+        """
+        Recomputes a split without the feature store and raises if the incremental result differs.
+        """
+        full_df, _ = self.process_data(raw_df, dataset_name=f"{dataset_name} full recompute",
+                                       encoders=dict(encoders) if encoders else None)
+        try:
+            pd.testing.assert_frame_equal(processed_df, full_df)
+        except AssertionError as e:
+            logger.error(f"Incremental [{dataset_name}] features differ from a full recompute: {e}")
+            raise CustomException(f"Incremental [{dataset_name}] features differ from a full recompute", e)
+        logger.info(f"Incremental [{dataset_name}] features match a full recompute")
         
     
      
@@ -136,13 +181,14 @@ class DataProcessor:
             X = dataframe.drop(columns='Churn')
             y = dataframe["Churn"]
 
-            smote = SMOTE(random_state = self.random_state)
-            X_resampled, y_resampled = smote.fit_resample(X,y)
+            strategy = self.balancing_config.get('strategy', 'smote')
+            X_resampled, y_resampled = balance(X, y, self.balancing_config, random_state=self.random_state)
 
-            balanced_df = pd.DataFrame(X_resampled , columns=X.columns)
-            balanced_df["Churn"] = y_resampled
+            # The resampled X keeps the input dtypes; add the target to it instead of copying
+            balanced_df = X_resampled
+            balanced_df["Churn"] = y_resampled.to_numpy()
 
-            logger.info("Data balanced sucesffuly")
+            logger.info(f"Data balanced sucesffuly with {strategy}: {len(dataframe)} -> {len(balanced_df)} rows")
             return balanced_df
         
         except Exception as e:
@@ -154,7 +200,7 @@ class DataProcessor:
         try:
             logger.info(f"Saving processed [{dataset_name}] data to {file_path}...") 
 
-            df.to_csv(file_path, index=None)
+            save_frame(df, file_path)
 
             logger.info(f"Data saved sucessfuly to {file_path}")      
 
@@ -163,16 +209,54 @@ class DataProcessor:
             raise CustomException("Error while saving data", e)  
 
     
-    def run(self):
+    def process(self):
+        """
+        Encodes the raw train/test splits and saves them (not yet balanced) with the label encoders.
+        """
         try:
             logger.info("Loading data from RAW directory") 
 
             train_df = load_data(self.train_path)
             test_df = load_data(self.test_path) 
 
-            train_df, label_encoders = self.process_data(train_df, dataset_name="train", save_encoder=True)
-            test_df, _ = self.process_data(test_df, dataset_name="test", encoders=label_encoders, save_encoder=False)
+            store = FeatureStore(FEATURE_STORE_PATH) if self.incremental else None
+            if store is not None:
+                customer_ids = pd.concat([train_df['customerID'], test_df['customerID']])
+                if self.verify_incremental:
+                    raw_train, raw_test = train_df.copy(), test_df.copy()
+
+            train_df, label_encoders = self.process_data(train_df, dataset_name="train", save_encoder=True, store=store)
+            test_df, _ = self.process_data(test_df, dataset_name="test", encoders=label_encoders, save_encoder=False,
+                                           store=store)
 
+            if store is not None:
+                if self.verify_incremental:
+                    self.check_consistency(raw_train, train_df, dataset_name="train")
+                    self.check_consistency(raw_test, test_df, dataset_name="test", encoders=label_encoders)
+                store.retain(customer_ids)
+                store.save()
+
+            self.save_data(train_df, ENCODED_TRAIN_DATA_PATH, dataset_name="encoded train")
+            self.save_data(test_df, ENCODED_TEST_DATA_PATH, dataset_name="encoded test")
+
+        except Exception as e:
+            logger.error(f"Error during preprocessing pipeline {e}")
+            raise CustomException("Error while data preprocessing pipeline", e)
+
+    def balance(self):
+        """
+        Balances the encoded splits and writes the training data and the serving artifacts.
+        """
+        try:
+            train_df = load_data(ENCODED_TRAIN_DATA_PATH)
+            test_df = load_data(ENCODED_TEST_DATA_PATH)
+            label_encoders = joblib.load(ENCODER_PATH)
+
+            # Fill values for missing inputs in bulk scoring: medians of the real customers, not of the SMOTE rows
+            fill_values = {col: float(train_df[col].median()) for col in NUMERIC_INPUT_COLUMNS if col in train_df.columns}
+            with open(FILL_VALUES_PATH, 'w') as f:
+                json.dump(fill_values, f)
+            logger.info(f"Fill values saved to {FILL_VALUES_PATH}: {fill_values}")
 
             train_df = self.balance_data(train_df, dataset_name="train")
             test_df = self.balance_data(test_df, dataset_name="test")
@@ -183,14 +267,26 @@ class DataProcessor:
             joblib.dump(feature_columns, FEATURES_PATH)
             logger.info(f"Feature columns saved to {FEATURES_PATH}")
 
+            # Encoder lookup tables precompiled for the serving app (no sklearn unpickling at startup)
+            RowEncoder(label_encoders, feature_columns).save(ENCODER_TABLES_PATH)
+            logger.info(f"Encoder tables saved to {ENCODER_TABLES_PATH}")
+
+            # Compact reference distribution used by the serving drift monitor
+            grid_size = self.config.get('drift_config', {}).get('sketch_grid_size', 2001)
+            ReferenceSketch.from_frame(train_df, feature_columns, grid_size=grid_size).save(REFERENCE_SKETCH_PATH)
+
             self.save_data(train_df, PROCESSED_TRAIN_DATA_PATH, dataset_name="train")
             self.save_data(test_df, PROCESSED_TEST_DATA_PATH, dataset_name="test")
 
             logger.info("Data processing completed successfully")
 
         except Exception as e:
-            logger.error(f"Error during preprocessing pipeline {e}")
-            raise CustomException("Error while data preprocessing pipeline", e)
+            logger.error(f"Error during balancing pipeline {e}")
+            raise CustomException("Error while data balancing pipeline", e)
+
+    def run(self):
+        self.process()
+        self.balance()
 
 
 if __name__ == "__main__":
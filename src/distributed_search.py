@@ -0,0 +1,207 @@
+#distributed_search.py
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.base import clone
+from sklearn.metrics import check_scoring
+from src.search_strategies import WarmStartGridSearchCV, _grow_and_score
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SearchQueue:
+    """
+    Work queue of a sharded search in a SQLite file on a shared volume.
+
+    One row per task (a setting of the non-tree parameters on one CV fold),
+    keyed by task_id = setting index * n_splits + fold. Workers claim pending
+    tasks in a write transaction. A claimed task whose lease has expired (the
+    pod died) is handed out again. Scores are stored with the task, so a
+    restarted job resumes where it stopped. Opening the queue with a new
+    search id (new data or new grid) drops the previous search.
+    """
+
+    def __init__(self, path, lease_seconds=600.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+
+    def _connect(self):
+        # Rollback journal rather than WAL: WAL needs shared memory, which network filesystems lack
+        connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        connection.execute("PRAGMA busy_timeout = 60000")
+        return connection
+
+    def open(self, search_id, tasks):
+        """
+        Creates the tasks of `search_id` unless they already exist; returns the number already done.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS tasks (task_id INTEGER PRIMARY KEY, payload TEXT, "
+                "status TEXT, worker TEXT, claimed_at REAL, attempts INTEGER, scores TEXT)"
+            )
+            row = connection.execute("SELECT value FROM meta WHERE key = 'search_id'").fetchone()
+            if row is None or row[0] != search_id:
+                connection.execute("DELETE FROM tasks")
+                connection.executemany(
+                    "INSERT INTO tasks VALUES (?, ?, 'pending', NULL, NULL, 0, NULL)",
+                    [(task_id, json.dumps(payload)) for task_id, payload in enumerate(tasks)]
+                )
+                connection.execute("INSERT OR REPLACE INTO meta VALUES ('search_id', ?)", (search_id,))
+            done = connection.execute("SELECT COUNT(*) FROM tasks WHERE status = 'done'").fetchone()[0]
+            connection.execute("COMMIT")
+            return done
+        finally:
+            connection.close()
+
+    def search_id(self):
+        if not os.path.exists(self.path):
+            return None
+        connection = self._connect()
+        try:
+            row = connection.execute("SELECT value FROM meta WHERE key = 'search_id'").fetchone()
+            return row[0] if row else None
+        except sqlite3.OperationalError:
+            return None
+        finally:
+            connection.close()
+
+    def claim(self, worker, limit):
+        """
+        Claims up to `limit` pending (or expired) tasks; returns [(task_id, payload)].
+        """
+        now = time.time()
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            rows = connection.execute(
+                "SELECT task_id, payload FROM tasks WHERE status = 'pending' "
+                "OR (status = 'claimed' AND claimed_at < ?) ORDER BY task_id LIMIT ?",
+                (now - self.lease_seconds, limit)
+            ).fetchall()
+            connection.executemany(
+                "UPDATE tasks SET status = 'claimed', worker = ?, claimed_at = ?, attempts = attempts + 1 "
+                "WHERE task_id = ?",
+                [(worker, now, task_id) for task_id, _ in rows]
+            )
+            connection.execute("COMMIT")
+            return [(task_id, json.loads(payload)) for task_id, payload in rows]
+        finally:
+            connection.close()
+
+    def complete(self, results):
+        """
+        Stores the scores of finished tasks: [(task_id, scores)].
+        """
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(
+                "UPDATE tasks SET status = 'done', scores = ? WHERE task_id = ?",
+                [(json.dumps(scores), task_id) for task_id, scores in results]
+            )
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+    def progress(self):
+        connection = self._connect()
+        try:
+            counts = dict(connection.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+        finally:
+            connection.close()
+        return {status: counts.get(status, 0) for status in ('pending', 'claimed', 'done')}
+
+    def scores(self):
+        connection = self._connect()
+        try:
+            rows = connection.execute("SELECT scores FROM tasks ORDER BY task_id").fetchall()
+        finally:
+            connection.close()
+        return [json.loads(row[0]) for row in rows]
+
+
+class DistributedSearchCV(WarmStartGridSearchCV):
+    """
+    WarmStartGridSearchCV sharded across processes or pods through a SearchQueue.
+
+    Every participant loads the same training data and calls `work(X, y)`,
+    which claims tasks in batches of n_jobs and grows their forests until
+    every task of the search is done. The coordinator calls `fit(X, y)`:
+    it opens the queue, works like the others, then reduces the scores
+    (same selection as GridSearchCV) and refits the best candidate.
+
+    The search id hashes the grid, CV, scoring, estimator and data, so
+    workers holding stale data never mix their scores into a new search.
+    """
+
+    def __init__(self, estimator, param_grid, queue_path, scoring=None, cv=5, n_jobs=None, verbose=0,
+                 lease_seconds=600.0, poll_seconds=5.0, worker_id=None):
+        super().__init__(estimator, param_grid, scoring=scoring, cv=cv, n_jobs=n_jobs, verbose=verbose)
+        self.queue = SearchQueue(queue_path, lease_seconds=lease_seconds)
+        self.poll_seconds = poll_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
+    def search_id(self, X, y):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(json.dumps([self.param_grid, str(self.cv), str(self.scoring)], sort_keys=True).encode())
+        digest.update(repr(sorted(self.estimator.get_params().items())).encode())
+        digest.update(np.ascontiguousarray(np.asarray(X, dtype=np.float64)).tobytes())
+        digest.update(np.ascontiguousarray(np.asarray(y, dtype=np.float64)).tobytes())
+        return digest.hexdigest()
+
+    def open(self, X, y):
+        _, settings, _, splits = self._plan(X, y)
+        tasks = [{'params': params, 'fold': fold} for params in settings for fold in range(len(splits))]
+        done = self.queue.open(self.search_id(X, y), tasks)
+        logger.info(f"Search queue {self.queue.path}: {len(tasks)} tasks, {done} already done")
+
+    def ready(self, X, y):
+        """
+        True when the queue holds the search for this data (workers wait for the coordinator).
+        """
+        return self.queue.search_id() == self.search_id(X, y)
+
+    def work(self, X, y):
+        """
+        Processes tasks until the whole search is done; returns how many this worker finished.
+        """
+        _, _, checkpoints, splits = self._plan(X, y)
+        scorer = check_scoring(self.estimator, self.scoring)
+        batch_size = effective_n_jobs(self.n_jobs)
+        finished = 0
+
+        while True:
+            claimed = self.queue.claim(self.worker_id, batch_size)
+            if not claimed:
+                progress = self.queue.progress()
+                if progress['pending'] + progress['claimed'] == 0:
+                    logger.info(f"Worker {self.worker_id} finished {finished} tasks")
+                    return finished
+                # Other workers hold the rest; wait for them or for an expired lease
+                time.sleep(self.poll_seconds)
+                continue
+
+            grown = Parallel(n_jobs=self.n_jobs, verbose=self.verbose)(
+                delayed(_grow_and_score)(clone(self.estimator), task['params'], checkpoints, X, y,
+                                         *splits[task['fold']], scorer)
+                for _, task in claimed
+            )
+            self.queue.complete([(task_id, scores) for (task_id, _), scores in zip(claimed, grown)])
+            finished += len(claimed)
+
+    def fit(self, X, y):
+        candidates, settings, checkpoints, splits = self._plan(X, y)
+        self.open(X, y)
+        self.work(X, y)
+        return self._select(X, y, candidates, settings, checkpoints, len(splits), self.queue.scores())
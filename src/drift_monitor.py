@@ -0,0 +1,119 @@
+#drift_monitor.py
+import threading
+import time
+import numpy as np
+from utils.fork_safe_worker import ForkSafeWorker
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class DriftMonitor(ForkSafeWorker):
+    """
+    Runs drift detection off the request path.
+
+    Requests push their encoded feature vectors into a bounded ring buffer
+    (`submit`). A background thread runs the detector on the most recent
+    `window_size` rows whenever that many new rows have arrived, or every
+    `interval_seconds` if at least `min_window_size` new rows are waiting.
+    Each result is passed to `on_result(num_drifted_features, window_rows)`.
+    """
+
+    worker_name = 'drift-monitor'
+
+    def __init__(self, detector, n_features, window_size=500, interval_seconds=60.0,
+                 buffer_size=5000, min_window_size=50, on_result=None):
+        self.detector = detector
+        self.window_size = window_size
+        self.interval_seconds = interval_seconds
+        self.min_window_size = min_window_size
+        self.on_result = on_result
+
+        self._buffer = np.zeros((max(buffer_size, window_size), n_features))
+        self._next = 0          # next write position in the ring buffer
+        self._filled = 0        # valid rows in the buffer
+        self._pending = 0       # rows added since the last check
+        self._cond = threading.Condition()
+        self._stopped = False
+
+        self.last_num_drifted = 0
+        self.windows_checked = 0
+
+    @property
+    def drift_detected(self):
+        return self.last_num_drifted > 0
+
+    def submit(self, rows):
+        """
+        Adds one vector or a 2D batch to the buffer. Never blocks on detection.
+        """
+        rows = np.atleast_2d(rows)
+        size = len(self._buffer)
+        if len(rows) > size:
+            rows = rows[-size:]
+
+        with self._cond:
+            end = self._next + len(rows)
+            if end <= size:
+                self._buffer[self._next:end] = rows
+            else:
+                split = size - self._next
+                self._buffer[self._next:] = rows[:split]
+                self._buffer[:end - size] = rows[split:]
+            self._next = end % size
+            self._filled = min(self._filled + len(rows), size)
+            self._pending += len(rows)
+
+            if self._pending >= self.window_size:
+                self._cond.notify()
+
+        self._ensure_worker()
+
+    def _take_window(self):
+        size = len(self._buffer)
+        n_rows = min(self.window_size, self._filled)
+        start = (self._next - n_rows) % size
+        if start + n_rows <= size:
+            window = self._buffer[start:start + n_rows].copy()
+        else:
+            window = np.concatenate([self._buffer[start:], self._buffer[:self._next]])
+        self._pending = 0
+        return window
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.interval_seconds
+                while not self._stopped and self._pending < self.window_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        if self._pending >= self.min_window_size:
+                            break
+                        deadline = time.monotonic() + self.interval_seconds
+                        remaining = self.interval_seconds
+                    self._cond.wait(remaining)
+                if self._stopped:
+                    return
+                window = self._take_window()
+
+            self.check(window)
+
+    def check(self, window):
+        """
+        Runs the detector on one window and reports the result.
+        """
+        try:
+            drift_result = self.detector.predict(window)
+            is_drift = np.atleast_1d(drift_result['data']['is_drift'])
+            self.last_num_drifted = int(is_drift.sum())
+            self.windows_checked += 1
+            if self.on_result is not None:
+                self.on_result(self.last_num_drifted, len(window))
+        except Exception as e:
+            logger.error(f"Error while checking drift window: {e}")
+        return self.last_num_drifted
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
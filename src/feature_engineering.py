@@ -0,0 +1,112 @@
+#feature_engineering.py
+import numpy as np
+
+# Columns used by the derived features
+ONLINE_SERVICE_COLUMNS = ['OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport']
+STREAMING_COLUMNS = ['StreamingTV', 'StreamingMovies']
+SERVICE_COLUMNS = ['PhoneService', 'MultipleLines', 'InternetService', 'OnlineSecurity', 'OnlineBackup',
+                   'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies']
+
+# Values that count as an active service
+ACTIVE_SERVICE_VALUES = ['Yes', 'Fiber optic', 'DSL']
+_ACTIVE_SERVICE_SET = frozenset(ACTIVE_SERVICE_VALUES)
+
+# Raw numeric inputs (kept as numbers, not label encoded)
+NUMERIC_INPUT_COLUMNS = ['SeniorCitizen', 'tenure', 'MonthlyCharges', 'TotalCharges']
+
+DERIVED_FEATURES = ['AvgMonthlySpend', 'NoOnlineServices', 'NoStreaming', 'TotalServices', 'RiskScore']
+
+# Labels used by the web form that differ from the training data
+SERVING_VALUE_ALIASES = {
+    'Fiber Optic': 'Fiber optic',
+    'Sem serviço de telefone': 'No phone service',
+    'Sem serviço de internet': 'No internet service'
+}
+
+
+def normalize_categories(dataframe, columns):
+    """
+    Maps the labels used by the serving forms to the values seen in training.
+    """
+    for col in columns:
+        if col in dataframe.columns:
+            dataframe[col] = dataframe[col].replace(SERVING_VALUE_ALIASES)
+    return dataframe
+
+
+def _count_equal(dataframe, columns, value):
+    count = np.zeros(len(dataframe), dtype=np.int64)
+    for col in columns:
+        count += (dataframe[col].to_numpy() == value)
+    return count
+
+
+def add_derived_features(dataframe):
+    """
+    Adds AvgMonthlySpend, NoOnlineServices, NoStreaming, TotalServices and RiskScore.
+
+    Expects the raw (not yet encoded) categorical values and numeric
+    tenure/TotalCharges. Every feature is computed column-wise, so the same
+    function is used by DataProcessor (training) and by the serving app.
+    """
+    tenure = dataframe['tenure'].to_numpy()
+
+    dataframe['AvgMonthlySpend'] = dataframe['TotalCharges'].to_numpy() / (tenure + 1)
+
+    no_online_security = dataframe['OnlineSecurity'].to_numpy() == 'No'
+    no_tech_support = dataframe['TechSupport'].to_numpy() == 'No'
+
+    dataframe['NoOnlineServices'] = _count_equal(dataframe, ONLINE_SERVICE_COLUMNS, 'No')
+    dataframe['NoStreaming'] = _count_equal(dataframe, STREAMING_COLUMNS, 'No')
+
+    total_services = np.zeros(len(dataframe), dtype=np.int64)
+    for col in SERVICE_COLUMNS:
+        total_services += dataframe[col].isin(ACTIVE_SERVICE_VALUES).to_numpy()
+    dataframe['TotalServices'] = total_services
+
+    dataframe['RiskScore'] = (
+        (dataframe['Contract'].to_numpy() == 'Month-to-month').astype(np.int64) +
+        no_online_security +
+        no_tech_support +
+        (dataframe['PaymentMethod'].to_numpy() == 'Electronic check') +
+        (tenure < 6)
+    )
+
+    return dataframe
+
+
+def encode_features(dataframe, encoders, feature_columns):
+    """
+    Applies fitted label encoders for serving and aligns the columns to the
+    training order. Unknown categories fall back to the first encoder class.
+    """
+    for col, encoder in encoders.items():
+        if col in dataframe.columns and col != 'Churn':
+            values = dataframe[col].where(dataframe[col].isin(encoder.classes_), encoder.classes_[0])
+            dataframe[col] = encoder.transform(values)
+
+    return dataframe.reindex(columns=feature_columns, fill_value=0).astype(float)
+
+
+def derive_row_features(record):
+    """
+    Single-record version of add_derived_features for the pandas-free serving path.
+    `record` maps column names to raw values (already normalized, numbers as float).
+    """
+    tenure = record['tenure']
+    online = [record[col] for col in ONLINE_SERVICE_COLUMNS]
+    streaming = [record[col] for col in STREAMING_COLUMNS]
+
+    return {
+        'AvgMonthlySpend': record['TotalCharges'] / (tenure + 1),
+        'NoOnlineServices': online.count('No'),
+        'NoStreaming': streaming.count('No'),
+        'TotalServices': sum([record[col] in _ACTIVE_SERVICE_SET for col in SERVICE_COLUMNS]),
+        'RiskScore': (
+            (record['Contract'] == 'Month-to-month') +
+            (record['OnlineSecurity'] == 'No') +
+            (record['TechSupport'] == 'No') +
+            (record['PaymentMethod'] == 'Electronic check') +
+            (tenure < 6)
+        )
+    }
@@ -0,0 +1,92 @@
+#feature_store.py
+import json
+import os
+import numpy as np
+import pandas as pd
+from utils.logger import get_logger
+from utils.common_functions import load_data, save_frame
+
+logger = get_logger(__name__)
+
+KEY = 'customerID'
+HASH_COLUMN = '_row_hash'
+
+
+def row_hashes(dataframe):
+    """
+    64-bit content hash of every raw row (customerID included).
+    """
+    return pd.util.hash_pandas_object(dataframe, index=False).to_numpy()
+
+
+class FeatureStore:
+    """
+    Processed feature rows keyed by customerID, each with the hash of the raw
+    row it was computed from.
+
+    DataProcessor reuses a stored row when the customer's raw row hashes the
+    same, and recomputes the others. The store is tied to a version (the
+    feature code, raw columns and encoder classes); rows stored under another
+    version are dropped on first use. It is saved as Feather next to a small
+    JSON file holding the version.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.meta_path = f"{os.path.splitext(path)[0]}.json"
+        self.version = None
+        self.frame = None
+        if os.path.exists(self.path) and os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                self.version = json.load(f)['version']
+            self.frame = load_data(self.path).set_index(KEY)
+
+    def use_version(self, version):
+        if version != self.version:
+            if self.frame is not None:
+                logger.info("Feature store version changed; recomputing every row")
+            self.version = version
+            self.frame = None
+
+    def contains(self, ids, hashes):
+        """
+        Boolean mask of the rows stored with the same customerID and raw-row hash.
+        """
+        if self.frame is None or self.frame.empty:
+            return np.zeros(len(ids), dtype=bool)
+        positions = self.frame.index.get_indexer(ids)
+        stored = self.frame[HASH_COLUMN].to_numpy()[positions]
+        return (positions >= 0) & (stored == hashes)
+
+    def get(self, ids):
+        """
+        Stored features of ids (all present), in that order.
+        """
+        return self.frame.iloc[self.frame.index.get_indexer(ids)].drop(columns=HASH_COLUMN)
+
+    def update(self, ids, hashes, features):
+        rows = features.set_axis(pd.Index(ids, name=KEY)).assign(**{HASH_COLUMN: hashes})
+        rows = rows[~rows.index.duplicated(keep='last')]
+        if self.frame is None:
+            self.frame = rows
+        else:
+            self.frame = pd.concat([self.frame.drop(index=rows.index, errors='ignore'), rows])
+
+    def retain(self, ids):
+        """
+        Drops the customers that are no longer in the raw data.
+        """
+        if self.frame is not None:
+            keep = self.frame.index.isin(ids)
+            logger.info(f"Feature store: {(~keep).sum()} deleted customers dropped")
+            self.frame = self.frame[keep]
+
+    def save(self):
+        if self.frame is None:
+            return
+        # Without the version file the store is ignored, so a crash between the two writes is safe
+        if os.path.exists(self.meta_path):
+            os.remove(self.meta_path)
+        save_frame(self.frame.reset_index(), self.path)
+        with open(self.meta_path, 'w') as f:
+            json.dump({'version': self.version}, f)
@@ -0,0 +1,241 @@
+#forest_engine.py
+import os
+import json
+import numpy as np
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Arrays written by FlatForest.save (one .npy file each)
+ARRAY_NAMES = ['feature', 'threshold', 'children', 'value', 'roots']
+
+# Storage dtypes accepted by FlatForest.save
+THRESHOLD_DTYPES = ['float64', 'float32']
+VALUE_DTYPES = ['float64', 'float32', 'uint16']
+
+# (tree, row) pairs walked at a time by FlatForest.predict_proba on large batches
+BLOCK_PAIRS = 2 ** 18
+
+
+class FlatForest:
+    """
+    A trained RandomForestClassifier flattened into contiguous NumPy arrays.
+
+    All trees share one node table (feature, threshold, (left, right)
+    children, class probabilities); `roots` holds the first node of each tree. Leaves
+    point to themselves, so prediction advances every (tree, row) pair one
+    level at a time for `max_depth` steps with vectorized gathers, instead of
+    calling each sklearn tree separately. Large batches are walked a block of
+    trees at a time, so the nodes being read stay in cache.
+
+    Predictions match `RandomForestClassifier.predict_proba`: inputs are cast
+    to float32 like sklearn does and tree probabilities are summed in tree
+    order before dividing by the number of trees.
+
+    Saved forests can be opened memory-mapped (`load(mmap_mode='r')`), so all
+    processes serving the same files share one page-cache copy. They can also
+    be stored with reduced precision (see `save`).
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth, classes, n_features,
+                 value_scale=1.0):
+        # np.asarray drops the np.memmap subclass but keeps the mapped buffer
+        self.feature = np.asarray(feature)
+        self.threshold = np.asarray(threshold)
+        self.children = np.asarray(children)
+        self.value = np.asarray(value)
+        self.roots = np.asarray(roots)
+        self.value_scale = float(value_scale)
+        self.max_depth = int(max_depth)
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = int(n_features)
+        self.n_trees = len(roots)
+        self._children_flat = self.children.reshape(-1)
+        self._is_leaf = self.children[:, 0] == np.arange(len(self.children))
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """
+        Exports a fitted sklearn RandomForestClassifier (single output).
+        """
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset, max_depth = 0, 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            is_leaf = tree.children_left == -1
+            own_index = np.arange(n_nodes) + offset
+
+            value = tree.value[:, 0, :].astype(np.float64)
+            value = value / value.sum(axis=1, keepdims=True)
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, own_index, tree.children_left + offset))
+            rights.append(np.where(is_leaf, own_index, tree.children_right + offset))
+            values.append(value)
+            roots.append(offset)
+
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children=np.column_stack([np.concatenate(lefts), np.concatenate(rights)]).astype(np.int32),
+            value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.int32),
+            max_depth=max_depth,
+            classes=forest.classes_,
+            n_features=forest.n_features_in_
+        )
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ARRAY_NAMES)
+
+    def _walk(self, X, roots):
+        n_rows = len(X)
+        # One entry per (tree, row) pair, tree-major: consecutive pairs read the same tree's
+        # nodes, which stay in cache. Offsets index X.ravel() and the (left, right) children table
+        node = np.repeat(roots, n_rows)
+        row_offset = np.tile(np.arange(n_rows, dtype=np.int32) * np.int32(X.shape[1]), len(roots))
+        X_flat = X.ravel()
+
+        active = None
+        current = node
+        pending = ~np.take(self._is_leaf, current)
+        while pending.any():
+            # Drop finished pairs once they are the majority (compaction is not free)
+            if 2 * np.count_nonzero(pending) < pending.size:
+                active = np.flatnonzero(pending) if active is None else active[pending]
+                current, row_offset = current[pending], row_offset[pending]
+
+            x = np.take(X_flat, row_offset + np.take(self.feature, current))
+            go_right = ~(x <= np.take(self.threshold, current))
+            current = np.take(self._children_flat, 2 * current + go_right)
+            if active is None:
+                node = current
+            else:
+                node[active] = current
+            pending = ~np.take(self._is_leaf, current)
+
+        return node.reshape(len(roots), n_rows)
+
+    def _leaves(self, X):
+        return self._walk(X, self.roots).T
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        # Large batches walk the trees in blocks of about BLOCK_PAIRS (tree, row) pairs, so the
+        # nodes of a block stay in cache instead of every step gathering from the whole forest
+        trees_per_block = min(self.n_trees, max(1, BLOCK_PAIRS // max(1, len(X))))
+        total_dtype = np.uint64 if np.issubdtype(self.value.dtype, np.integer) else np.float64
+        proba = None
+        for start in range(0, self.n_trees, trees_per_block):
+            values = self.value[self._walk(X, self.roots[start:start + trees_per_block])]
+            if proba is not None:
+                # The running total goes first, so trees are still added one by one in tree order
+                values = np.concatenate([proba[np.newaxis], values])
+            # (trees, rows, classes) reduced over the outer tree axis: summed in tree order
+            # (uint16 values are summed as integers, so quantized sums are exact)
+            proba = values.sum(axis=0, dtype=total_dtype)
+        return proba / (self.n_trees * self.value_scale)
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+    def with_precision(self, threshold_dtype='float64', value_dtype='float64'):
+        """
+        Copy of the forest with smaller storage types.
+
+        float32 thresholds are rounded down to the nearest float32, which
+        keeps every split decision on float32 inputs exact. uint16 leaf values
+        store each probability in units of 1/65535, so probabilities may move
+        by at most 1/131070. float32 leaf values are off by about 1e-7.
+        """
+        if threshold_dtype not in THRESHOLD_DTYPES:
+            raise ValueError(f"threshold_dtype must be one of {THRESHOLD_DTYPES}, got {threshold_dtype!r}")
+        if value_dtype not in VALUE_DTYPES:
+            raise ValueError(f"value_dtype must be one of {VALUE_DTYPES}, got {value_dtype!r}")
+
+        threshold = self.threshold.astype(np.float64)
+        if threshold_dtype == 'float32':
+            # x <= t  <=>  x <= largest float32 not above t, for any float32 x
+            rounded = threshold.astype(np.float32)
+            too_high = rounded.astype(np.float64) > threshold
+            rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+            threshold = rounded
+
+        value = self.value / self.value_scale
+        value_scale = 1.0
+        if value_dtype == 'uint16':
+            value_scale = float(np.iinfo(np.uint16).max)
+            value = np.rint(value * value_scale).astype(np.uint16)
+        else:
+            value = value.astype(value_dtype)
+
+        return FlatForest(self.feature, threshold, self.children, value, self.roots, self.max_depth,
+                          self.classes_, self.n_features_in_, value_scale=value_scale)
+
+    def save(self, directory, threshold_dtype=None, value_dtype=None):
+        """
+        Writes one .npy file per array plus meta.json. Pass `threshold_dtype`
+        / `value_dtype` to store a reduced-precision copy (see with_precision).
+        """
+        forest = self
+        if threshold_dtype or value_dtype:
+            forest = self.with_precision(threshold_dtype or str(self.threshold.dtype),
+                                         value_dtype or str(self.value.dtype))
+
+        # Each file is written aside and renamed into place (meta.json last): processes
+        # that memory-mapped the previous version keep reading the old inodes
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            path = os.path.join(directory, f'{name}.npy')
+            with open(path + '.tmp', 'wb') as f:
+                np.save(f, np.ascontiguousarray(getattr(forest, name)))
+            os.replace(path + '.tmp', path)
+
+        meta = {
+            'max_depth': forest.max_depth,
+            'classes': forest.classes_.tolist(),
+            'n_features': forest.n_features_in_,
+            'n_trees': forest.n_trees,
+            'n_nodes': forest.n_nodes,
+            'value_scale': forest.value_scale,
+            'dtypes': {name: str(getattr(forest, name).dtype) for name in ARRAY_NAMES}
+        }
+        meta_path = os.path.join(directory, 'meta.json')
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+        logger.info(f"Flat forest saved to {directory} ({forest.n_trees} trees, {forest.n_nodes} nodes, "
+                    f"{forest.nbytes / 2**20:.1f} MiB)")
+
+    @classmethod
+    def load(cls, directory, mmap_mode=None):
+        """
+        Loads a saved forest. With mmap_mode='r' the arrays stay in the OS
+        page cache and are shared by every process that maps the same files.
+        """
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode)
+            for name in ARRAY_NAMES
+        }
+        # Catches a directory caught halfway through a save
+        sizes = {name: len(arrays[name]) for name in ARRAY_NAMES if name != 'roots'}
+        if set(sizes.values()) != {meta['n_nodes']} or len(arrays['roots']) != meta['n_trees']:
+            raise ValueError(f"Flat forest in {directory} is inconsistent with its meta.json: {sizes}")
+        return cls(max_depth=meta['max_depth'], classes=meta['classes'], n_features=meta['n_features'],
+                   value_scale=meta.get('value_scale', 1.0), **arrays)
@@ -0,0 +1,169 @@
+#gcs_download.py
+import base64
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def stored_checksum(blob):
+    """
+    (algorithm, base64 digest) GCS keeps for the object: MD5, or CRC32C for
+    composite objects, which have no MD5. (None, None) if neither is known.
+    """
+    if blob.md5_hash:
+        return 'md5', blob.md5_hash
+    if getattr(blob, 'crc32c', None):
+        return 'crc32c', blob.crc32c
+    return None, None
+
+
+def file_checksum(path, algorithm):
+    """
+    Base64 digest of a local file in the format GCS reports it.
+    """
+    if algorithm == 'md5':
+        digest = hashlib.md5()
+    else:
+        import google_crc32c
+        digest = google_crc32c.Checksum()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return base64.b64encode(digest.digest()).decode()
+
+
+def is_generation_mismatch(error):
+    # google.api_core.exceptions.PreconditionFailed (HTTP 412) raised by if_generation_match
+    return getattr(error, 'code', None) == 412
+
+
+def is_unchanged(blob, local_file):
+    """
+    True when local_file already holds the object's bytes (size and checksum match).
+    """
+    algorithm, expected = stored_checksum(blob)
+    if expected is None or not os.path.exists(local_file) or os.path.getsize(local_file) != blob.size:
+        return False
+    return file_checksum(local_file, algorithm) == expected
+
+
+class RangedDownload:
+    """
+    Downloads a GCS object in byte ranges on a thread pool.
+
+    Ranges are written in place into `<local_file>.part`, and each finished
+    range is appended to the `<local_file>.part.json` journal. If the
+    download fails, rerunning it fetches only the missing ranges, as long
+    as the object's generation is unchanged. Every range is requested for
+    that generation: if the object is overwritten mid-download, the partial
+    file and journal are removed and the run fails. The assembled file is
+    checked against the object's stored MD5 (or CRC32C) before it is renamed
+    into place. `blob` needs the `size`, `generation`, `md5_hash`/`crc32c`
+    attributes and `download_as_bytes(start=, end=, if_generation_match=)`
+    of `google.cloud.storage.Blob`.
+    """
+
+    def __init__(self, blob, local_file, chunk_size=64 << 20, workers=8, retries=3):
+        self.blob = blob
+        self.local_file = local_file
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.retries = retries
+        self.part_file = f"{local_file}.part"
+        self.journal_file = f"{local_file}.part.json"
+        self._lock = threading.Lock()
+
+    def ranges(self):
+        return [(start, min(start + self.chunk_size, self.blob.size) - 1)
+                for start in range(0, self.blob.size, self.chunk_size)]
+
+    def _read_journal(self):
+        """
+        Starts of the ranges already on disk from an earlier attempt at the same generation.
+        """
+        if not (os.path.exists(self.part_file) and os.path.exists(self.journal_file)):
+            return set()
+        with open(self.journal_file) as f:
+            header, *done = f.read().splitlines() or ['{}']
+        try:
+            header = json.loads(header)
+        except ValueError:
+            return set()
+        if header != self._header():
+            return set()
+        return {int(start) for start in done}
+
+    def _header(self):
+        return {"generation": str(self.blob.generation), "size": self.blob.size, "chunk_size": self.chunk_size}
+
+    def _fetch(self, fd, start, end):
+        for attempt in range(1, self.retries + 1):
+            try:
+                data = self.blob.download_as_bytes(start=start, end=end,
+                                                   if_generation_match=self.blob.generation)
+                if len(data) != end - start + 1:
+                    raise IOError(f"short read for bytes {start}-{end}: {len(data)} bytes")
+                os.pwrite(fd, data, start)
+                break
+            except Exception as e:
+                if attempt == self.retries or is_generation_mismatch(e):
+                    raise
+                logger.warning(f"Retrying bytes {start}-{end} after attempt {attempt} failed: {e}")
+        with self._lock:
+            with open(self.journal_file, 'a') as journal:
+                journal.write(f"{start}\n")
+
+    def _download(self, pending):
+        fd = os.open(self.part_file, os.O_WRONLY)
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for future in [pool.submit(self._fetch, fd, start, end) for start, end in pending]:
+                    future.result()
+        finally:
+            os.close(fd)
+
+    def _discard(self):
+        for path in (self.part_file, self.journal_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def run(self):
+        """
+        Downloads the missing ranges, verifies the file and renames it to local_file.
+        """
+        done = self._read_journal()
+        if not done:
+            with open(self.part_file, 'wb') as f:
+                f.truncate(self.blob.size)
+            with open(self.journal_file, 'w') as journal:
+                journal.write(json.dumps(self._header(), sort_keys=True) + "\n")
+        pending = [(start, end) for start, end in self.ranges() if start not in done]
+        logger.info(f"Downloading {len(pending)} of {len(self.ranges())} ranges "
+                    f"({self.blob.size} bytes) with {self.workers} workers")
+
+        try:
+            self._download(pending)
+        except Exception as e:
+            if not is_generation_mismatch(e):
+                raise
+            # Ranges of two generations cannot be combined; start over on the next run
+            self._discard()
+            raise IOError(f"{self.local_file}: the object changed during the download "
+                          f"(generation {self.blob.generation})") from e
+
+        algorithm, expected = stored_checksum(self.blob)
+        if expected is None:
+            logger.warning(f"No stored checksum for {self.local_file}; skipping verification")
+        else:
+            actual = file_checksum(self.part_file, algorithm)
+            if actual != expected:
+                # A corrupt file cannot be resumed; start over on the next run
+                self._discard()
+                raise IOError(f"{algorithm} mismatch for {self.local_file}: expected {expected}, got {actual}")
+        os.replace(self.part_file, self.local_file)
+        os.remove(self.journal_file)
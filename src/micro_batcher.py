@@ -0,0 +1,146 @@
+#micro_batcher.py
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+import numpy as np
+from utils.fork_safe_worker import ForkSafeWorker
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class MicroBatcher(ForkSafeWorker):
+    """
+    Coalesces concurrent single-row predictions into micro-batches.
+
+    Request threads queue their encoded vector (`submit`) and wait on a
+    Future. A background thread takes the oldest request and keeps
+    collecting until `max_batch_size` rows are queued or the request has
+    waited `wait_ms`. It then runs one vectorized `predict_fn(X)` and hands
+    each row its result. `predict_fn` returns (churn_proba, labels), one entry per row.
+
+    `wait_ms` adapts to load (AIMD), between 0 and `max_wait_ms`:
+    - A batch slower than `latency_budget_ms` (oldest request to result)
+      halves the wait.
+    - A wait during which new requests arrived adds `max_wait_ms / 10`.
+    - A wait during which none arrived halves the wait. Small waits drop
+      to 0, so an idle server answers right away.
+    - If the oldest request had already waited past the deadline (it
+      queued while the previous batch ran), the wait grows by one step
+      when the batch still holds several requests, and halves otherwise.
+
+    `on_batch(n_rows, latency_ms)` is called after every batch.
+    """
+
+    worker_name = 'micro-batcher'
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=5.0, latency_budget_ms=50.0, on_batch=None):
+        self.predict_fn = predict_fn
+        self.on_batch = on_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.latency_budget_ms = latency_budget_ms
+        self.wait_ms = 0.0
+
+        self._queue = deque()    # (vector, future, enqueue time)
+        self._cond = threading.Condition()
+        self._stopped = False
+
+        self.batches = 0
+        self.rows = 0
+        self.last_batch_size = 0
+        self.last_latency_ms = 0.0
+
+    def submit(self, vector):
+        """
+        Queues one encoded row; the Future resolves to (churn_proba, label).
+        """
+        future = Future()
+        with self._cond:
+            stopped = self._stopped
+            if not stopped:
+                self._queue.append((vector, future, time.monotonic()))
+                if len(self._queue) == 1 or len(self._queue) >= self.max_batch_size:
+                    self._cond.notify()
+        if stopped:
+            # A retired batcher still answers late requests, one at a time
+            self._score([(vector, future, time.monotonic())])
+        else:
+            self._ensure_worker()
+        return future
+
+    def predict(self, vector, timeout=None):
+        return self.submit(vector).result(timeout)
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue and not self._stopped:
+                self._cond.wait()
+            if not self._queue:
+                return None
+
+            queued = len(self._queue)
+            deadline = self._queue[0][2] + self.wait_ms / 1000
+            waited = deadline > time.monotonic()
+            while len(self._queue) < self.max_batch_size and not self._stopped:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            # None when the oldest request was already past its deadline
+            arrived = len(self._queue) - queued if waited else None
+            n_rows = min(len(self._queue), self.max_batch_size)
+            return [self._queue.popleft() for _ in range(n_rows)], arrived
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._score(*batch)
+
+    def _score(self, batch, arrived=None):
+        try:
+            X = np.vstack([vector for vector, _, _ in batch])
+            churn_proba, labels = self.predict_fn(X)
+            for i, (_, future, _) in enumerate(batch):
+                future.set_result((churn_proba[i], labels[i]))
+        except Exception as e:
+            logger.error(f"Error while scoring micro-batch of {len(batch)} rows: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+        latency_ms = (time.monotonic() - batch[0][2]) * 1000
+        self.batches += 1
+        self.rows += len(batch)
+        self.last_batch_size = len(batch)
+        self.last_latency_ms = latency_ms
+        self._adapt(len(batch), arrived, latency_ms)
+        if self.on_batch is not None:
+            self.on_batch(len(batch), latency_ms)
+
+    def _adapt(self, n_rows, arrived, latency_ms):
+        step = self.max_wait_ms / 10
+        if latency_ms > self.latency_budget_ms:
+            grow = False
+        elif n_rows >= self.max_batch_size:
+            return  # the batch filled up before the wait mattered
+        elif arrived is None:
+            grow = n_rows > 1   # requests piled up while the last batch ran
+        else:
+            grow = arrived > 0  # the wait caught more requests
+        if grow:
+            self.wait_ms = min(self.max_wait_ms, self.wait_ms + step)
+        else:
+            self.wait_ms = self.wait_ms / 2 if self.wait_ms / 2 >= step / 4 else 0.0
+
+    def stop(self):
+        """
+        Scores what is still queued, then ends the worker thread.
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
@@ -0,0 +1,93 @@
+#model_reloader.py
+import threading
+import time
+from utils.fork_safe_worker import ForkSafeWorker
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ModelReloader(ForkSafeWorker):
+    """
+    Hot-swaps the serving bundle when the artifacts on disk change.
+
+    A background thread polls `fingerprint_fn()` every `poll_seconds`; it
+    returns None while the artifacts on disk are not a complete bundle (see
+    ServingBundle.fingerprint). On a new fingerprint it calls `load_fn()` to
+    build and warm up the new bundle, which is rejected if its version is not
+    that fingerprint (the files changed while loading). Then
+    `swap_fn(new_bundle)` replaces the live one and returns the old bundle. The old bundle is retired (`retire()`) after `retire_seconds`,
+    so in-flight requests finish on the version they started with.
+
+    At most two bundles are alive at a time: no new candidate is loaded while
+    an old one is still waiting to be retired. A bundle that fails to load or
+    to warm up is skipped until the artifacts change again.
+    """
+
+    worker_name = 'model-reloader'
+
+    def __init__(self, fingerprint_fn, load_fn, swap_fn, current_version=None,
+                 poll_seconds=10.0, retire_seconds=30.0):
+        self.fingerprint_fn = fingerprint_fn
+        self.load_fn = load_fn
+        self.swap_fn = swap_fn
+        self.current_version = current_version
+        self.poll_seconds = poll_seconds
+        self.retire_seconds = retire_seconds
+
+        self._failed = None         # fingerprint that failed to load
+        self._retiring = None       # (bundle, retire at)
+        self._stop_event = threading.Event()
+
+        self.reloads = 0
+
+    def ensure_running(self):
+        self._ensure_worker()
+
+    def _worker_stopped(self):
+        return self._stop_event.is_set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.poll_seconds):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Error while checking for a new model: {e}")
+
+    def poll(self):
+        """
+        One watcher step; returns True when a new bundle was swapped in.
+        """
+        if self._retiring is not None:
+            bundle, retire_at = self._retiring
+            if time.monotonic() < retire_at:
+                return False
+            bundle.retire()
+            self._retiring = None
+            logger.info(f"Retired serving bundle {bundle.version}")
+
+        fingerprint = self.fingerprint_fn()
+        if fingerprint in (None, self.current_version, self._failed):
+            return False
+
+        logger.info(f"Artifacts changed ({self.current_version} -> {fingerprint}), loading the new bundle")
+        try:
+            new_bundle = self.load_fn()
+            if new_bundle.version != fingerprint:
+                new_bundle.retire()
+                raise ValueError(f"artifacts changed while loading (got {new_bundle.version})")
+        except Exception as e:
+            self._failed = fingerprint
+            logger.error(f"New serving bundle {fingerprint} rejected, keeping {self.current_version}: {e}")
+            return False
+
+        old_bundle = self.swap_fn(new_bundle)
+        self.current_version = new_bundle.version
+        self.reloads += 1
+        if old_bundle is not None:
+            self._retiring = (old_bundle, time.monotonic() + self.retire_seconds)
+        logger.info(f"Serving bundle {new_bundle.version} is live")
+        return True
+
+    def stop(self):
+        self._stop_event.set()
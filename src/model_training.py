@@ -1,16 +1,18 @@
 #model_training.py
 import os
+import time
 import joblib
 import mlflow
 import mlflow.sklearn
-import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import GridSearchCV
 from sklearn.metrics import f1_score, precision_score, recall_score, classification_report, confusion_matrix
 from config.paths_config import *
 from utils.logger import get_logger
 from utils.custom_exception import CustomException
-from utils.common_functions import read_yaml
+from utils.common_functions import read_yaml, load_data
+from src.forest_engine import FlatForest
+from src.serving_bundle import artifact_paths, write_manifest
+from src.search_strategies import build_search, search_summary
 
 logger = get_logger(__name__)
 
@@ -24,8 +26,9 @@ class ModelTrainer:
     def load_data(self):
         try:
             logger.info("Loading processed training and test datasets")
-            train_df = pd.read_csv(self.train_path)
-            test_df = pd.read_csv(self.test_path)
+            # Memory-mapped, read-only columns: the frames are only sliced, never modified
+            train_df = load_data(self.train_path, zero_copy=True)
+            test_df = load_data(self.test_path, zero_copy=True)
 
             X_train = train_df.drop(columns='Churn')
             y_train = train_df['Churn']
@@ -44,26 +47,81 @@ class ModelTrainer:
             os.makedirs(MODEL_DIR, exist_ok=True)
             joblib.dump(model, MODEL_PATH)
             logger.info(f"Model successfully saved to: {MODEL_PATH}")
+
+            # Flattened copy of the forest for the serving engine
+            flat_config = self.config.get("flat_model_config", {})
+            FlatForest.from_sklearn(model).save(
+                FLAT_MODEL_DIR,
+                threshold_dtype=flat_config.get("threshold_dtype"),
+                value_dtype=flat_config.get("value_dtype")
+            )
+
+            # Last: serving apps reload only once the manifest matches every artifact
+            write_manifest(artifact_paths())
         except Exception as e:
             logger.error("Error saving model.")
             raise CustomException("Error saving model", e)
 
-    def train_model(self, X_train, y_train, X_test, y_test):
-        try:
-            logger.info("Starting model training with GridSearch and MLflow")
+    def make_search(self):
+        """
+        Returns (strategy, search) as configured in search_config and grid_search_config.
+        """
+        search_config = self.config.get("search_config", {"strategy": "grid"})
+        strategy = search_config.get("strategy", "grid")
+
+        rf_params = self.config["model_config"]
+        rf = RandomForestClassifier(**rf_params)
+
+        grid_config = dict(self.config["grid_search_config"])
+        param_grid = dict(grid_config.pop("param_grid"))
 
-            rf_params = self.config["model_config"]
-            rf = RandomForestClassifier(**rf_params)
+        param_grid["max_depth"] = [None if v is None else v for v in param_grid['max_depth']]
 
-            grid_config = self.config["grid_search_config"] 
-            param_grid = grid_config.pop("param_grid")
+        return strategy, build_search(rf, param_grid, grid_config, search_config)
 
-            param_grid["max_depth"] = [None if v is None else v for v in param_grid['max_depth']]
+    def run_search_worker(self):
+        """
+        Joins a distributed search (strategy: distributed) as a worker: waits until the
+        coordinator has opened the queue for the current processed data, then works
+        until every task is done. The coordinator refits, logs and saves the model.
+        """
+        try:
+            strategy, search = self.make_search()
+            if strategy != "distributed":
+                raise ValueError(f"Search workers need search_config.strategy 'distributed', not '{strategy}'")
+
+            wait_seconds = self.config["search_config"].get("distributed", {}).get("wait_seconds", 3600)
+            deadline = time.monotonic() + wait_seconds
+            loaded_mtime = None
+            while True:
+                # The coordinator may still be writing the processed data; reload it when it changes
+                mtime = os.path.getmtime(self.train_path) if os.path.exists(self.train_path) else None
+                if mtime is not None and mtime != loaded_mtime:
+                    X_train, y_train, _, _ = self.load_data()
+                    loaded_mtime = mtime
+                if loaded_mtime is not None and search.ready(X_train, y_train):
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"No search for the current training data in {search.queue.path} "
+                                       f"after {wait_seconds}s")
+                time.sleep(search.poll_seconds)
+
+            logger.info(f"Joined distributed search in {search.queue.path} as {search.worker_id}")
+            return search.work(X_train, y_train)
+
+        except Exception as e:
+            logger.error(f"Error in distributed search worker: {e}")
+            raise CustomException("Error in distributed search worker", e)
 
-            grid_search = GridSearchCV(estimator=rf, param_grid=param_grid, **grid_config)
+    def train_model(self, X_train, y_train, X_test, y_test):
+        try:
+            strategy, grid_search = self.make_search()
+            logger.info(f"Starting model training with {strategy} search and MLflow")
 
-            with mlflow.start_run(run_name="RandomForest_SMOTE_GridSearch", nested=True) as run:
+            with mlflow.start_run(run_name=f"RandomForest_SMOTE_{strategy.capitalize()}Search", nested=True) as run:
+                start = time.perf_counter()
                 grid_search.fit(X_train, y_train)
+                search_seconds = time.perf_counter() - start
 
                 best_model = grid_search.best_estimator_
                 y_pred = best_model.predict(X_test)
@@ -76,6 +134,10 @@ class ModelTrainer:
                 mlflow.log_metric("f1_score", f1)
                 mlflow.log_metric("precision", precision)
                 mlflow.log_metric("recall", recall)
+
+                mlflow.log_param("search_strategy", strategy)
+                mlflow.log_metric("search_seconds", search_seconds)
+                mlflow.log_metrics(search_summary(grid_search))
     
                 # Saving the model locally first
                 self.save_model(best_model)
@@ -0,0 +1,87 @@
+#prediction_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of single-row predictions with a per-entry TTL.
+
+    Entries are keyed on a hash of the encoded feature vector and the serving
+    bundle version, so a new model or new encoder tables never return stale
+    results. Entries of a replaced version are not cleared: requests still
+    running on the old bundle during a hot reload keep using them, and they
+    age out through the LRU bound and the TTL.
+    `on_event(event, count)` is called for 'hit', 'miss' and 'eviction'
+    (LRU or expired) events.
+    """
+
+    def __init__(self, max_entries=50000, ttl_seconds=300.0, on_event=None, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.on_event = on_event
+        self.clock = clock
+
+        self._entries = OrderedDict()   # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(vector, version):
+        # Canonical bytes: contiguous float64, -0.0 folded into 0.0
+        canonical = np.ascontiguousarray(vector, dtype=np.float64) + 0.0
+        digest = hashlib.blake2b(canonical.tobytes(), digest_size=16)
+        digest.update(str(version).encode())
+        return digest.digest()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _report(self, event, count=1):
+        if self.on_event is not None and count:
+            self.on_event(event, count)
+
+    def get(self, vector, version):
+        """
+        Cached value for `vector` under model `version`, or None.
+        """
+        key = self.key(vector, version)
+        expired = 0
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= self.clock():
+                del self._entries[key]
+                expired += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.evictions += expired
+
+        self._report('eviction', expired)
+        self._report('hit' if entry is not None else 'miss')
+        return entry[0] if entry is not None else None
+
+    def put(self, vector, version, value):
+        key = self.key(vector, version)
+        with self._lock:
+            evicted = 0
+            self._entries[key] = (value, self.clock() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            self.evictions += evicted
+        self._report('eviction', evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
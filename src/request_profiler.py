@@ -0,0 +1,105 @@
+#request_profiler.py
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from utils.fork_safe_worker import ForkSafeWorker
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RequestProfiler(ForkSafeWorker):
+    """
+    Opt-in sampling profiler that keeps flame-graph data for the slowest requests.
+
+    Request threads call `start()` when a request begins and `finish(label)`
+    when it ends. While requests are in flight, a background thread samples
+    their Python stacks every `interval_ms`. When a request finishes among
+    the `keep_slowest` slowest seen by this process, its samples are written
+    to `output_dir` in folded-stack format: one "frame;frame;frame count"
+    line per stack, readable by flamegraph.pl or speedscope. Files of
+    requests that drop out of the top N are deleted.
+    """
+
+    worker_name = 'request-profiler'
+
+    def __init__(self, output_dir, keep_slowest=20, interval_ms=5.0, max_depth=64):
+        self.output_dir = output_dir
+        self.keep_slowest = keep_slowest
+        self.interval = interval_ms / 1000
+        self.max_depth = max_depth
+
+        self._active = {}        # thread id -> (start time, Counter of folded stacks)
+        self._slowest = []       # min-heap of (duration, path) of the kept profiles
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    def start(self):
+        with self._lock:
+            self._active[threading.get_ident()] = (time.perf_counter(), Counter())
+        self._ensure_worker()
+
+    def finish(self, label):
+        """
+        Ends the current thread's request; returns its duration in seconds.
+        """
+        with self._lock:
+            entry = self._active.pop(threading.get_ident(), None)
+        if entry is None:
+            return None
+        started, stacks = entry
+        duration = time.perf_counter() - started
+        with self._lock:
+            slow = len(self._slowest) < self.keep_slowest or duration > self._slowest[0][0]
+        if stacks and slow:
+            self._keep(duration, label, stacks)
+        return duration
+
+    def _keep(self, duration, label, stacks):
+        path = os.path.join(
+            self.output_dir,
+            f"{duration * 1000:010.2f}ms_{label}_{os.getpid()}_{next(self._sequence)}.folded"
+        )
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(path, 'w') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        except OSError as e:
+            logger.error(f"Error writing request profile {path}: {e}")
+            return
+
+        with self._lock:
+            heapq.heappush(self._slowest, (duration, path))
+            dropped = heapq.heappop(self._slowest) if len(self._slowest) > self.keep_slowest else None
+        if dropped is not None:
+            try:
+                os.remove(dropped[1])
+            except OSError:
+                pass
+
+    def _fold(self, frame):
+        frames = []
+        while frame is not None and len(frames) < self.max_depth:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(frames))
+
+    def _run(self):
+        while not self._stopped:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, (_, stacks) in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[self._fold(frame)] += 1
+
+    def stop(self):
+        self._stopped = True
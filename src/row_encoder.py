@@ -0,0 +1,133 @@
+#row_encoder.py
+import numpy as np
+from src.feature_engineering import (
+    ONLINE_SERVICE_COLUMNS, STREAMING_COLUMNS, SERVICE_COLUMNS, SERVING_VALUE_ALIASES,
+    DERIVED_FEATURES, derive_row_features
+)
+
+# Raw fields read by derive_row_features
+LOGIC_COLUMNS = sorted(set(ONLINE_SERVICE_COLUMNS + STREAMING_COLUMNS + SERVICE_COLUMNS +
+                           ['Contract', 'PaymentMethod']))
+
+
+class RowEncoder:
+    """
+    Encodes one raw customer record straight into a float64 vector in the
+    training column order, without building a DataFrame.
+
+    The label encoders are compiled once into plain dict lookup tables
+    (form aliases included); unknown categories fall back to the first
+    encoder class, as in the DataFrame path.
+    """
+
+    def __init__(self, encoders, feature_columns):
+        """
+        `encoders` maps column -> fitted LabelEncoder (or directly its classes_ array).
+        """
+        self.feature_columns = list(feature_columns)
+        self.n_features = len(self.feature_columns)
+        positions = {col: i for i, col in enumerate(self.feature_columns)}
+
+        # (position, column, lookup table, fallback code) for each encoded column
+        self.classes = {}
+        self.tables = {}
+        self.categorical = []
+        for col, encoder in encoders.items():
+            if col == 'Churn' or col not in positions:
+                continue
+            classes = [str(value) for value in getattr(encoder, 'classes_', encoder)]
+            table = {value: float(code) for code, value in enumerate(classes)}
+            for alias, value in SERVING_VALUE_ALIASES.items():
+                if value in table:
+                    table.setdefault(alias, table[value])
+            self.classes[col] = classes
+            self.tables[col] = table
+            self.categorical.append((positions[col], col, table, table[classes[0]]))
+
+        encoded = {col for _, col, _, _ in self.categorical}
+        self.derived = [(positions[col], col) for col in DERIVED_FEATURES if col in positions]
+        self.numeric = [
+            (i, col) for i, col in enumerate(self.feature_columns)
+            if col not in encoded and col not in DERIVED_FEATURES
+        ]
+
+    def encode(self, record, out=None):
+        """
+        Returns the encoded vector for `record` (dict of raw field values).
+        Pass `out` to reuse a preallocated float64 array of size n_features.
+        """
+        values = [0.0] * self.n_features
+        get = record.get
+
+        for i, col in self.numeric:
+            value = get(col)
+            values[i] = float(value) if value is not None and value != '' else 0.0
+
+        for i, col, table, fallback in self.categorical:
+            values[i] = table.get(get(col), fallback)
+
+        aliases = SERVING_VALUE_ALIASES
+        logic = {col: aliases.get(get(col), get(col)) for col in LOGIC_COLUMNS}
+        for col in ('tenure', 'TotalCharges'):
+            value = get(col)
+            logic[col] = float(value) if value is not None and value != '' else 0.0
+
+        derived = derive_row_features(logic)
+        for i, col in self.derived:
+            values[i] = derived[col]
+
+        if out is None:
+            return np.array(values)
+        out[:] = values
+        return out
+
+    def is_known(self, col, value):
+        """
+        True if `value` (or its form alias) is a training category of `col`;
+        columns without an encoder accept anything.
+        """
+        return col not in self.tables or value in self.tables[col]
+
+    def derived_values(self, vector):
+        """
+        Reads the derived features back from an encoded vector (for display).
+        """
+        return {
+            col: float(vector[i]) if col == 'AvgMonthlySpend' else int(vector[i])
+            for i, col in self.derived
+        }
+
+    def encode_frame(self, dataframe):
+        """
+        Vectorized counterpart of encode() for a DataFrame that already holds
+        the normalized raw columns and the derived features.
+        """
+        X = np.zeros((len(dataframe), self.n_features))
+
+        for i, col in self.numeric + self.derived:
+            if col in dataframe.columns:
+                X[:, i] = dataframe[col].to_numpy(dtype=np.float64)
+
+        for i, col, table, fallback in self.categorical:
+            if col in dataframe.columns:
+                X[:, i] = dataframe[col].map(table).fillna(fallback).to_numpy(dtype=np.float64)
+            else:
+                X[:, i] = fallback
+
+        return X
+
+    def save(self, path):
+        """
+        Stores the compiled tables as plain arrays (loads without unpickling sklearn objects).
+        """
+        arrays = {f'classes__{col}': np.array(classes) for col, classes in self.classes.items()}
+        np.savez(path, feature_columns=np.array(self.feature_columns), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            classes = {
+                key[len('classes__'):]: data[key].tolist()
+                for key in data.files if key.startswith('classes__')
+            }
+            return cls(classes, data['feature_columns'].tolist())
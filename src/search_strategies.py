@@ -0,0 +1,249 @@
+#search_strategies.py
+import math
+import warnings
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import (GridSearchCV, HalvingGridSearchCV, HalvingRandomSearchCV,
+                                     ParameterGrid, check_cv)
+from sklearn.utils import _safe_indexing
+from config.paths_config import SEARCH_QUEUE_PATH
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SEARCH_STRATEGIES = ('grid', 'halving', 'hyperband', 'distributed')
+
+
+def _grow_and_score(estimator, params, checkpoints, X, y, train, test, scorer):
+    """
+    Grows one warm-started forest on a CV fold; returns its test score at each tree count.
+    """
+    X_train, y_train = _safe_indexing(X, train), _safe_indexing(y, train)
+    X_test, y_test = _safe_indexing(X, test), _safe_indexing(y, test)
+    estimator.set_params(**params, warm_start=True)
+    scores = []
+    with warnings.catch_warnings():
+        # The "balanced" class_weight warning is about growing on different data; every step sees the same fold
+        warnings.filterwarnings('ignore', message='class_weight presets', category=UserWarning)
+        for n_estimators in checkpoints:
+            estimator.set_params(n_estimators=n_estimators).fit(X_train, y_train)
+            scores.append(scorer(estimator, X_test, y_test))
+    return scores
+
+
+def _candidate_key(params):
+    return tuple(sorted(params.items()))
+
+
+class WarmStartGridSearchCV:
+    """
+    Exhaustive grid search for forests that grows the n_estimators values
+    instead of refitting them.
+
+    For each setting of the other parameters and each fold, one forest is
+    grown with warm_start through the sorted n_estimators values and scored
+    at every step. With a fixed random_state the first k trees of a grown
+    forest are the trees a fresh k-tree forest would fit, so the scores,
+    cv_results_ and the selected candidate match GridSearchCV on the same
+    grid. The [100, 200, 400, 600] sweep costs 600 trees per fold instead
+    of 1,300.
+    """
+
+    def __init__(self, estimator, param_grid, scoring=None, cv=5, n_jobs=None, verbose=0):
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.scoring = scoring
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.verbose = verbose
+
+    def _plan(self, X, y):
+        """
+        Candidates in GridSearchCV order, the other-parameter settings, tree checkpoints and CV splits.
+        """
+        param_grid = dict(self.param_grid)
+        param_grid.setdefault('n_estimators', [self.estimator.get_params()['n_estimators']])
+        candidates = list(ParameterGrid(param_grid))
+        checkpoints = sorted(set(param_grid['n_estimators']))
+        settings = list(ParameterGrid({k: v for k, v in param_grid.items() if k != 'n_estimators'}))
+        splits = list(check_cv(self.cv, y, classifier=True).split(X, y))
+        return candidates, settings, checkpoints, splits
+
+    def fit(self, X, y):
+        candidates, settings, checkpoints, splits = self._plan(X, y)
+        scorer = check_scoring(self.estimator, self.scoring)
+
+        grown = Parallel(n_jobs=self.n_jobs, verbose=self.verbose)(
+            delayed(_grow_and_score)(clone(self.estimator), params, checkpoints, X, y, train, test, scorer)
+            for params in settings for train, test in splits
+        )
+        return self._select(X, y, candidates, settings, checkpoints, len(splits), grown)
+
+    def _select(self, X, y, candidates, settings, checkpoints, n_splits, grown):
+        """
+        Builds cv_results_ from the grown scores (setting-major, fold-minor) and refits the best candidate.
+        """
+        by_candidate = {}
+        for i, params in enumerate(settings):
+            for step, n_estimators in enumerate(checkpoints):
+                key = _candidate_key(dict(params, n_estimators=n_estimators))
+                by_candidate[key] = [grown[i * n_splits + fold][step] for fold in range(n_splits)]
+        fold_scores = np.array([by_candidate[_candidate_key(c)] for c in candidates])
+
+        means = fold_scores.mean(axis=1)
+        self.cv_results_ = {'params': candidates, 'mean_test_score': means,
+                            'std_test_score': fold_scores.std(axis=1)}
+        for fold in range(n_splits):
+            self.cv_results_[f'split{fold}_test_score'] = fold_scores[:, fold]
+
+        # Same tie-breaking as GridSearchCV: first candidate with the best mean, NaN ranks last
+        self.best_index_ = int(np.argmax(np.where(np.isnan(means), -np.inf, means)))
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = float(means[self.best_index_])
+        self.n_splits_ = n_splits
+        self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+
+        self.trees_fitted_ = len(settings) * n_splits * checkpoints[-1] + self.best_params_['n_estimators']
+        logger.info(f"Warm-start grid: {self.trees_fitted_} trees fitted, "
+                    f"{len(settings) * n_splits * (sum(checkpoints) - checkpoints[-1])} saved")
+        return self
+
+
+class HyperbandSearchCV:
+    """
+    Hyperband: several successive-halving brackets over random candidates of
+    `param_grid`. Bracket s starts `factor**s`-ish candidates at
+    max_resources / factor**s and halves them up to max_resources, so some
+    brackets explore many cheap candidates and others few well-funded ones.
+    The best final-round candidate across brackets is refit on all data.
+
+    Exposes the attributes of the sklearn searches used by ModelTrainer
+    (best_estimator_, best_params_, best_score_).
+    """
+
+    def __init__(self, estimator, param_grid, resource='n_samples', factor=3, min_resources=None,
+                 max_resources=None, scoring=None, cv=5, n_jobs=None, verbose=0, random_state=None):
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.resource = resource
+        self.factor = factor
+        self.min_resources = min_resources
+        self.max_resources = max_resources
+        self.scoring = scoring
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.verbose = verbose
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        max_resources = self.max_resources or len(X)
+        min_resources = self.min_resources or max(1, max_resources // self.factor ** 3)
+        s_max = int(math.floor(math.log(max_resources / min_resources, self.factor) + 1e-9))
+        n_grid = len(ParameterGrid(self.param_grid))
+
+        self.brackets_ = []
+        best = None
+        for s in range(s_max, -1, -1):
+            n_candidates = min(n_grid, int(math.ceil((s_max + 1) / (s + 1) * self.factor ** s)))
+            bracket = HalvingRandomSearchCV(
+                self.estimator, self.param_grid, n_candidates=n_candidates, resource=self.resource,
+                factor=self.factor, min_resources=max(1, max_resources // self.factor ** s),
+                max_resources=max_resources, scoring=self.scoring, cv=self.cv, n_jobs=self.n_jobs,
+                verbose=self.verbose, refit=False,
+                random_state=None if self.random_state is None else self.random_state + s
+            )
+            bracket.fit(X, y)
+            self.brackets_.append(bracket)
+            logger.info(f"Hyperband bracket {s}: {n_candidates} candidates, "
+                        f"best score {bracket.best_score_:.4f} with {bracket.best_params_}")
+            if best is None or bracket.best_score_ > best.best_score_:
+                best = bracket
+
+        self.best_params_ = dict(best.best_params_)
+        self.best_score_ = best.best_score_
+        if self.resource != 'n_samples':
+            self.best_params_[self.resource] = max_resources
+        self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+        return self
+
+
+def build_search(estimator, param_grid, grid_config, search_config=None):
+    """
+    Hyperparameter search selected by `search_config['strategy']`:
+
+    - grid: exhaustive GridSearchCV (every candidate on all rows and trees); with
+      `warm_start` the n_estimators values are grown (see WarmStartGridSearchCV)
+    - halving: successive halving over the same grid; every round keeps the
+      best 1/factor of the candidates and gives them factor times more of
+      `resource` (training rows or trees), so bad settings stop early
+    - hyperband: several halving brackets over random candidates (see HyperbandSearchCV)
+    - distributed: the warm-start grid sharded over workers through a shared
+      queue (see src/distributed_search.py); settings under `distributed`
+
+    `grid_config` holds the settings shared by every strategy (scoring, cv, n_jobs, verbose).
+    """
+    search_config = dict(search_config or {})
+    strategy = search_config.pop('strategy', 'grid')
+    if strategy not in SEARCH_STRATEGIES:
+        raise ValueError(f"Unknown search strategy '{strategy}', expected one of {SEARCH_STRATEGIES}")
+    if strategy == 'distributed':
+        from src.distributed_search import DistributedSearchCV
+        distributed = search_config.get('distributed', {})
+        return DistributedSearchCV(
+            estimator, param_grid, queue_path=distributed.get('queue_path') or SEARCH_QUEUE_PATH,
+            lease_seconds=distributed.get('lease_seconds', 600), poll_seconds=distributed.get('poll_seconds', 5),
+            **grid_config
+        )
+    if strategy == 'grid':
+        if search_config.get('warm_start') and 'warm_start' in estimator.get_params() \
+                and len(param_grid.get('n_estimators', [])) > 1:
+            return WarmStartGridSearchCV(estimator, param_grid, **grid_config)
+        return GridSearchCV(estimator=estimator, param_grid=param_grid, **grid_config)
+
+    resource = search_config.get('resource', 'n_samples')
+    param_grid = dict(param_grid)
+    max_resources = search_config.get('max_resources')
+    if resource != 'n_samples':
+        # The budget replaces the grid values of that parameter; the largest one is the cap
+        grid_values = param_grid.pop(resource, [getattr(estimator, resource)])
+        max_resources = max_resources or max(grid_values)
+
+    random_state = search_config.get('random_state', estimator.get_params().get('random_state'))
+    if strategy == 'halving':
+        return HalvingGridSearchCV(
+            estimator, param_grid, resource=resource, factor=search_config.get('factor', 3),
+            min_resources=search_config.get('min_resources', 'exhaust'),
+            max_resources=max_resources or 'auto',
+            aggressive_elimination=search_config.get('aggressive_elimination', False),
+            random_state=random_state, **grid_config
+        )
+    return HyperbandSearchCV(
+        estimator, param_grid, resource=resource, factor=search_config.get('factor', 3),
+        min_resources=search_config.get('min_resources'), max_resources=max_resources,
+        random_state=random_state, **grid_config
+    )
+
+
+def search_summary(search):
+    """
+    Cost of a fitted search for MLflow: candidates evaluated, model fits and
+    trees grown (folds and refit included).
+    """
+    searches = getattr(search, 'brackets_', [search])
+    candidates = sum(len(s.cv_results_['params']) for s in searches)
+    n_splits = searches[0].n_splits_
+    default_trees = search.best_estimator_.n_estimators
+    trees_from_scratch = n_splits * sum(
+        p.get('n_estimators', default_trees) for s in searches for p in s.cv_results_['params']
+    ) + default_trees
+    trees_fitted = getattr(search, 'trees_fitted_', trees_from_scratch)
+    return {
+        'search_candidates': candidates,
+        'search_fits': candidates * n_splits + 1,
+        'search_trees': trees_fitted,
+        'search_trees_saved': trees_from_scratch - trees_fitted,
+        'cv_best_score': float(search.best_score_),
+    }
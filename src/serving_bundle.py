@@ -0,0 +1,209 @@
+#serving_bundle.py
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+from config.paths_config import *
+from utils.logger import get_logger
+from src.row_encoder import RowEncoder
+from src.reference_sketch import ReferenceSketch
+from src.forest_engine import FlatForest
+
+logger = get_logger(__name__)
+
+
+def artifacts_fingerprint(paths):
+    """
+    Cheap version id for a set of artifact files (path, size and mtime).
+    """
+    digest = hashlib.sha1()
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:12]
+
+
+def artifact_paths(model_path=MODEL_PATH, flat_model_dir=FLAT_MODEL_DIR,
+                   encoder_tables_path=ENCODER_TABLES_PATH, encoder_path=ENCODER_PATH,
+                   features_path=FEATURES_PATH, reference_sketch_path=REFERENCE_SKETCH_PATH):
+    """
+    Files that make up one serving bundle.
+    """
+    return [model_path, os.path.join(flat_model_dir, 'meta.json'), encoder_tables_path,
+            encoder_path, features_path, reference_sketch_path]
+
+
+def write_manifest(paths, manifest_path=BUNDLE_MANIFEST_PATH):
+    """
+    Records the version of the bundle and of each of its files. Written after
+    every artifact, so a manifest that still matches the files on disk marks a
+    complete bundle.
+    """
+    manifest = {
+        'version': artifacts_fingerprint(paths),
+        'artifacts': {os.path.basename(path): artifacts_fingerprint([path]) for path in paths}
+    }
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    logger.info(f"Bundle manifest {manifest['version']} saved to {manifest_path}")
+    return manifest['version']
+
+
+class ServingBundle:
+    """
+    Everything the app needs to score one model version: the model, the
+    compiled row encoder (feature columns + encoder tables) and the drift
+    reference sketch. `timings` records how long each startup phase took.
+
+    The app attaches the version's `drift_monitor` and `micro_batcher`, so a
+    request that picked up a bundle uses that version end to end, even if a
+    newer bundle is swapped in meanwhile.
+    """
+
+    def __init__(self, model, row_encoder, reference_sketch, version=None,
+                 large_batch_model_path=None, large_batch_rows=None):
+        self.model = model
+        self.row_encoder = row_encoder
+        self.reference_sketch = reference_sketch
+        self.version = version
+        self.feature_columns = row_encoder.feature_columns
+        self.classes = list(model.classes_)
+        self.positive_index = self.classes.index(1)
+        self.timings = {}
+        self.drift_monitor = None
+        self.micro_batcher = None
+
+        # Every batch goes through the memory-mapped flat engine unless
+        # `large_batch_rows` is set: above it the pickled sklearn forest (loaded
+        # on first use, a private copy per process) is faster on large batches.
+        # Offline scoring only; its float64 probabilities can differ from the
+        # reduced-precision flat arrays in the last digits.
+        self.large_batch_model_path = large_batch_model_path
+        self.large_batch_rows = large_batch_rows
+        self._large_batch_model = None
+        self._large_batch_lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(model_path=MODEL_PATH, flat_model_dir=FLAT_MODEL_DIR,
+                    encoder_tables_path=ENCODER_TABLES_PATH, encoder_path=ENCODER_PATH,
+                    features_path=FEATURES_PATH, reference_sketch_path=REFERENCE_SKETCH_PATH,
+                    manifest_path=BUNDLE_MANIFEST_PATH):
+        """
+        Version of the complete bundle on disk (same value as `version` after
+        load), or None while the files do not match the manifest: no manifest
+        yet, or a training run has rewritten some of them and not finished.
+        """
+        paths = artifact_paths(model_path, flat_model_dir, encoder_tables_path, encoder_path,
+                               features_path, reference_sketch_path)
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        current = {os.path.basename(path): artifacts_fingerprint([path]) for path in paths}
+        return manifest['version'] if manifest.get('artifacts') == current else None
+
+    @classmethod
+    def load(cls, model_path=MODEL_PATH, flat_model_dir=FLAT_MODEL_DIR,
+             encoder_tables_path=ENCODER_TABLES_PATH, encoder_path=ENCODER_PATH,
+             features_path=FEATURES_PATH, reference_sketch_path=REFERENCE_SKETCH_PATH,
+             sketch_grid_size=2001, large_batch_rows=None, mmap_model=True):
+        timings = {}
+
+        # Flattened forest when exported by ModelTrainer (no sklearn import needed);
+        # memory-mapped, so every worker on the host shares one page-cache copy
+        start = time.perf_counter()
+        if os.path.exists(os.path.join(flat_model_dir, 'meta.json')):
+            model = FlatForest.load(flat_model_dir, mmap_mode='r' if mmap_model else None)
+            use_sklearn = large_batch_rows is not None and os.path.exists(model_path)
+            large_batch_model_path = model_path if use_sklearn else None
+        else:
+            import joblib
+            logger.warning(f"{flat_model_dir} not found, serving the pickled model from {model_path}")
+            model = joblib.load(model_path)
+            large_batch_model_path = None
+        timings['load_model'] = time.perf_counter() - start
+
+        # Precompiled encoder tables; the pickled LabelEncoders are only a fallback
+        start = time.perf_counter()
+        if os.path.exists(encoder_tables_path):
+            row_encoder = RowEncoder.load(encoder_tables_path)
+        else:
+            import joblib
+            logger.warning(f"{encoder_tables_path} not found, compiling encoder tables from {encoder_path}")
+            row_encoder = RowEncoder(joblib.load(encoder_path), joblib.load(features_path))
+        timings['load_encoders'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if os.path.exists(reference_sketch_path):
+            reference_sketch = ReferenceSketch.load(reference_sketch_path)
+        else:
+            from utils.common_functions import load_data
+            logger.warning(f"{reference_sketch_path} not found, building the reference sketch from {PROCESSED_TRAIN_DATA_PATH}")
+            reference_sketch = ReferenceSketch.from_frame(
+                load_data(PROCESSED_TRAIN_DATA_PATH, zero_copy=True), row_encoder.feature_columns,
+                grid_size=sketch_grid_size
+            )
+        timings['load_reference'] = time.perf_counter() - start
+
+        version = artifacts_fingerprint(artifact_paths(model_path, flat_model_dir, encoder_tables_path,
+                                                       encoder_path, features_path, reference_sketch_path))
+        bundle = cls(model, row_encoder, reference_sketch, version=version,
+                     large_batch_model_path=large_batch_model_path, large_batch_rows=large_batch_rows)
+        bundle.timings.update(timings)
+        return bundle
+
+    def model_for(self, n_rows):
+        if self.large_batch_model_path is None or n_rows <= self.large_batch_rows:
+            return self.model
+        if self._large_batch_model is None:
+            with self._large_batch_lock:
+                if self._large_batch_model is None:
+                    import joblib
+                    self._large_batch_model = joblib.load(self.large_batch_model_path)
+        return self._large_batch_model
+
+    def predict_proba(self, X):
+        """
+        Churn probability and predicted label for each row of X.
+        """
+        proba = self.model_for(len(X)).predict_proba(X)
+        labels = np.take(self.classes, np.argmax(proba, axis=1))
+        return proba[:, self.positive_index], labels
+
+    def warm_up_rows(self, n_rows=8):
+        # Median reference values: a valid, representative input
+        median = self.reference_sketch.quantiles[:, self.reference_sketch.grid_size // 2]
+        return np.tile(median, (n_rows, 1))
+
+    def warm_up(self, detector=None):
+        """
+        Runs one single-row and one small-batch prediction (and optionally a
+        drift check) so lazy imports and first-call costs happen before traffic.
+        Raises ValueError if the model returns unusable probabilities.
+        """
+        start = time.perf_counter()
+        rows = self.warm_up_rows()
+        self.predict_proba(rows[:1])
+        churn_proba, _ = self.predict_proba(rows)
+        if churn_proba.shape != (len(rows),) or not np.all((churn_proba >= 0) & (churn_proba <= 1)):
+            raise ValueError(f"Serving bundle {self.version} returned invalid probabilities on the warm-up batch")
+        if detector is not None:
+            detector.predict(rows)
+        self.timings['warm_up'] = time.perf_counter() - start
+        logger.info(f"Serving bundle {self.version} warm: {self.timings}")
+        return self
+
+    def retire(self):
+        """
+        Stops the background threads of a bundle that was swapped out.
+        """
+        if self.micro_batcher is not None:
+            self.micro_batcher.stop()
+        if self.drift_monitor is not None:
+            self.drift_monitor.stop()
@@ -0,0 +1,63 @@
+import pandas as pd
+import sqlalchemy
+
+from dags.sql_loader import SqlLoader
+
+HEADER = "customerID,tenure,TotalCharges,Churn\n"
+
+
+def load(engine, path, rows):
+    path.write_text(HEADER + "".join(f"{row}\n" for row in rows))
+    return SqlLoader(engine, "Telco_Customer_Churn", chunksize=2).load(str(path))
+
+
+def table(engine):
+    return pd.read_sql('SELECT "customerID", tenure, "TotalCharges", "Churn" FROM "Telco_Customer_Churn" '
+                       'ORDER BY "customerID"', engine)
+
+
+def test_reload_upserts_only_new_or_changed_rows(tmp_path):
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'churn.db'}")
+    path = tmp_path / "export.csv"
+
+    first = load(engine, path, ["A,1,10.5,No", "B,2, ,Yes", "C,3,30.0,No"])
+    assert first["rows_read"] == 3 and first["rows_upserted"] == 3
+
+    second = load(engine, path, ["A,1,10.5,No", "B,2,20.0,Yes", "D,4,40.0,No"])
+    assert second["rows_read"] == 3
+    assert second["rows_upserted"] == 2  # B changed, D is new; A is untouched
+    assert second["rows_deleted"] == 1   # C left the export
+    assert second["rows_per_second"] > 0
+
+    result = table(engine)
+    assert result["customerID"].tolist() == ["A", "B", "D"]
+    assert result.loc[result["customerID"] == "B", "TotalCharges"].astype(float).item() == 20.0
+    assert not sqlalchemy.inspect(engine).has_table("Telco_Customer_Churn__staging")
+
+
+def test_legacy_table_is_replaced_atomically(tmp_path):
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'churn.db'}")
+    pd.DataFrame({"customerID": ["Z"], "tenure": [9]}).to_sql("Telco_Customer_Churn", engine, index=False)
+
+    load(engine, tmp_path / "export.csv", ["A,1,10.5,No"])
+
+    assert table(engine)["customerID"].tolist() == ["A"]
+
+
+def test_repeated_keys_keep_the_last_row(tmp_path):
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'churn.db'}")
+    path = tmp_path / "export.csv"
+
+    first = load(engine, path, ["A,1,10.5,No", "B,2,20.0,Yes", "A,5,50.0,Yes"])
+    assert first["rows_read"] == 3 and first["rows_duplicate"] == 1 and first["rows_upserted"] == 2
+
+    second = load(engine, path, ["B,2,20.0,Yes", "B,3,30.0,No", "A,5,50.0,Yes", "B,4,40.0,No"])
+    assert second["rows_duplicate"] == 2
+    assert second["rows_upserted"] == 1  # B changed; A's last row is unchanged
+    assert second["rows_deleted"] == 0
+
+    result = table(engine)
+    assert result["customerID"].tolist() == ["A", "B"]
+    assert result["tenure"].astype(int).tolist() == [5, 4]
+    assert "_row_number" not in {column["name"] for column in
+                                 sqlalchemy.inspect(engine).get_columns("Telco_Customer_Churn")}
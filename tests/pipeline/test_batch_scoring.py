@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from benchmarks.synthetic_data import make_processed_frame, make_raw_frame
+from pipeline import batch_scoring
+from src.row_encoder import RowEncoder
+from src.serving_bundle import ServingBundle
+
+
+class LinearModel:
+    """Deterministic stand-in for the forest: a logistic function of every feature."""
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, n_features):
+        self.weights = np.linspace(-1.0, 1.0, n_features) / 50
+
+    def predict_proba(self, X):
+        churn = 1 / (1 + np.exp(-(X @ self.weights)))
+        return np.column_stack([1 - churn, churn])
+
+
+@pytest.fixture
+def scoring_bundle(monkeypatch):
+    _, encoders, feature_columns = make_processed_frame(200)
+    bundle = ServingBundle(LinearModel(len(feature_columns)), RowEncoder(encoders, feature_columns),
+                           reference_sketch=None, version='test')
+    fill_values = {'SeniorCitizen': 0.0, 'tenure': 29.0, 'MonthlyCharges': 70.0, 'TotalCharges': 1400.0}
+
+    def load_bundle():
+        # Set in the parent before the pool forks, as the real loader does
+        monkeypatch.setattr(batch_scoring, '_bundle', bundle)
+        monkeypatch.setattr(batch_scoring, '_fill_values', fill_values)
+        return bundle
+
+    monkeypatch.setattr(batch_scoring, 'load_bundle', load_bundle)
+    return bundle
+
+
+def raw_customers(tmp_path, n_rows=503):
+    df = make_raw_frame(n_rows, seed=7).drop(columns=['Churn'])
+    df.loc[3, 'TotalCharges'] = ' '
+    csv_path = str(tmp_path / 'customers.csv')
+    df.to_csv(csv_path, index=False)
+    return df, csv_path
+
+
+def score(input_path, output_path, chunk_size, workers=1):
+    batch_scoring.BatchScorer(input_path, output_path, chunk_size=chunk_size, workers=workers).run()
+    return pq.read_table(output_path).to_pandas()
+
+
+def test_scores_do_not_depend_on_chunking_or_workers(tmp_path, scoring_bundle):
+    df, csv_path = raw_customers(tmp_path)
+    whole = score(csv_path, str(tmp_path / 'whole.parquet'), chunk_size=10000)
+    chunked = score(csv_path, str(tmp_path / 'chunked.parquet'), chunk_size=37, workers=2)
+
+    assert whole['customerID'].tolist() == df['customerID'].tolist()
+    pd.testing.assert_frame_equal(whole, chunked)
+    assert pq.read_schema(str(tmp_path / 'whole.parquet')).metadata[b'model_version'] == b'test'
+
+
+def test_csv_and_parquet_inputs_score_the_same(tmp_path, scoring_bundle):
+    df, csv_path = raw_customers(tmp_path)
+    parquet_path = str(tmp_path / 'customers.parquet')
+    pd.read_csv(csv_path, dtype={'customerID': str, 'TotalCharges': str}).to_parquet(parquet_path)
+
+    from_csv = score(csv_path, str(tmp_path / 'from_csv.parquet'), chunk_size=100)
+    from_parquet = score(parquet_path, str(tmp_path / 'from_parquet.parquet'), chunk_size=100)
+    pd.testing.assert_frame_equal(from_csv, from_parquet)
+
+
+def test_form_aliases_are_normalized_in_categorical_parquet_columns(tmp_path, scoring_bundle):
+    df, csv_path = raw_customers(tmp_path, n_rows=50)
+    df['InternetService'] = df['InternetService'].replace({'Fiber optic': 'Fiber Optic'})
+    aliased = str(tmp_path / 'aliased.parquet')
+    df.astype({'InternetService': 'category', 'Contract': 'category'}).to_parquet(aliased)
+
+    from_csv = score(csv_path, str(tmp_path / 'from_csv.parquet'), chunk_size=20)
+    from_parquet = score(aliased, str(tmp_path / 'from_parquet.parquet'), chunk_size=20)
+    assert (df['InternetService'] == 'Fiber Optic').any()
+    pd.testing.assert_frame_equal(from_csv, from_parquet)
+
+
+def test_missing_numbers_and_unknown_categories(tmp_path, scoring_bundle):
+    df, csv_path = raw_customers(tmp_path, n_rows=10)
+    df.loc[5, 'Contract'] = 'Three year'
+    df.loc[7, 'TotalCharges'] = 1400.0
+    df.loc[8] = df.loc[7]
+    df.loc[8, 'TotalCharges'] = ' '
+    df.to_csv(csv_path, index=False)
+
+    scores = score(csv_path, str(tmp_path / 'scores.parquet'), chunk_size=4)
+    proba = scores['churn_probability'].tolist()
+    assert len(scores) == 10 and np.isfinite(proba).all()
+    # Blanks take the training median, whatever the chunk's own values
+    assert proba[7] == proba[8]
+    assert scores['churn_label'].tolist() == [int(p >= 0.5) for p in proba]
+
+    # Unknown categories take the first encoder class, as in the app
+    encoder = scoring_bundle.row_encoder
+    X = encoder.encode_frame(batch_scoring.prepare_features(df.iloc[[5]].copy(), batch_scoring._fill_values))
+    assert X[0, encoder.feature_columns.index('Contract')] == 0
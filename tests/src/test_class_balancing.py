@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.class_balancing import approximate_neighbors, balance
+
+
+def imbalanced(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "code": rng.integers(0, 4, n).astype(np.uint8),
+        "charges": rng.uniform(0, 100, n).astype(np.float32),
+    })
+    y = pd.Series((rng.random(n) < 0.2).astype(np.uint8), name="Churn")
+    return X, y
+
+
+def test_approximate_neighbors_find_most_exact_neighbors():
+    X = np.random.default_rng(1).normal(size=(3000, 4)).astype(np.float32)
+    approx = approximate_neighbors(X, 5, random_state=0)
+
+    rows = np.arange(0, 3000, 30)
+    distances = ((X[rows, None, :] - X[None, :, :]) ** 2).sum(axis=2)
+    distances[np.arange(len(rows)), rows] = np.inf
+    exact = np.argsort(distances, axis=1)[:, :5]
+    recall = np.mean([len(set(a) & set(e)) / 5 for a, e in zip(approx[rows], exact)])
+
+    assert approx.shape == (3000, 5)
+    assert not (approx == np.arange(3000)[:, None]).any()
+    assert recall > 0.8
+
+
+def test_approx_smote_balances_and_keeps_dtypes():
+    X, y = imbalanced()
+    X_resampled, y_resampled = balance(X, y, {"strategy": "approx_smote", "chunk_size": 100}, random_state=42)
+
+    assert (y_resampled.value_counts() == (y == 0).sum()).all()
+    assert X_resampled.dtypes.to_dict() == X.dtypes.to_dict()
+    pd.testing.assert_frame_equal(X_resampled.iloc[:len(X)], X)
+    synthetic = X_resampled.iloc[len(X):]
+    minority = X[y == 1]
+    assert synthetic["charges"].between(minority["charges"].min(), minority["charges"].max()).all()
+
+
+@pytest.mark.parametrize("strategy, size", [("undersample", "min"), ("weights", "all")])
+def test_strategies_without_synthetic_rows(strategy, size):
+    X, y = imbalanced()
+    X_resampled, y_resampled = balance(X, y, {"strategy": strategy}, random_state=42)
+
+    if size == "min":
+        assert (y_resampled.value_counts() == (y == 1).sum()).all()
+    else:
+        assert len(X_resampled) == len(X)
+    assert X_resampled.merge(X, how="left", indicator=True)["_merge"].eq("both").all()
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError, match="Unknown balancing strategy"):
+        balance(*imbalanced(), {"strategy": "adasyn"})
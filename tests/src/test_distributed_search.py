@@ -0,0 +1,56 @@
+import multiprocessing as mp
+import time
+
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import GridSearchCV
+
+from src.distributed_search import DistributedSearchCV
+
+PARAM_GRID = {"n_estimators": [4, 8], "max_depth": [2, 4, None], "max_features": ["sqrt", "log2"]}
+
+
+def make_data():
+    return make_classification(n_samples=300, random_state=0)
+
+
+def make_search(queue_path, worker_id):
+    return DistributedSearchCV(RandomForestClassifier(random_state=0), PARAM_GRID, str(queue_path),
+                               scoring="f1", cv=3, n_jobs=1, poll_seconds=0.05, worker_id=worker_id)
+
+
+def run_worker(queue_path, worker_id, finished):
+    X, y = make_data()
+    search = make_search(queue_path, worker_id)
+    while not search.ready(X, y):
+        time.sleep(0.05)
+    finished.put(search.work(X, y))
+
+
+def test_local_workers_match_grid_search(tmp_path):
+    X, y = make_data()
+    queue_path = tmp_path / "queue.db"
+    context = mp.get_context("spawn")
+    finished = context.Queue()
+    workers = [context.Process(target=run_worker, args=(queue_path, f"worker-{i}", finished)) for i in range(2)]
+    for worker in workers:
+        worker.start()
+
+    search = make_search(queue_path, "coordinator").fit(X, y)
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    grid = GridSearchCV(RandomForestClassifier(random_state=0), PARAM_GRID, scoring="f1", cv=3).fit(X, y)
+    assert np.array_equal(search.cv_results_["mean_test_score"], grid.cv_results_["mean_test_score"])
+    assert search.best_params_ == grid.best_params_
+    assert search.queue.progress()["done"] == 3 * 2 * 3
+
+
+def test_reopening_the_same_search_resumes(tmp_path):
+    X, y = make_data()
+    search = make_search(tmp_path / "queue.db", "coordinator").fit(X, y)
+    # A restarted coordinator finds every task done and only reduces
+    assert search.queue.open(search.search_id(X, y), []) == 18
+    assert search.queue.claim("late-worker", 10) == []
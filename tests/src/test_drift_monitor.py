@@ -0,0 +1,70 @@
+import threading
+
+import numpy as np
+
+from src.drift_monitor import DriftMonitor
+
+
+class RecordingDetector:
+    """Flags feature 0 as drifted; keeps every window it was given."""
+
+    def __init__(self):
+        self.windows = []
+        self.checked = threading.Event()
+
+    def predict(self, window):
+        self.windows.append(window)
+        self.checked.set()
+        return {'data': {'is_drift': np.array([1, 0])}}
+
+
+def rows(start, stop):
+    return np.array([[i, -i] for i in range(start, stop)], dtype=float)
+
+
+def submit_and_wait(monitor, detector, batch, timeout=5):
+    detector.checked.clear()
+    monitor.submit(batch)
+    return detector.checked.wait(timeout)
+
+
+def test_full_windows_take_the_latest_rows_across_the_ring_boundary():
+    detector = RecordingDetector()
+    results = []
+    monitor = DriftMonitor(detector, n_features=2, window_size=4, buffer_size=6, interval_seconds=60,
+                           on_result=lambda drifted, n: results.append((drifted, n)))
+    try:
+        assert submit_and_wait(monitor, detector, rows(0, 5))
+        np.testing.assert_array_equal(detector.windows[-1], rows(1, 5))
+
+        # Rows 5-8 wrap around the end of the 6-row buffer
+        assert not submit_and_wait(monitor, detector, rows(5, 8), timeout=0.2)
+        assert submit_and_wait(monitor, detector, rows(8, 9))
+        np.testing.assert_array_equal(detector.windows[-1], rows(5, 9))
+    finally:
+        monitor.stop()
+
+    assert results == [(1, 4), (1, 4)]
+    assert monitor.drift_detected and monitor.windows_checked == 2
+
+
+def test_partial_window_is_checked_after_the_interval_once_large_enough():
+    detector = RecordingDetector()
+    monitor = DriftMonitor(detector, n_features=2, window_size=100, interval_seconds=0.05,
+                           min_window_size=3)
+    try:
+        assert not submit_and_wait(monitor, detector, rows(0, 2), timeout=0.3)
+        assert submit_and_wait(monitor, detector, rows(2, 3))
+        np.testing.assert_array_equal(detector.windows[-1], rows(0, 3))
+    finally:
+        monitor.stop()
+
+
+def test_batch_larger_than_the_buffer_keeps_its_last_rows():
+    detector = RecordingDetector()
+    monitor = DriftMonitor(detector, n_features=2, window_size=3, buffer_size=4, interval_seconds=60)
+    try:
+        assert submit_and_wait(monitor, detector, rows(0, 10))
+        np.testing.assert_array_equal(detector.windows[-1], rows(7, 10))
+    finally:
+        monitor.stop()
@@ -0,0 +1,63 @@
+"""Derived features must be the same whether they come from the training or the serving path."""
+
+import pandas as pd
+import pytest
+
+from src.feature_engineering import (
+    DERIVED_FEATURES, SERVICE_COLUMNS, normalize_categories, add_derived_features
+)
+
+
+def raw_customers():
+    return pd.DataFrame({
+        'tenure': [0, 5, 12, 72],
+        'TotalCharges': [0.0, 250.0, 1200.5, 7000.0],
+        'PhoneService': ['Yes', 'No', 'Yes', 'Yes'],
+        'MultipleLines': ['No', 'No phone service', 'Yes', 'Yes'],
+        'InternetService': ['DSL', 'No', 'Fiber optic', 'Fiber optic'],
+        'OnlineSecurity': ['No', 'No internet service', 'Yes', 'Yes'],
+        'OnlineBackup': ['No', 'No internet service', 'No', 'Yes'],
+        'DeviceProtection': ['Yes', 'No internet service', 'No', 'Yes'],
+        'TechSupport': ['No', 'No internet service', 'Yes', 'Yes'],
+        'StreamingTV': ['No', 'No internet service', 'Yes', 'Yes'],
+        'StreamingMovies': ['Yes', 'No internet service', 'No', 'Yes'],
+        'Contract': ['Month-to-month', 'Month-to-month', 'One year', 'Two year'],
+        'PaymentMethod': ['Electronic check', 'Mailed check', 'Electronic check', 'Credit card (automatic)'],
+    })
+
+
+def row_wise_total_services(row):
+    # Reference implementation (the former DataFrame.apply version)
+    count = 0
+    for col in SERVICE_COLUMNS:
+        if 'No internet service' in str(row[col]) or 'No phone service' in str(row[col]):
+            continue
+        if row[col] in ['Yes', 'Fiber optic', 'DSL']:
+            count += 1
+    return count
+
+
+def test_total_services_matches_row_wise_version():
+    df = add_derived_features(raw_customers())
+    expected = raw_customers().apply(row_wise_total_services, axis=1)
+    assert df['TotalServices'].tolist() == expected.tolist()
+
+
+def test_derived_feature_values():
+    df = add_derived_features(raw_customers())
+    assert df['NoOnlineServices'].tolist() == [3, 0, 2, 0]
+    assert df['NoStreaming'].tolist() == [1, 0, 1, 0]
+    assert df['RiskScore'].tolist() == [5, 2, 1, 0]
+    assert df['AvgMonthlySpend'].tolist() == pytest.approx([0.0, 250.0 / 6, 1200.5 / 13, 7000.0 / 73])
+
+
+def test_serving_labels_produce_training_features():
+    training = add_derived_features(raw_customers())
+
+    form = raw_customers()
+    form['InternetService'] = form['InternetService'].replace({'Fiber optic': 'Fiber Optic'})
+    form['MultipleLines'] = form['MultipleLines'].replace({'No phone service': 'Sem serviço de telefone'})
+    serving = add_derived_features(normalize_categories(form, form.columns))
+
+    pd.testing.assert_frame_equal(serving, training)
+    assert set(DERIVED_FEATURES) <= set(serving.columns)
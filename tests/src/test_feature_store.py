@@ -0,0 +1,59 @@
+import pandas as pd
+
+from benchmarks.synthetic_data import make_raw_frame
+from config.paths_config import CONFIG_PATH
+from src.data_processing import DataProcessor
+from src.feature_store import FeatureStore
+
+
+def processor(tmp_path):
+    processor = DataProcessor(str(tmp_path / "train.feather"), str(tmp_path / "test.feather"), str(tmp_path), CONFIG_PATH)
+    processor.compact_dtypes = True
+    return processor
+
+
+def test_incremental_processing_matches_full_recompute(tmp_path):
+    store_path = str(tmp_path / "feature_store.feather")
+    processor_ = processor(tmp_path)
+    week1 = make_raw_frame(500, seed=1)
+    week1.loc[:4, 'TotalCharges'] = ' '
+
+    store = FeatureStore(store_path)
+    processor_.process_data(week1.copy(), dataset_name="week 1", store=store)
+    store.save()
+
+    # Changed, deleted and new customers
+    week2 = week1.drop(index=range(10, 20)).copy()
+    week2.loc[20:29, 'Contract'] = 'Two year'
+    week2 = pd.concat([week2, make_raw_frame(30, seed=2).assign(customerID=lambda df: 'NEW-' + df['customerID'])],
+                      ignore_index=True)
+
+    store = FeatureStore(store_path)
+    incremental, _ = processor_.process_data(week2.copy(), dataset_name="week 2", store=store)
+    full, _ = processor_.process_data(week2.copy(), dataset_name="week 2 full")
+
+    pd.testing.assert_frame_equal(incremental, full)
+    processor_.check_consistency(week2.copy(), incremental, dataset_name="week 2")
+
+    store.retain(week2['customerID'])
+    assert not store.frame.index.isin(week1['customerID'].iloc[10:20]).any()
+    assert not store.frame.index.isin(week1['customerID'].iloc[:5]).any()  # median-filled rows are not stored
+
+
+def test_unchanged_rows_are_reused(tmp_path, monkeypatch):
+    store_path = str(tmp_path / "feature_store.feather")
+    processor_ = processor(tmp_path)
+    data = make_raw_frame(200, seed=3).query("tenure > 0").reset_index(drop=True)  # no median-filled rows
+
+    store = FeatureStore(store_path)
+    processor_.process_data(data.copy(), store=store)
+    store.save()
+
+    encoded = []
+    original = processor_.encode_rows
+    monkeypatch.setattr(processor_, "encode_rows", lambda rows, *args: encoded.append(len(rows)) or original(rows, *args))
+    changed = data.copy()
+    changed.loc[0, 'tenure'] += 1
+    processor_.process_data(changed, store=FeatureStore(store_path))
+
+    assert encoded == [1]
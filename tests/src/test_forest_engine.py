@@ -0,0 +1,69 @@
+"""FlatForest must reproduce RandomForestClassifier predictions exactly."""
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+from src.forest_engine import FlatForest
+
+
+@pytest.fixture(scope="module")
+def data():
+    X, y = make_classification(n_samples=2000, n_features=12, n_informative=6, random_state=0)
+    return X[:1500], y[:1500], X[1500:]
+
+
+@pytest.mark.parametrize("params", [
+    {"n_estimators": 25, "max_depth": None},
+    {"n_estimators": 40, "max_depth": 6, "min_samples_leaf": 4, "class_weight": "balanced"},
+])
+def test_flat_forest_matches_sklearn(data, params):
+    X_train, y_train, X_test = data
+    forest = RandomForestClassifier(random_state=42, **params).fit(X_train, y_train)
+    flat = FlatForest.from_sklearn(forest)
+
+    np.testing.assert_array_equal(flat.predict_proba(X_test), forest.predict_proba(X_test))
+    np.testing.assert_array_equal(flat.predict(X_test), forest.predict(X_test))
+    np.testing.assert_array_equal(flat.predict_proba(X_test[:1]), forest.predict_proba(X_test[:1]))
+
+
+def test_tree_blocks_keep_the_sum_in_tree_order(data, monkeypatch):
+    X_train, y_train, X_test = data
+    forest = RandomForestClassifier(n_estimators=30, random_state=1).fit(X_train, y_train)
+    flat = FlatForest.from_sklearn(forest)
+    monkeypatch.setattr("src.forest_engine.BLOCK_PAIRS", 7 * len(X_test))   # 5 blocks of 7 trees, the last shorter
+
+    np.testing.assert_array_equal(flat.predict_proba(X_test), forest.predict_proba(X_test))
+    quantized = flat.with_precision("float32", "uint16")
+    monkeypatch.setattr("src.forest_engine.BLOCK_PAIRS", 2 ** 30)
+    single_block = quantized.predict_proba(X_test)
+    monkeypatch.setattr("src.forest_engine.BLOCK_PAIRS", len(X_test))
+    np.testing.assert_array_equal(quantized.predict_proba(X_test), single_block)
+
+
+def test_flat_forest_save_and_load(data, tmp_path):
+    X_train, y_train, X_test = data
+    forest = RandomForestClassifier(n_estimators=10, random_state=42).fit(X_train, y_train)
+    FlatForest.from_sklearn(forest).save(tmp_path / "flat_forest")
+
+    loaded = FlatForest.load(tmp_path / "flat_forest")
+
+    assert loaded.n_trees == 10
+    np.testing.assert_array_equal(loaded.predict_proba(X_test), forest.predict_proba(X_test))
+
+
+def test_reduced_precision_mmap_load(data, tmp_path):
+    X_train, y_train, X_test = data
+    forest = RandomForestClassifier(n_estimators=20, max_depth=5, random_state=42).fit(X_train, y_train)
+    FlatForest.from_sklearn(forest).save(tmp_path / "compact", threshold_dtype="float32", value_dtype="uint16")
+
+    loaded = FlatForest.load(tmp_path / "compact", mmap_mode="r")
+
+    assert loaded.threshold.dtype == np.float32 and loaded.value.dtype == np.uint16
+    # Rounded-down float32 thresholds keep every split decision, so only the
+    # leaf quantization (1/65535 steps) moves the probabilities
+    exact = FlatForest.from_sklearn(forest)
+    X32 = X_test.astype(np.float32)
+    np.testing.assert_array_equal(loaded._leaves(X32), exact._leaves(X32))
+    np.testing.assert_allclose(loaded.predict_proba(X_test), forest.predict_proba(X_test), rtol=0, atol=1 / 131070)
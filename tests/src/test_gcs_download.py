@@ -0,0 +1,103 @@
+import base64
+import hashlib
+import os
+
+import pytest
+
+from src.data_ingestion import DataIngestion
+from src.gcs_download import RangedDownload
+
+
+class FakeBlob:
+    """Stand-in for google.cloud.storage.Blob serving bytes from memory."""
+
+    def __init__(self, data, fail_at=()):
+        self.data = data
+        self.size = len(data)
+        self.generation = 1
+        self.stored_generation = 1     # generation in the bucket now
+        self.md5_hash = base64.b64encode(hashlib.md5(data).digest()).decode()
+        self.fail_at = set(fail_at)
+        self.requests = []
+
+    def download_as_bytes(self, start, end, if_generation_match=None):
+        if if_generation_match is not None and if_generation_match != self.stored_generation:
+            raise PreconditionFailed()
+        if start in self.fail_at:
+            raise ConnectionError(f"dropped range at {start}")
+        self.requests.append(start)
+        return self.data[start:end + 1]
+
+
+class PreconditionFailed(Exception):
+    code = 412
+
+
+class FakeClient:
+    def __init__(self, blobs):
+        self.blobs = blobs
+
+    def bucket(self, name):
+        return self
+
+    def get_blob(self, name):
+        return self.blobs.get(name)
+
+
+def test_failed_download_resumes_missing_ranges(tmp_path):
+    data = os.urandom(10_000)
+    local_file = str(tmp_path / "data.csv")
+
+    blob = FakeBlob(data, fail_at={4096})
+    with pytest.raises(ConnectionError):
+        RangedDownload(blob, local_file, chunk_size=1024, workers=4, retries=2).run()
+    assert not os.path.exists(local_file)
+
+    blob.fail_at.clear()
+    blob.requests.clear()
+    RangedDownload(blob, local_file, chunk_size=1024, workers=4).run()
+
+    assert open(local_file, 'rb').read() == data
+    assert 4096 in blob.requests and len(blob.requests) < 10
+    assert os.listdir(tmp_path) == ["data.csv"]
+
+
+def test_object_overwritten_mid_download_discards_the_partial_file(tmp_path):
+    local_file = tmp_path / "data.csv"
+    local_file.write_bytes(b"previous")
+    blob = FakeBlob(os.urandom(10_000))
+    download = RangedDownload(blob, str(local_file), chunk_size=1024, workers=1)
+    fetch = download._fetch
+
+    def overwrite_after_first_range(fd, start, end):
+        fetch(fd, start, end)
+        blob.stored_generation = 2
+
+    download._fetch = overwrite_after_first_range
+    with pytest.raises(IOError, match="changed during the download"):
+        download.run()
+    assert local_file.read_bytes() == b"previous"
+    assert os.listdir(tmp_path) == ["data.csv"]
+
+
+def test_checksum_mismatch_keeps_previous_file(tmp_path):
+    local_file = tmp_path / "data.csv"
+    local_file.write_bytes(b"previous")
+    blob = FakeBlob(b"new,data\n1,2\n")
+    blob.md5_hash = base64.b64encode(hashlib.md5(b"other").digest()).decode()
+
+    with pytest.raises(IOError, match="md5 mismatch"):
+        RangedDownload(blob, str(local_file), chunk_size=4).run()
+    assert local_file.read_bytes() == b"previous"
+
+
+def test_unchanged_object_is_not_downloaded_again(tmp_path):
+    blob = FakeBlob(b"customerID,Churn\n1,No\n2,Yes\n")
+    ingestion = DataIngestion({"project_id": "p", "bucket_name": "b", "file_name": "data.csv"},
+                              str(tmp_path), storage_client=FakeClient({"data.csv": blob}))
+
+    csv_path = ingestion.extract_data()
+    assert open(csv_path, 'rb').read() == blob.data
+    blob.requests.clear()
+    ingestion.extract_data()
+    assert blob.requests == []
@@ -0,0 +1,46 @@
+import threading
+
+import numpy as np
+import pytest
+
+from src.micro_batcher import MicroBatcher
+
+
+def score(X):
+    # Stand-in for ServingBundle.predict_proba: (churn_proba, labels) per row
+    proba = X.sum(axis=1) / 100
+    return proba, (proba > 0.5).astype(int)
+
+
+def test_concurrent_rows_are_batched_and_routed_back():
+    batcher = MicroBatcher(score, max_batch_size=16, max_wait_ms=20)
+    rows = [np.full(4, float(i)) for i in range(64)]
+    results = [None] * len(rows)
+    start = threading.Barrier(len(rows))
+
+    def client(i):
+        start.wait()
+        results[i] = batcher.predict(rows[i], timeout=10)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(len(rows))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.stop()
+
+    for i, (proba, label) in enumerate(results):
+        assert proba == pytest.approx(4 * i / 100)
+        assert label == int(4 * i / 100 > 0.5)
+    assert batcher.rows == len(rows)
+    assert batcher.batches < len(rows)
+
+
+def test_errors_reach_every_request_in_the_batch():
+    def failing(X):
+        raise ValueError("bad batch")
+
+    batcher = MicroBatcher(failing)
+    with pytest.raises(ValueError, match="bad batch"):
+        batcher.predict(np.zeros(4), timeout=10)
+    batcher.stop()
@@ -0,0 +1,74 @@
+from src.model_reloader import ModelReloader
+
+
+class FakeBundle:
+    def __init__(self, version):
+        self.version = version
+        self.retired = False
+
+    def retire(self):
+        self.retired = True
+
+
+class FakeServer:
+    def __init__(self):
+        self.fingerprint = "v1"
+        self.live = FakeBundle("v1")
+        self.fail = False
+
+    def load(self):
+        if self.fail:
+            raise ValueError("warm-up failed")
+        return FakeBundle(self.fingerprint)
+
+    def swap(self, new_bundle):
+        old, self.live = self.live, new_bundle
+        return old
+
+
+def make_reloader(server):
+    return ModelReloader(lambda: server.fingerprint, server.load, server.swap,
+                         current_version="v1", retire_seconds=0)
+
+
+def test_swaps_to_a_complete_bundle_and_retires_the_old_one():
+    server = FakeServer()
+    reloader = make_reloader(server)
+    old = server.live
+
+    assert not reloader.poll()
+    server.fingerprint = None           # training has rewritten some artifacts, not all
+    assert not reloader.poll() and not reloader.poll()
+    assert server.live is old
+
+    server.fingerprint = "v2"           # the trainer wrote the manifest
+    assert reloader.poll()
+    assert server.live.version == "v2" and not old.retired
+
+    assert not reloader.poll()          # retires the old bundle after the grace period
+    assert old.retired
+    assert reloader.reloads == 1
+
+
+def test_failed_bundle_keeps_serving_the_old_version():
+    server = FakeServer()
+    reloader = make_reloader(server)
+    server.fingerprint, server.fail = "broken", True
+
+    assert not reloader.poll()
+    assert server.live.version == "v1"
+
+    server.fail = False
+    assert not reloader.poll()          # not retried until the artifacts change again
+    server.fingerprint = "v3"
+    assert reloader.poll() and server.live.version == "v3"
+
+
+def test_bundle_changed_while_loading_is_rejected():
+    server = FakeServer()
+    server.load = lambda: FakeBundle("v2-partial")
+    reloader = make_reloader(server)
+    server.fingerprint = "v2"
+
+    assert not reloader.poll()
+    assert server.live.version == "v1"
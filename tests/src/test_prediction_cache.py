@@ -0,0 +1,59 @@
+import numpy as np
+
+from src.prediction_cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_and_events():
+    events = []
+    cache = PredictionCache(max_entries=2, on_event=lambda event, count: events.append((event, count)))
+    a, b, c = np.array([1.0, 2.0]), np.array([3.0, 4.0]), np.array([5.0, 6.0])
+
+    cache.put(a, "v1", "A")
+    cache.put(b, "v1", "B")
+    assert cache.get(a, "v1") == "A"      # a is now most recent
+    cache.put(c, "v1", "C")               # evicts b
+
+    assert cache.get(b, "v1") is None
+    assert cache.get(np.array([-0.0, 0.0]) + a, "v1") == "A"   # same values, same key
+    assert (cache.hits, cache.misses, cache.evictions) == (2, 1, 1)
+    assert ("eviction", 1) in events and ("hit", 1) in events and ("miss", 1) in events
+
+
+def test_ttl_and_versions():
+    clock = FakeClock()
+    cache = PredictionCache(ttl_seconds=10, clock=clock)
+    row = np.array([1.0, 2.0])
+
+    cache.put(row, "v1", "old")
+    clock.now = 5
+    assert cache.get(row, "v1") == "old"
+    assert cache.get(row, "v2") is None   # new model version never sees old results
+
+    cache.put(row, "v2", "new")
+    clock.now = 12
+    assert cache.get(row, "v1") is None   # the old version ages out
+    assert cache.get(row, "v2") == "new"
+    clock.now = 16
+    assert cache.get(row, "v2") is None   # expired
+    assert len(cache) == 0
+
+
+def test_alternating_versions_during_a_reload_keep_both_entries():
+    cache = PredictionCache(max_entries=10)
+    a, b = np.array([1.0, 2.0]), np.array([3.0, 4.0])
+
+    cache.put(a, "v1", "A1")
+    cache.put(b, "v2", "B2")
+    cache.put(a, "v2", "A2")
+    assert cache.get(a, "v1") == "A1"     # in-flight request on the old bundle
+    assert cache.get(b, "v2") == "B2"
+    assert cache.get(a, "v2") == "A2"
+    assert cache.evictions == 0
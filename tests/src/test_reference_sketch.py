@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import ks_2samp
+
+from src.reference_sketch import ReferenceSketch, SketchKSDrift
+
+GRID_SIZE = 201
+
+
+def reference_frame(n_rows=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'MonthlyCharges': rng.gamma(4.0, 16.0, n_rows),   # continuous
+        'tenure': rng.integers(0, 73, n_rows),            # discrete, many ties
+        'SeniorCitizen': rng.random(n_rows) < 0.16,       # two values
+    })
+
+
+def test_sketch_cdf_is_within_one_grid_step_below_the_exact_cdf():
+    df = reference_frame()
+    sketch = ReferenceSketch.from_frame(df, list(df.columns), grid_size=GRID_SIZE)
+    assert sketch.max_cdf_error == 1 / (GRID_SIZE - 1)
+
+    for f, col in enumerate(df.columns):
+        reference = np.sort(df[col].to_numpy(dtype=np.float64))
+        points = np.concatenate([reference[::97], reference[::97] - 1e-9, [reference[0] - 1, reference[-1] + 1]])
+        exact = np.searchsorted(reference, points, side='right') / len(reference)
+        error = exact - sketch.cdf(f, points)
+        assert error.min() >= -1e-12
+        assert error.max() <= sketch.max_cdf_error + 1e-12
+
+
+def test_ks_distance_matches_scipy_within_the_sketch_error():
+    df = reference_frame()
+    sketch = ReferenceSketch.from_frame(df, list(df.columns), grid_size=GRID_SIZE)
+    detector = SketchKSDrift(sketch, p_val=0.05)
+    samples = {
+        'same': reference_frame(500, seed=2),
+        'shifted': reference_frame(500, seed=3).assign(MonthlyCharges=lambda d: d.MonthlyCharges * 1.3),
+    }
+
+    for window in samples.values():
+        x = window.to_numpy(dtype=np.float64)
+        _, distance = detector.feature_score(x)
+        exact = [ks_2samp(x[:, f], df.iloc[:, f].to_numpy(dtype=np.float64)).statistic
+                 for f in range(x.shape[1])]
+        np.testing.assert_allclose(distance, exact, atol=sketch.max_cdf_error + 1e-12, rtol=0)
+
+    assert detector.predict(samples['shifted'].to_numpy())['data']['is_drift'].tolist() == [1, 0, 0]
+
+
+def test_sketch_round_trips_through_npz(tmp_path):
+    df = reference_frame(1000)
+    sketch = ReferenceSketch.from_frame(df, list(df.columns), grid_size=11)
+    path = tmp_path / "reference_sketch.npz"
+    sketch.save(path)
+    loaded = ReferenceSketch.load(path)
+    assert loaded.feature_columns == list(df.columns) and loaded.n_rows == 1000
+    np.testing.assert_array_equal(loaded.quantiles, sketch.quantiles)
@@ -0,0 +1,39 @@
+import os
+import time
+
+import pytest
+
+from src.request_profiler import RequestProfiler
+
+
+def slow_request(profiler, seconds):
+    profiler.start()
+    time.sleep(seconds)
+    return profiler.finish('predict')
+
+
+def test_only_the_slowest_requests_are_kept_as_folded_stacks(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), keep_slowest=2, interval_ms=1)
+    try:
+        durations = [slow_request(profiler, seconds) for seconds in (0.03, 0.12, 0.06, 0.09)]
+    finally:
+        profiler.stop()
+
+    files = sorted(os.listdir(tmp_path))
+    assert len(files) == 2
+    kept = sorted(float(name.split('ms_')[0]) / 1000 for name in files)
+    assert kept == pytest.approx(sorted(durations)[2:], abs=1e-5)
+    assert all(name.endswith('.folded') and '_predict_' in name for name in files)
+
+    with open(tmp_path / files[-1]) as f:
+        lines = f.read().splitlines()
+    assert lines
+    for line in lines:
+        assert int(line.rsplit(' ', 1)[1]) > 0
+    assert any('slow_request (test_request_profiler.py:' in line for line in lines)
+
+
+def test_finish_without_start_is_ignored(tmp_path):
+    profiler = RequestProfiler(str(tmp_path))
+    assert profiler.finish('predict') is None
+    assert not os.listdir(tmp_path)
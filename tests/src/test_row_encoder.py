@@ -0,0 +1,67 @@
+"""The compiled RowEncoder must produce the same vector as the DataFrame encoding path."""
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from src.feature_engineering import normalize_categories, add_derived_features, encode_features
+from src.row_encoder import RowEncoder
+
+RECORDS = [
+    {'SeniorCitizen': '0', 'Partner': 'Yes', 'Dependents': 'No', 'tenure': 3,
+     'PhoneService': 'Yes', 'MultipleLines': 'No', 'InternetService': 'Fiber Optic',
+     'OnlineSecurity': 'No', 'OnlineBackup': 'Yes', 'DeviceProtection': 'No', 'TechSupport': 'No',
+     'StreamingTV': 'Yes', 'StreamingMovies': 'No', 'Contract': 'Month-to-month',
+     'PaperlessBilling': 'Yes', 'PaymentMethod': 'Electronic check',
+     'MonthlyCharges': 89.9, 'TotalCharges': 270.1},
+    {'SeniorCitizen': 1, 'Partner': 'No', 'Dependents': 'Yes', 'tenure': 60,
+     'PhoneService': 'No', 'MultipleLines': 'Sem serviço de telefone', 'InternetService': 'No',
+     'OnlineSecurity': 'No internet service', 'OnlineBackup': 'No internet service',
+     'DeviceProtection': 'No internet service', 'TechSupport': 'No internet service',
+     'StreamingTV': 'No internet service', 'StreamingMovies': 'No internet service',
+     'Contract': 'Two year', 'PaperlessBilling': 'No', 'PaymentMethod': 'Unknown method',
+     'MonthlyCharges': 20.0, 'TotalCharges': 1200.0},
+]
+
+
+def fitted_encoders():
+    levels = {
+        'Partner': ['No', 'Yes'], 'Dependents': ['No', 'Yes'], 'PhoneService': ['No', 'Yes'],
+        'MultipleLines': ['No', 'No phone service', 'Yes'], 'InternetService': ['DSL', 'Fiber optic', 'No'],
+        'OnlineSecurity': ['No', 'No internet service', 'Yes'], 'OnlineBackup': ['No', 'No internet service', 'Yes'],
+        'DeviceProtection': ['No', 'No internet service', 'Yes'], 'TechSupport': ['No', 'No internet service', 'Yes'],
+        'StreamingTV': ['No', 'No internet service', 'Yes'], 'StreamingMovies': ['No', 'No internet service', 'Yes'],
+        'Contract': ['Month-to-month', 'One year', 'Two year'], 'PaperlessBilling': ['No', 'Yes'],
+        'PaymentMethod': ['Bank transfer (automatic)', 'Credit card (automatic)', 'Electronic check', 'Mailed check'],
+        'Churn': ['No', 'Yes'],
+    }
+    return {col: LabelEncoder().fit(values) for col, values in levels.items()}
+
+
+FEATURE_COLUMNS = [
+    'SeniorCitizen', 'Partner', 'Dependents', 'tenure', 'PhoneService', 'MultipleLines', 'InternetService',
+    'OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies',
+    'Contract', 'PaperlessBilling', 'PaymentMethod', 'MonthlyCharges', 'TotalCharges',
+    'AvgMonthlySpend', 'NoOnlineServices', 'NoStreaming', 'TotalServices', 'RiskScore',
+]
+
+
+def test_row_encoder_matches_dataframe_path():
+    encoders = fitted_encoders()
+    row_encoder = RowEncoder(encoders, FEATURE_COLUMNS)
+
+    for record in RECORDS:
+        df = pd.DataFrame([record])
+        df = normalize_categories(df, df.columns)
+        df = add_derived_features(df)
+        expected = encode_features(df, encoders, FEATURE_COLUMNS).to_numpy()[0]
+
+        np.testing.assert_allclose(row_encoder.encode(record), expected)
+
+
+def test_row_encoder_writes_into_preallocated_vector():
+    row_encoder = RowEncoder(fitted_encoders(), FEATURE_COLUMNS)
+    out = np.empty(row_encoder.n_features)
+
+    assert row_encoder.encode(RECORDS[0], out=out) is out
+    assert row_encoder.derived_values(out)['TotalServices'] == 4
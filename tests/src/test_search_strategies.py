@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+from src.search_strategies import build_search, search_summary
+
+GRID_CONFIG = {"scoring": "f1", "cv": 3, "n_jobs": 1}
+PARAM_GRID = {"n_estimators": [4, 12], "max_depth": [2, None], "max_features": ["sqrt", "log2"]}
+
+
+@pytest.mark.parametrize("strategy", ["halving", "hyperband"])
+def test_tree_budget_replaces_grid_values(strategy):
+    X, y = make_classification(n_samples=300, random_state=0)
+    search = build_search(RandomForestClassifier(random_state=0), dict(PARAM_GRID), GRID_CONFIG,
+                          {"strategy": strategy, "resource": "n_estimators", "factor": 3})
+    search.fit(X, y)
+
+    assert search.best_params_["n_estimators"] <= 12
+    assert search.best_estimator_.n_estimators == search.best_params_["n_estimators"]
+    summary = search_summary(search)
+    assert summary["search_fits"] > summary["search_candidates"]
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        build_search(RandomForestClassifier(), PARAM_GRID, GRID_CONFIG, {"strategy": "random"})
+
+
+def test_warm_start_grid_matches_grid_search():
+    X, y = make_classification(n_samples=300, random_state=0)
+    estimator = RandomForestClassifier(class_weight="balanced", random_state=0)
+    grid = build_search(estimator, dict(PARAM_GRID), GRID_CONFIG, {"strategy": "grid"}).fit(X, y)
+    warm = build_search(estimator, dict(PARAM_GRID), GRID_CONFIG, {"strategy": "grid", "warm_start": True}).fit(X, y)
+
+    assert np.array_equal(grid.cv_results_["mean_test_score"], warm.cv_results_["mean_test_score"])
+    assert warm.best_params_ == grid.best_params_
+    assert search_summary(warm)["search_trees"] < search_summary(grid)["search_trees"]
@@ -0,0 +1,69 @@
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from src.forest_engine import FlatForest
+from src.reference_sketch import ReferenceSketch
+from src.row_encoder import RowEncoder
+from src.serving_bundle import ServingBundle, artifact_paths, write_manifest
+
+FEATURES = ['tenure', 'MonthlyCharges', 'TotalCharges']
+
+
+def save_artifacts(tmp_path, n_rows=500):
+    rng = np.random.default_rng(0)
+    X = rng.random((n_rows, len(FEATURES))) * [72, 120, 8000]
+    y = (X[:, 0] < 20).astype(int)
+    forest = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+
+    paths = {
+        'model_path': str(tmp_path / 'model.pkl'),
+        'flat_model_dir': str(tmp_path / 'flat_forest'),
+        'encoder_tables_path': str(tmp_path / 'encoder_tables.npz'),
+        'encoder_path': str(tmp_path / 'label_encoders.pkl'),
+        'features_path': str(tmp_path / 'feature_columns.pkl'),
+        'reference_sketch_path': str(tmp_path / 'reference_sketch.npz'),
+    }
+    joblib.dump(forest, paths['model_path'])
+    FlatForest.from_sklearn(forest).save(paths['flat_model_dir'], threshold_dtype='float32', value_dtype='uint16')
+    RowEncoder({}, FEATURES).save(paths['encoder_tables_path'])
+    ReferenceSketch.from_frame(pd.DataFrame(X, columns=FEATURES), FEATURES, grid_size=11).save(
+        paths['reference_sketch_path'])
+    return paths, X
+
+
+def test_every_batch_size_is_scored_by_the_mapped_flat_forest(tmp_path):
+    paths, X = save_artifacts(tmp_path)
+    bundle = ServingBundle.load(**paths)
+
+    assert isinstance(bundle.model, FlatForest)
+    assert bundle.model_for(len(X)) is bundle.model
+    assert bundle.model.value.dtype == np.uint16
+
+    batch_proba, batch_labels = bundle.predict_proba(X)
+    single = [bundle.predict_proba(row.reshape(1, -1)) for row in X[:50]]
+    assert [p[0] for p, _ in single] == batch_proba[:50].tolist()
+    assert [label[0] for _, label in single] == batch_labels[:50].tolist()
+
+
+def test_sklearn_forest_is_opt_in_for_large_batches(tmp_path):
+    paths, X = save_artifacts(tmp_path)
+    bundle = ServingBundle.load(large_batch_rows=100, **paths)
+
+    assert bundle.model_for(100) is bundle.model
+    assert isinstance(bundle.model_for(101), RandomForestClassifier)
+
+
+def test_fingerprint_is_set_only_while_the_manifest_matches_the_artifacts(tmp_path):
+    paths, X = save_artifacts(tmp_path)
+    manifest_path = str(tmp_path / 'bundle_manifest.json')
+    assert ServingBundle.fingerprint(manifest_path=manifest_path, **paths) is None
+
+    write_manifest(artifact_paths(**paths), manifest_path)
+    version = ServingBundle.fingerprint(manifest_path=manifest_path, **paths)
+    assert version == ServingBundle.load(**paths).version
+
+    # A new training run rewrites the encoder tables long before the model
+    RowEncoder({}, FEATURES[::-1]).save(paths['encoder_tables_path'])
+    assert ServingBundle.fingerprint(manifest_path=manifest_path, **paths) is None
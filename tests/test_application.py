@@ -0,0 +1,187 @@
+"""Scoring endpoints, served with a small stand-in bundle instead of the artifacts on disk."""
+
+import threading
+
+import numpy as np
+import pytest
+
+import application
+from src.micro_batcher import MicroBatcher
+from src.row_encoder import RowEncoder
+
+CLASSES = {
+    'Partner': ['No', 'Yes'], 'Dependents': ['No', 'Yes'], 'PhoneService': ['No', 'Yes'],
+    'MultipleLines': ['No', 'No phone service', 'Yes'], 'InternetService': ['DSL', 'Fiber optic', 'No'],
+    'OnlineSecurity': ['No', 'No internet service', 'Yes'], 'OnlineBackup': ['No', 'No internet service', 'Yes'],
+    'DeviceProtection': ['No', 'No internet service', 'Yes'], 'TechSupport': ['No', 'No internet service', 'Yes'],
+    'StreamingTV': ['No', 'No internet service', 'Yes'], 'StreamingMovies': ['No', 'No internet service', 'Yes'],
+    'Contract': ['Month-to-month', 'One year', 'Two year'], 'PaperlessBilling': ['No', 'Yes'],
+    'PaymentMethod': ['Bank transfer (automatic)', 'Credit card (automatic)', 'Electronic check', 'Mailed check'],
+}
+FEATURE_COLUMNS = [
+    'SeniorCitizen', 'Partner', 'Dependents', 'tenure', 'PhoneService', 'MultipleLines', 'InternetService',
+    'OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies',
+    'Contract', 'PaperlessBilling', 'PaymentMethod', 'MonthlyCharges', 'TotalCharges',
+    'AvgMonthlySpend', 'NoOnlineServices', 'NoStreaming', 'TotalServices', 'RiskScore',
+]
+RECORD = {
+    'SeniorCitizen': 0, 'Partner': 'Yes', 'Dependents': 'No', 'tenure': 12, 'PhoneService': 'Yes',
+    'MultipleLines': 'No', 'InternetService': 'Fiber Optic', 'OnlineSecurity': 'No', 'OnlineBackup': 'Yes',
+    'DeviceProtection': 'No', 'TechSupport': 'No', 'StreamingTV': 'Yes', 'StreamingMovies': 'No',
+    'Contract': 'Month-to-month', 'PaperlessBilling': 'Yes', 'PaymentMethod': 'Electronic check',
+    'MonthlyCharges': 70.5, 'TotalCharges': 846.0,
+}
+TENURE = FEATURE_COLUMNS.index('tenure')
+
+
+class FakeDriftMonitor:
+    drift_detected = False
+
+    def __init__(self):
+        self.rows = 0
+
+    def submit(self, rows):
+        self.rows += len(np.atleast_2d(rows))
+
+
+class FakeBundle:
+    """Churn probability = tenure / 100, so each result identifies its row."""
+
+    version = 'test'
+    micro_batcher = None
+
+    def __init__(self):
+        self.row_encoder = RowEncoder(CLASSES, FEATURE_COLUMNS)
+        self.drift_monitor = FakeDriftMonitor()
+
+    def predict_proba(self, X):
+        proba = X[:, TENURE] / 100
+        return proba, (proba >= 0.5).astype(int)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Let the background load of the real artifacts finish (or fail) before replacing the bundle
+    application.wait_until_ready(timeout=60)
+    monkeypatch.setattr(application, 'bundle', FakeBundle())
+    monkeypatch.setattr(application, 'model_reloader', None)
+    monkeypatch.setattr(application, 'prediction_cache', None)
+    return application.app.test_client()
+
+
+@pytest.fixture
+def cold_app(monkeypatch):
+    """Fresh startup state; the background loader runs the patched build_serving_bundle."""
+    application.wait_until_ready(timeout=60)
+    for name, value in [('bundle', None), ('model_reloader', None), ('startup_error', None),
+                        ('_loader_pid', None), ('startup_timings', {}), ('reload_config', {'enabled': False})]:
+        monkeypatch.setattr(application, name, value)
+    return application.app.test_client()
+
+
+def record(**changes):
+    return {**RECORD, **changes}
+
+
+def test_batch_scores_valid_rows_and_reports_invalid_ones_in_order(client):
+    records = [
+        record(tenure=10),
+        record(SeniorCitizen='Yes'),
+        record(tenure=30, SeniorCitizen='1'),
+        record(MonthlyCharges='nan'),
+        record(TotalCharges=float('inf')),
+        record(Contract='Three year'),
+        record(tenure=70, InternetService='Fiber optic'),
+        'not a record',
+    ]
+    response = client.post('/predict/batch', json={'records': records})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['scored'] == 3 and body['rejected'] == 5
+    predictions = body['predictions']
+    assert [p['index'] for p in predictions] == list(range(len(records)))
+    assert [p.get('probability') for p in predictions[::3]] == [0.1, None, 0.7]
+    assert predictions[2]['probability'] == 0.3
+    assert predictions[1]['errors'] == ["SeniorCitizen: expected 0 or 1 ('Yes')"]
+    assert predictions[3]['errors'] == ["MonthlyCharges: not a finite number ('nan')"]
+    assert predictions[4]['errors'] == ["TotalCharges: not a finite number (inf)"]
+    assert predictions[5]['errors'] == ["Contract: unknown category ('Three year')"]
+    assert predictions[7]['errors'] == ['record must be a JSON object']
+    assert application.bundle.drift_monitor.rows == 3
+
+
+def test_batch_over_the_size_limit_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(application, 'MAX_BATCH_RECORDS', 2)
+    response = client.post('/predict/batch', json=[record()] * 3)
+    assert response.status_code == 413
+    assert client.post('/predict/batch', json=[record()] * 2).status_code == 200
+
+
+def test_batch_must_be_a_list(client):
+    assert client.post('/predict/batch', json={'records': 'x'}).status_code == 400
+
+
+def test_single_prediction_validates_like_the_batch(client):
+    response = client.post('/predict', json=record(tenure=80))
+    assert response.status_code == 200
+    assert response.get_json()['probability'] == pytest.approx(0.8)
+
+    response = client.post('/predict', json=record(SeniorCitizen='Yes'))
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == ["SeniorCitizen: expected 0 or 1 ('Yes')"]
+
+
+def test_single_prediction_is_scored_inline_when_the_micro_batch_hangs(client, monkeypatch):
+    release = threading.Event()
+
+    def stuck_predict(X):
+        release.wait()
+        return application.bundle.predict_proba(X)
+
+    batcher = MicroBatcher(stuck_predict)
+    monkeypatch.setattr(application.bundle, 'micro_batcher', batcher)
+    monkeypatch.setattr(application, 'MICRO_BATCH_TIMEOUT', 0.05)
+    fallbacks = application.micro_batch_fallbacks_total._value.get()
+
+    response = client.post('/predict', json=record(tenure=80))
+    release.set()
+    batcher.stop()
+    assert response.get_json()['probability'] == pytest.approx(0.8)
+    assert application.micro_batch_fallbacks_total._value.get() == fallbacks + 1
+
+
+def test_liveness_answers_while_the_bundle_loads(cold_app, monkeypatch):
+    release = threading.Event()
+    warm = FakeBundle()
+    warm.timings = {'load_model': 0.5, 'warm_up': 0.1}
+
+    def build_serving_bundle():
+        release.wait(10)
+        return warm
+
+    monkeypatch.setattr(application, 'build_serving_bundle', build_serving_bundle)
+    assert cold_app.get('/healthz').get_json() == {'status': 'alive'}
+    response = cold_app.get('/ready')
+    assert response.status_code == 503
+    assert response.get_json()['ready'] is False and response.get_json()['model_version'] is None
+
+    release.set()
+    assert application.wait_until_ready(timeout=10)
+    response = cold_app.get('/ready')
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['ready'] is True and body['model_version'] == 'test' and body['error'] is None
+    assert body['startup_seconds']['load_model'] == 0.5 and 'ready_after' in body['startup_seconds']
+
+
+def test_startup_error_is_reported_by_the_readiness_probe(cold_app, monkeypatch):
+    def build_serving_bundle():
+        raise FileNotFoundError('artifacts/model/flat_forest/meta.json')
+
+    monkeypatch.setattr(application, 'build_serving_bundle', build_serving_bundle)
+    assert not application.wait_until_ready(timeout=10)
+    response = cold_app.get('/ready')
+    assert response.status_code == 503
+    assert response.get_json()['error'] == 'artifacts/model/flat_forest/meta.json'
+    assert cold_app.get('/healthz').status_code == 200
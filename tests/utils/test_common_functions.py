@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.common_functions import categorize, csv_to_frame, downcast, load_data, save_frame
+
+
+def test_downcast_keeps_values_in_narrowest_dtypes():
+    df = pd.DataFrame({
+        "code": np.array([0, 1, 2], dtype=np.int64),
+        "delta": np.array([-3, 0, 300], dtype=np.int64),
+        "charges": np.array([29.85, 1889.5, 8684.8]),
+        "Churn": np.array([0, 1, 0], dtype=np.int64),
+    })
+    compact = downcast(df.copy(), exclude=["Churn"])
+
+    assert compact.dtypes.to_dict() == {"code": np.uint8, "delta": np.int16,
+                                        "charges": np.float32, "Churn": np.int64}
+    assert np.allclose(compact["charges"], df["charges"], rtol=1e-6)
+    assert (compact[["code", "delta"]] == df[["code", "delta"]]).all().all()
+
+
+def frame(n_rows=1000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "customerID": [f"{i:04d}-ABCD" for i in range(n_rows)],
+        "Contract": rng.choice(["Month-to-month", "One year", "Two year"], n_rows),
+        "tenure": rng.integers(0, 72, n_rows).astype(np.uint8),
+        "MonthlyCharges": rng.uniform(18, 120, n_rows).astype(np.float32),
+    })
+
+
+def test_categorize_converts_only_low_cardinality_text():
+    df = categorize(frame())
+    assert df["Contract"].dtype == "category"
+    assert df["customerID"].dtype == object
+
+
+def test_feather_round_trip_keeps_dtypes_and_zero_copy_views(tmp_path):
+    df = categorize(frame()).iloc[::2]       # a non-default index is dropped on save
+    path = str(tmp_path / "frame.feather")
+    save_frame(df, path)
+
+    loaded = load_data(path)
+    pd.testing.assert_frame_equal(loaded, df.reset_index(drop=True))
+    assert list(loaded["Contract"].cat.categories) == list(df["Contract"].cat.categories)
+
+    mapped = load_data(path, zero_copy=True)
+    pd.testing.assert_frame_equal(mapped, loaded)
+    assert not mapped["tenure"].to_numpy().flags.writeable    # a view of the mapped file
+    assert loaded["tenure"].to_numpy().flags.writeable
+
+
+def test_csv_to_frame_streams_to_the_same_frame_as_categorize(tmp_path):
+    df = frame(60_000)          # a few MB: several CSV blocks
+    csv_path = str(tmp_path / "raw.csv")
+    df.to_csv(csv_path, index=False)
+    path = str(tmp_path / "raw.feather")
+    csv_to_frame(csv_path, path, max_categories=64)
+
+    loaded = load_data(path)
+    expected = categorize(pd.read_csv(csv_path))
+    assert loaded.dtypes.astype(str).to_dict() == expected.dtypes.astype(str).to_dict()
+    for col in ["customerID", "Contract"]:
+        assert loaded[col].astype(str).tolist() == expected[col].astype(str).tolist()
+    assert np.allclose(loaded["MonthlyCharges"], expected["MonthlyCharges"])
+    assert (loaded["tenure"] == expected["tenure"]).all()
+    assert sorted(os.listdir(tmp_path)) == ["raw.csv", "raw.feather"]
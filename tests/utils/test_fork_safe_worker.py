@@ -0,0 +1,36 @@
+import threading
+
+from utils.fork_safe_worker import ForkSafeWorker
+
+
+class Worker(ForkSafeWorker):
+    worker_name = 'test-worker'
+
+    def __init__(self):
+        self._stopped = False
+        self.release = threading.Event()
+
+    def _run(self):
+        self.release.wait()
+
+
+def test_one_thread_per_process_and_none_once_stopped(monkeypatch):
+    worker = Worker()
+    threads = [threading.Thread(target=worker._ensure_worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    first = worker._worker
+    assert [t for t in threading.enumerate() if t.name == 'test-worker'] == [first]
+
+    # A forked child has a new pid and no threads: it starts its own
+    monkeypatch.setattr("utils.fork_safe_worker.os.getpid", lambda: -1)
+    worker._ensure_worker()
+    assert worker._worker is not first and worker._worker_pid == -1
+
+    worker._stopped = True
+    monkeypatch.setattr("utils.fork_safe_worker.os.getpid", lambda: -2)
+    worker._ensure_worker()
+    assert worker._worker_pid == -1
+    worker.release.set()
@@ -0,0 +1,157 @@
+import json
+import logging
+import queue
+import threading
+import time
+
+from utils import logger as logger_module
+from utils.logger import JsonFormatter, RateLimitFilter, SamplingFilter, get_logger, start_queue_logging
+
+
+def queue_logger(name, path, **handler_kwargs):
+    file_handler = logging.FileHandler(path)
+    file_handler.setFormatter(JsonFormatter())
+    handler, listener = start_queue_logging(file_handler, **handler_kwargs)
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    return logger, listener
+
+
+def read_lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_records_are_written_as_json_lines_by_the_listener(tmp_path):
+    path = tmp_path / "app.log"
+    logger, listener = queue_logger("test.json", path)
+    logger.info("scored %d rows", 3, extra={'rows': 3})
+    try:
+        raise ValueError("bad row")
+    except ValueError:
+        logger.exception("batch failed")
+    listener.stop()
+
+    first, second = read_lines(path)
+    assert first['message'] == "scored 3 rows"
+    assert first['level'] == "INFO" and first['logger'] == "test.json"
+    assert first['rows'] == 3
+    assert second['level'] == "ERROR"
+    assert "ValueError: bad row" in second['exception']
+
+
+def test_full_queue_drops_records_and_reports_the_count(tmp_path):
+    path = tmp_path / "app.log"
+    log_queue = queue.Queue(2)
+    logger, listener = queue_logger("test.full", path, log_queue=log_queue)
+    listener.stop()  # nothing drains the queue
+    for i in range(5):
+        logger.info(f"message {i}")
+    handler = logger.handlers[0]
+    assert handler.dropped == 3
+
+    log_queue.get_nowait()
+    logger.info("after")
+    assert log_queue.get_nowait().msg == "message 1"
+    assert log_queue.get_nowait().dropped == 3
+
+
+def test_warnings_are_written_by_the_caller_when_the_queue_stays_full(tmp_path):
+    path = tmp_path / "app.log"
+    logger, listener = queue_logger("test.full_warning", path, log_queue=queue.Queue(1))
+    listener.stop()
+    logger.info("fills the queue")
+    logger.info("dropped")
+    logger.warning("drift detected")
+    logger.error("model failed")
+
+    warning, error = read_lines(path)
+    assert (warning['message'], warning['dropped']) == ("drift detected", 1)
+    assert error['message'] == "model failed" and 'dropped' not in error
+    assert logger.handlers[0].dropped == 0
+
+
+def test_a_warning_waiting_for_room_does_not_hold_up_other_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr("utils.logger.FULL_QUEUE_WAIT", 1.0)
+    logger, listener = queue_logger("test.full_wait", tmp_path / "app.log", log_queue=queue.Queue(1))
+    listener.stop()
+    logger.info("fills the queue")
+    waiting = threading.Thread(target=logger.warning, args=("drift detected",))
+    waiting.start()
+    time.sleep(0.1)
+
+    start = time.perf_counter()
+    logger.info("dropped")
+    assert time.perf_counter() - start < 0.5
+    assert waiting.is_alive()
+    waiting.join()
+    assert [line['message'] for line in read_lines(tmp_path / "app.log")] == ["drift detected"]
+    assert logger.handlers[0].dropped == 1
+
+
+def test_fork_restarts_the_writer_only_if_the_parent_was_running_one(tmp_path, monkeypatch):
+    handler, listener = start_queue_logging(logging.FileHandler(tmp_path / "app.log"))
+    monkeypatch.setattr(logger_module, "_queue_handler", handler)
+    monkeypatch.setattr(logger_module, "_listener", listener)
+
+    logger_module._restart_after_fork()
+    restarted = logger_module._listener
+    assert restarted is not listener and restarted._thread is not None
+    listener.stop()
+    restarted.stop()
+
+    logger_module._restart_after_fork()
+    assert logger_module._listener is restarted and restarted._thread is None
+
+
+def test_rate_limit_counts_are_exact_across_threads(monkeypatch):
+    monkeypatch.setattr("utils.logger.time.monotonic", lambda: 100.0)
+    log_filter = RateLimitFilter(50)
+    passed = []
+
+    def log_many():
+        record = logging.LogRecord("x", logging.INFO, __file__, 1, "m", None, None)
+        passed.append(sum(log_filter.filter(record) for _ in range(1000)))
+
+    threads = [threading.Thread(target=log_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(passed) == 50
+    assert log_filter._buckets[(__file__, 1)][2] == 8 * 1000 - 50
+
+
+def test_sampling_keeps_a_fraction_below_warning():
+    log_filter = SamplingFilter(0.25)
+    info = logging.LogRecord("x", logging.INFO, __file__, 1, "m", None, None)
+    warning = logging.LogRecord("x", logging.WARNING, __file__, 1, "m", None, None)
+    assert sum(log_filter.filter(info) for _ in range(100)) == 25
+    assert all(log_filter.filter(warning) for _ in range(10))
+
+
+def test_rate_limit_is_per_call_site_and_counts_suppressed(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("utils.logger.time.monotonic", lambda: now[0])
+    log_filter = RateLimitFilter(2)
+
+    def record(lineno, level=logging.INFO):
+        return logging.LogRecord("x", level, __file__, lineno, "m", None, None)
+
+    assert [log_filter.filter(record(1)) for _ in range(5)] == [True, True, False, False, False]
+    assert log_filter.filter(record(2))
+    assert log_filter.filter(record(1, logging.ERROR))
+
+    now[0] += 1.0
+    passed = record(1)
+    assert log_filter.filter(passed)
+    assert passed.suppressed == 3
+
+
+def test_get_logger_replaces_earlier_filters():
+    logger = get_logger("test.filters", sample_rate=0.5, max_per_second=10)
+    get_logger("test.filters", max_per_second=5)
+    assert [type(f) for f in logger.filters] == [RateLimitFilter]
+    assert logger.filters[0].max_per_second == 5
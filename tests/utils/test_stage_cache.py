@@ -0,0 +1,43 @@
+from utils.stage_cache import StageCache
+
+
+def make_stage(tmp_path):
+    source, output = tmp_path / "source.txt", tmp_path / "output.txt"
+    source.write_text("v1")
+    runs = []
+
+    def stage():
+        runs.append(1)
+        output.write_text(source.read_text().upper())
+
+    return source, output, stage, runs
+
+
+def run(cache, stage, source, output, config=None):
+    return cache.run("stage", stage, inputs=[str(source)], config=config, outputs=[str(output)])
+
+
+def test_unchanged_stage_is_skipped(tmp_path):
+    source, output, stage, runs = make_stage(tmp_path)
+    manifest = tmp_path / "manifest.json"
+
+    assert run(StageCache(str(manifest)), stage, source, output)
+    cache = StageCache(str(manifest))
+    assert not run(cache, stage, source, output)
+    assert cache.decisions == {"stage": "hit"}
+    assert len(runs) == 1
+
+
+def test_changed_input_config_or_output_reruns(tmp_path):
+    source, output, stage, runs = make_stage(tmp_path)
+    cache = StageCache(str(tmp_path / "manifest.json"))
+    run(cache, stage, source, output)
+
+    source.write_text("v2")
+    assert run(cache, stage, source, output)
+    assert run(cache, stage, source, output, config={"random_state": 1})
+    output.write_text("edited by hand")
+    assert run(cache, stage, source, output, config={"random_state": 1})
+    output.unlink()
+    assert run(cache, stage, source, output, config={"random_state": 1})
+    assert len(runs) == 5
@@ -1,5 +1,4 @@
 import os 
-import pandas as pd  
 from utils.logger import get_logger
 from utils.custom_exception import CustomException
 import yaml
@@ -21,10 +20,114 @@ def read_yaml(file_path):
         logger.error("Error while reading YAML file")
         raise CustomException("Failed to read YAML file", e)
 
-def load_data(path):
+def load_data(path, zero_copy=False):
+    """
+    Reads a CSV, Parquet or Feather (Arrow IPC) file into a DataFrame.
+
+    Feather files are memory-mapped. With zero_copy=True, numeric columns
+    without nulls are read-only views of the mapped file, so only use it
+    when the frame is not modified in place.
+    """
     try:
-        logger.info("Loading data")
+        import pandas as pd
+        logger.info(f"Loading data from {path}")
+        if path.endswith(('.feather', '.arrow')):
+            from pyarrow import feather
+            table = feather.read_table(path, memory_map=True)
+            return table.to_pandas(split_blocks=True) if zero_copy else table.to_pandas()
+        if path.endswith('.parquet'):
+            return pd.read_parquet(path)
         return pd.read_csv(path)
     except Exception as e:
         logger.error(f"Error loading the data {e}")
-        raise CustomException("Failed to load data", e)    
\ No newline at end of file
+        raise CustomException("Failed to load data", e)
+
+
+def save_frame(df, path):
+    """
+    Writes a DataFrame as CSV, Parquet or uncompressed Feather (by extension),
+    keeping dtypes (categoricals included) in the binary formats. The file is
+    renamed into place, so readers that still map the previous version are unaffected.
+    """
+    try:
+        tmp_path = f"{path}.tmp"
+        if path.endswith(('.feather', '.arrow')):
+            from pyarrow import feather
+            # Uncompressed buffers can be memory-mapped without decoding
+            feather.write_feather(df.reset_index(drop=True), tmp_path, compression='uncompressed')
+        elif path.endswith('.parquet'):
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_csv(tmp_path, index=None)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.error(f"Error saving the data {e}")
+        raise CustomException("Failed to save data", e)
+
+
+def categorize(df, max_categories=64):
+    """
+    Converts text columns with at most max_categories distinct values to the
+    pandas category dtype (stored as dictionary arrays in Parquet/Feather).
+    """
+    for col in df.select_dtypes(include='object').columns:
+        if df[col].nunique(dropna=False) <= max_categories:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def downcast(df, exclude=()):
+    """
+    Stores numeric columns in the narrowest dtype that holds all their values:
+    integers as the smallest (unsigned when non-negative) int, floats as float32.
+    """
+    import pandas as pd
+    for col in df.select_dtypes(include='integer').columns.difference(exclude):
+        df[col] = pd.to_numeric(df[col], downcast='unsigned' if df[col].min() >= 0 else 'integer')
+    for col in df.select_dtypes(include='floating').columns.difference(exclude):
+        df[col] = pd.to_numeric(df[col], downcast='float')
+    return df
+
+
+def csv_to_frame(csv_path, path, max_categories=64):
+    """
+    Converts a CSV into an uncompressed Feather file with pyarrow, streaming
+    it batch by batch so the file is never loaded whole. A first pass finds
+    the text columns with at most max_categories distinct values; the second
+    writes them dictionary-encoded with one dictionary per column, as
+    categorize does.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        from pyarrow import csv
+
+        reader = csv.open_csv(csv_path)
+        schema = reader.schema
+        levels = {field.name: {} for field in schema if pa.types.is_string(field.type)}
+        for batch in reader:
+            for name in list(levels):
+                levels[name].update(dict.fromkeys(pc.unique(batch.column(name)).to_pylist()))
+                if len(levels[name]) > max_categories:
+                    del levels[name]
+        dictionaries = {name: pa.array([value for value in values if value is not None], pa.string())
+                        for name, values in levels.items()}
+
+        fields = [pa.field(field.name, pa.dictionary(pa.int32(), pa.string())) if field.name in dictionaries
+                  else field for field in schema]
+        # Second pass with the types of the first, so every batch fits the file's schema
+        convert_options = csv.ConvertOptions(column_types={field.name: field.type for field in schema})
+        tmp_path = f"{path}.tmp"
+        with pa.ipc.new_file(tmp_path, pa.schema(fields)) as writer:
+            for batch in csv.open_csv(csv_path, convert_options=convert_options):
+                columns = [
+                    pa.DictionaryArray.from_arrays(
+                        pc.index_in(column, value_set=dictionaries[name]).cast(pa.int32()), dictionaries[name])
+                    if name in dictionaries else column
+                    for name, column in zip(batch.schema.names, batch.columns)
+                ]
+                writer.write_batch(pa.record_batch(columns, schema=pa.schema(fields)))
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.error(f"Error converting {csv_path} {e}")
+        raise CustomException("Failed to convert CSV", e)
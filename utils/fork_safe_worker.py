@@ -0,0 +1,31 @@
+#fork_safe_worker.py
+import os
+import threading
+
+# Only held while a worker thread is being started
+_start_lock = threading.Lock()
+
+
+class ForkSafeWorker:
+    """
+    Mixin for objects served by one background thread, `_run`, named
+    `worker_name`. Threads do not survive fork(), so `_ensure_worker` starts
+    the thread on first use in every process, e.g. in each pre-forked
+    gunicorn worker, and never once `_worker_stopped()` is true.
+    """
+
+    worker_name = 'worker'
+    _worker = None
+    _worker_pid = None
+
+    def _worker_stopped(self):
+        return self._stopped
+
+    def _ensure_worker(self):
+        if self._worker_pid == os.getpid() or self._worker_stopped():
+            return
+        with _start_lock:
+            if self._worker_pid != os.getpid():
+                self._worker = threading.Thread(target=self._run, name=self.worker_name, daemon=True)
+                self._worker_pid = os.getpid()
+                self._worker.start()
@@ -1,6 +1,12 @@
+import atexit
+import json
 import logging
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 
 LOGS_DIR = "logs"
 
@@ -8,13 +14,207 @@ os.makedirs(LOGS_DIR, exist_ok=True)
 
 LOG_FILE = os.path.join(LOGS_DIR, f"log_{datetime.now().strftime('%Y-%m-%d')}.log")
 
-logging.basicConfig(
-    filename=LOG_FILE,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
+# Records waiting for the writer thread; when it falls this far behind, new records below
+# WARNING are dropped and counted. WARNING and above wait up to FULL_QUEUE_WAIT seconds for
+# room, then are written by the calling thread.
+QUEUE_SIZE = 10000
+FULL_QUEUE_WAIT = 0.05
 
-def get_logger(name):
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger, message, process, the
+    fields passed with `extra=` and the traceback if any.
+    """
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    Hands records to a QueueListener without formatting them: the JSON
+    encoding and the file write happen on the listener's thread. Below
+    WARNING it never blocks: when the queue is full the record is dropped,
+    and the next one queued carries the number dropped. Warnings and errors
+    are never dropped: they wait briefly for room, then go straight to
+    `fallback` (the listener's handler) on the calling thread.
+    """
+
+    def __init__(self, log_queue, fallback=None):
+        super().__init__(log_queue)
+        self.fallback = fallback
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def handle(self, record):
+        # Without the handler lock: a warning waiting for room must not hold up other threads
+        rv = self.filter(record)
+        if isinstance(rv, logging.LogRecord):
+            record = rv
+        if rv:
+            self.emit(record)
+        return rv
+
+    def prepare(self, record):
+        if record.args:
+            # Merge the arguments now, they may change before the writer gets to them
+            record.msg, record.args = record.getMessage(), None
+        return record
+
+    def enqueue(self, record):
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            record.dropped = dropped
+        try:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=FULL_QUEUE_WAIT)
+            else:
+                self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            if record.levelno >= logging.WARNING and self.fallback is not None:
+                self.fallback.handle(record)
+                return
+        with self._dropped_lock:
+            self.dropped += dropped + 1
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps an evenly spaced fraction `rate` of a logger's records below WARNING.
+    """
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+        self._credit = 0.0
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        with self._lock:
+            self._credit += self.rate
+            if self._credit >= 1.0:
+                self._credit -= 1.0
+                return True
+        return False
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    At most `max_per_second` records per call site (token bucket with a
+    burst of the same size, at least one). Errors always pass. The next record let
+    through carries the number suppressed since the previous one.
+    """
+
+    def __init__(self, max_per_second):
+        super().__init__()
+        self.max_per_second = max_per_second
+        self.burst = max(1.0, max_per_second)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        site = (record.pathname, record.lineno)
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated, suppressed = self._buckets.get(site, (self.burst, now, 0))
+            tokens = min(self.burst, tokens + (now - updated) * self.max_per_second)
+            if tokens < 1.0:
+                self._buckets[site] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[site] = (tokens - 1.0, now, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+def start_queue_logging(handler, log_queue=None):
+    """
+    Returns an (AsyncQueueHandler, started QueueListener) pair that writes through `handler`.
+    """
+    log_queue = log_queue or queue.Queue(QUEUE_SIZE)
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    return AsyncQueueHandler(log_queue, fallback=handler), listener
+
+
+def _file_handler():
+    handler = logging.FileHandler(LOG_FILE)
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+_queue_handler, _listener = start_queue_logging(_file_handler())
+_root = logging.getLogger()
+_root.addHandler(_queue_handler)
+_root.setLevel(logging.INFO)
+
+
+def _restart_after_fork():
+    # The writer thread does not survive fork (e.g. gunicorn workers with preload_app): start one per
+    # process, unless the parent had stopped its own. Processes that exit with os._exit (pool workers)
+    # must call shutdown_logging themselves.
+    global _listener
+    if _listener._thread is None:
+        return
+    _queue_handler.queue = queue.Queue(QUEUE_SIZE)
+    _listener = QueueListener(_queue_handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """
+    Writes the queued records and stops the writer thread.
+    """
+    if _listener._thread is not None:
+        _listener.stop()
+    for handler in _listener.handlers:
+        handler.flush()
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
+atexit.register(shutdown_logging)
+
+
+def get_logger(name, sample_rate=None, max_per_second=None):
+    """
+    Logger whose records go through the queue to the JSON log file.
+    sample_rate keeps that fraction of its records below WARNING, and
+    max_per_second limits each of its call sites; both replace earlier settings.
+    """
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
-    return logger
\ No newline at end of file
+    if sample_rate is not None or max_per_second is not None:
+        for log_filter in [f for f in logger.filters if isinstance(f, (SamplingFilter, RateLimitFilter))]:
+            logger.removeFilter(log_filter)
+        if sample_rate is not None and sample_rate < 1:
+            logger.addFilter(SamplingFilter(sample_rate))
+        if max_per_second is not None:
+            logger.addFilter(RateLimitFilter(max_per_second))
+    return logger
+
+
+def configure_loggers(logging_config):
+    """
+    Applies the per-logger `sample_rate` / `max_per_second` of logging_config['loggers'].
+    """
+    for name, settings in (logging_config or {}).get('loggers', {}).items():
+        get_logger(name, **settings)
@@ -0,0 +1,105 @@
+#stage_cache.py
+import hashlib
+import json
+import os
+import time
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def file_digest(path):
+    """
+    Content hash of a file, or of every file under a directory; None if missing.
+    """
+    if os.path.isdir(path):
+        digest = hashlib.blake2b(digest_size=16)
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                digest.update(os.path.relpath(file_path, path).encode())
+                digest.update(file_digest(file_path).encode())
+        return digest.hexdigest()
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class StageCache:
+    """
+    Skips pipeline stages whose inputs have not changed since their last run.
+
+    A stage's fingerprint hashes the content of its input files, its code
+    files and the config it depends on. After a stage runs, the manifest
+    (a JSON file) records that fingerprint and the hashes of its outputs.
+    The next run is skipped when the fingerprint matches and every output
+    is still on disk with the recorded content (e.g. restored by DVC).
+    `decisions` maps each stage to 'hit' or 'miss' for the run log.
+    """
+
+    def __init__(self, manifest_path, enabled=True):
+        self.manifest_path = manifest_path
+        self.enabled = enabled
+        self.decisions = {}
+        self._manifest = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable stage cache manifest {self.manifest_path}: {e}")
+            return {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.manifest_path)), exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def fingerprint(inputs=(), config=None, code=()):
+        digest = hashlib.blake2b(digest_size=16)
+        for path in list(inputs) + list(code):
+            digest.update(f"{os.path.basename(path)}={file_digest(path)};".encode())
+        digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def is_fresh(self, stage, fingerprint, outputs):
+        entry = self._manifest.get(stage)
+        if not self.enabled or entry is None or entry['fingerprint'] != fingerprint:
+            return False
+        recorded = entry['outputs']
+        return all(path in recorded and file_digest(path) == recorded[path] for path in outputs)
+
+    def record(self, stage, fingerprint, outputs):
+        self._manifest[stage] = {
+            'fingerprint': fingerprint,
+            'outputs': {path: file_digest(path) for path in outputs},
+            'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        self._save()
+
+    def run(self, stage, func, inputs=(), config=None, code=(), outputs=()):
+        """
+        Runs func() unless the stage is fresh; returns True when it ran.
+        """
+        fingerprint = self.fingerprint(inputs, config, code)
+        if self.is_fresh(stage, fingerprint, outputs):
+            self.decisions[stage] = 'hit'
+            logger.info(f"Stage '{stage}' unchanged ({fingerprint}), reusing its outputs")
+            return False
+
+        self.decisions[stage] = 'miss'
+        logger.info(f"Stage '{stage}' changed ({fingerprint}), running it")
+        func()
+        self.record(stage, fingerprint, outputs)
+        return True
@@ -0,0 +1,15 @@
+#wsgi.py
+# WSGI entry point for gunicorn (see gunicorn.conf.py)
+from application import app, serving_config, wait_until_ready
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# With preload_app the master loads and warms the model once before forking,
+# so every worker starts ready and shares the loaded arrays copy-on-write.
+# The port is only bound afterwards, so the wait is bounded (see the startupProbe
+# in k8s/deployment.yaml); past it, each worker loads on its own behind /ready.
+PRELOAD_TIMEOUT = serving_config.get('preload_timeout_seconds', 30)
+if not wait_until_ready(timeout=PRELOAD_TIMEOUT):
+    logger.error(f"Serving artifacts not loaded within {PRELOAD_TIMEOUT}s before fork; "
+                 "workers load them in the background")